@@ -0,0 +1,507 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, List
+from typing import Optional, Type, TypeVar
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from app.client import llm_messages
+from app.client.batch_client import BatchRequest, OpenAIBatchRunner
+from app.client.hedging import HedgedExecutor, hedging
+from app.client.llm_cache import LLMResponseCache, llm_cache
+from app.client.llm_provider import LLMProvider, OpenAIProvider
+from app.client.rate_limiter import ModelRateLimiter, rate_limiter
+from app.client.resilience import ResilientExecutor, resilience
+from app.client.response_format import response_format_param
+from app.client.single_flight import SingleFlight, single_flight
+from app.client.transport import openai_async_http_client
+from app.client.llm_client import merge_translated_content, simplify_output_tokens, simplify_pack_timeout, \
+    unpack_simplify_response, segment_tokens, unpack_segments_response, SIMPLIFY_PACK_TOKEN_BUDGET, \
+    SIMPLIFY_MAX_PACK_SIZE, SEGMENT_PACK_TOKEN_BUDGET, SEGMENT_MAX_PACK_SIZE, SEGMENT_TRANSLATION_MODEL
+from app.constant_manager import script_generator_prompt, intro_script_prompt
+from app.model.content_dto import CourseOutLines, VideoOutLines, ContentWithQuiz, LLMOutLines
+from app.model.llm_response import VideoContentLLMResponseList, QuestionResponse
+from app.model.llm_response_model import ParagraphMetaData, ParagraphResponse, SimplifyResponse, QuizResponse, \
+    PackedSimplifyResponse, TranslatedSegments
+from app.model.processing_models import SimplifyResults, TranslateP1Response, TranslateP2Response
+from app.model.translate_video_metadata import CourseWrapper, Chapter
+from app.request_schema.course_content_request import CourseOutlineRequest
+from app.utils.json_stream import JSONArrayStreamParser
+from app.utils.packing import pack_by_budget
+
+load_dotenv()
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+class AsyncOpenAITextProcessor:
+    """
+    Coroutine-based counterpart of OpenAITextProcessor built on AsyncOpenAI.
+
+    Every method sends the same prompts as the synchronous client, but awaits the
+    HTTP call on the event loop instead of occupying an executor thread.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o",
+                 cache: Optional[LLMResponseCache] = None,
+                 limiter: Optional[ModelRateLimiter] = None,
+                 resilient_executor: Optional[ResilientExecutor] = None,
+                 hedged_executor: Optional[HedgedExecutor] = None,
+                 coalescer: Optional[SingleFlight] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.client = AsyncOpenAI(api_key=self.api_key, max_retries=0, http_client=openai_async_http_client())
+        self.cache = cache or llm_cache
+        self.rate_limiter = limiter or rate_limiter
+        self.resilience = resilient_executor or resilience
+        self.hedging = hedged_executor or hedging
+        self.single_flight = coalescer or single_flight
+        self.provider = OpenAIProvider(async_client=self.client)
+        self.batch_runner = OpenAIBatchRunner.from_env(api_key=self.api_key, cache=self.cache)
+
+    async def _parse(self, model: str, messages: list, response_format: Type[ResponseT],
+                     temperature: float, timeout: Optional[float] = None,
+                     use_cache: Optional[bool] = None, hedge: bool = False) -> ResponseT:
+        """
+        Single entry point for every structured-output completion.
+
+        Deterministic calls are served from the response cache when possible;
+        pass `use_cache` to force or skip caching for a single call. With `hedge`, a slow request is
+        raced against the hedge target configured for the model.
+        """
+        request_key = self.cache.make_key(model, messages, temperature, response_format)
+        cache_key = request_key if self.cache.should_cache(temperature, use_cache) else None
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return response_format.model_validate_json(cached)
+
+        async def upstream():
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+            async def request(provider: LLMProvider, request_model: str):
+                async def attempt(attempt_timeout: float):
+                    await self.rate_limiter.acquire_async(request_model, estimated_tokens)
+                    return await provider.parse_async(
+                        model=request_model,
+                        messages=messages,
+                        response_format=response_format,
+                        temperature=temperature,
+                        timeout=attempt_timeout
+                    )
+
+                response = await self.resilience.call_async(request_model, attempt, timeout=timeout)
+                self.rate_limiter.record_usage(request_model, estimated_tokens, response.usage)
+                return response.parsed
+
+            hedge_target = self.hedging.target(model) if hedge else None
+            if hedge_target is not None:
+                parsed = await self.hedging.call_async(
+                    f"{model}:{response_format.__name__}",
+                    lambda: request(self.provider, model),
+                    lambda: request(*hedge_target)
+                )
+            else:
+                parsed = await request(self.provider, model)
+
+            if cache_key is not None and parsed is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, parsed.model_dump_json())
+            return parsed
+
+        # Identical concurrent requests share one upstream call; followers get their own copy
+        return await self.single_flight.do_async(request_key, upstream,
+                                                 copy=lambda parsed: parsed.model_copy(deep=True))
+
+    async def _complete(self, model: str, messages: list, temperature: Optional[float] = None,
+                        use_cache: Optional[bool] = None) -> str:
+        """
+        Single entry point for every plain-text completion.
+        """
+        request_key = self.cache.make_key(model, messages, temperature)
+        cache_key = request_key if self.cache.should_cache(temperature, use_cache) else None
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return json.loads(cached)
+
+        async def upstream():
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+            kwargs = {"temperature": temperature} if temperature is not None else {}
+
+            async def attempt(attempt_timeout: float):
+                await self.rate_limiter.acquire_async(model, estimated_tokens)
+                return await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=attempt_timeout,
+                    **kwargs
+                )
+
+            response = await self.resilience.call_async(model, attempt)
+            self.rate_limiter.record_usage(model, estimated_tokens, response.usage)
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, json.dumps(content, ensure_ascii=False))
+            return content
+
+        # Identical concurrent requests share one upstream call
+        return await self.single_flight.do_async(request_key, upstream)
+
+    async def generate_outline(self, course_details: CourseOutlineRequest, prompt: str) -> LLMOutLines:
+        try:
+            return await self._parse(
+                model=self.model,
+                messages=llm_messages.outline_messages(course_details, prompt),
+                response_format=LLMOutLines,
+                temperature=0.3
+            )
+        except Exception as e:
+            print(f"Error generating course outline: {str(e)}")
+            raise e
+
+    async def generate_raw_content(self, video: VideoOutLines):
+        """
+        Sends a prompt to the ChatGPT model with web search options and returns the response.
+        """
+        try:
+            return await self._complete(
+                model="gpt-4o-search-preview",
+                messages=llm_messages.raw_content_messages(video),
+            )
+        except Exception as e:
+            print(f"Error during web search: {str(e)}")
+            return None
+
+    async def generate_video(self, course: CourseOutLines, video: VideoOutLines,
+                             raw_content: List[str], prompt: str = script_generator_prompt) -> list[str]:
+        if not video.previous_video_name:
+            prompt = intro_script_prompt
+        response = await self._parse(
+            model=self.model,
+            messages=llm_messages.video_messages(course, video, raw_content, prompt),
+            response_format=VideoContentLLMResponseList,
+            temperature=0.3
+        )
+        return response.video_content
+
+    async def generate_quiz_3c(self, video_content: list[str], course_name: str,
+                               video_name: str, skill: str, objective: str,
+                               question_per_video: int) -> dict:
+        async def generate_question(i, content):
+            if i == 0 or i == len(video_content) - 1:
+                return ContentWithQuiz(paragraph=content, question=None)
+            try:
+                paragraph_question = await self._parse(
+                    model=self.model,
+                    messages=llm_messages.paragraph_question_messages(course_name, video_name, skill,
+                                                                      objective, content),
+                    response_format=QuestionResponse,
+                    temperature=0.3
+                )
+                return ContentWithQuiz(paragraph=content, question=paragraph_question.question)
+            except Exception as e:
+                print(f"Error generating question for paragraph {i}: {e}")
+                return ContentWithQuiz(paragraph=content, question=None)
+
+        try:
+            results = await asyncio.gather(*(generate_question(i, content)
+                                             for i, content in enumerate(video_content)))
+            video_quiz = await self._parse(
+                model=self.model,
+                messages=llm_messages.video_quiz_messages(course_name, video_name, skill, objective,
+                                                          video_content, question_per_video),
+                response_format=QuestionResponse,
+                temperature=0.3
+            )
+            return {
+                "content_with_question_list": list(results),
+                "video_quiz": video_quiz.question
+            }
+        except Exception as e:
+            print(f"Error generating quiz: {str(e)}")
+            raise e
+
+    async def chat(self, messages: List, model: str = "gpt-4o",
+                   temperature: float = 0.7) -> str:
+        try:
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+            async def attempt(attempt_timeout: float):
+                await self.rate_limiter.acquire_async(model, estimated_tokens)
+                return await self.client.responses.create(
+                    model=model,
+                    input=messages,
+                    temperature=temperature,
+                    timeout=attempt_timeout
+                )
+
+            response = await self.resilience.call_async(model, attempt)
+            self.rate_limiter.record_usage(model, estimated_tokens, response.usage)
+            return response.output_text
+        except Exception as e:
+            print(f"Error during chat: {str(e)}")
+            raise e
+
+    async def get_paragraph(self, video: str, objective: list, skills: list) -> ParagraphResponse | None:
+        return await self._parse(
+            model="gpt-4o-mini",
+            messages=llm_messages.paragraph_messages(video, objective, skills),
+            temperature=0,
+            response_format=ParagraphResponse,
+            # The whole script is echoed back, so allow a longer attempt than the default
+            timeout=300,
+            # Latency of this call has a long tail; race stragglers against a second request
+            hedge=True
+        )
+
+    async def get_paragraph_stream(self, video: str, objective: list,
+                                   skills: list) -> AsyncIterator[ParagraphMetaData]:
+        """
+        Streaming version of `get_paragraph` that yields every paragraph as soon as the model has finished it.
+
+        The structured output is parsed incrementally while tokens arrive. The complete response is
+        cached under the same key as `get_paragraph`, and a cached response is replayed. Only opening
+        the stream is retried, and the call is neither hedged nor coalesced.
+        """
+        model = "gpt-4o-mini"
+        messages = llm_messages.paragraph_messages(video, objective, skills)
+        cache_key = self.cache.make_key(model, messages, 0, ParagraphResponse)
+        cached = await asyncio.to_thread(self.cache.get, cache_key) if self.cache.should_cache(0) else None
+        if cached is not None:
+            for paragraph in ParagraphResponse.model_validate_json(cached).paragraph:
+                yield paragraph
+            return
+
+        estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+        async def attempt(attempt_timeout: float):
+            await self.rate_limiter.acquire_async(model, estimated_tokens)
+            return await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0,
+                response_format=response_format_param(ParagraphResponse),
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=attempt_timeout
+            )
+
+        stream = await self.resilience.call_async(model, attempt, timeout=300)
+        parser = JSONArrayStreamParser("paragraph")
+        content = []
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    self.rate_limiter.record_usage(model, estimated_tokens, chunk.usage)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content.append(chunk.choices[0].delta.content)
+                for element in parser.feed(chunk.choices[0].delta.content):
+                    yield ParagraphMetaData.model_validate(element)
+
+        response = ParagraphResponse.model_validate_json("".join(content))
+        if self.cache.should_cache(0):
+            await asyncio.to_thread(self.cache.set, cache_key, response.model_dump_json())
+
+    async def simplify(self, paragraph: str, language: str) -> SimplifyResponse | None:
+        return await self._parse(
+            model=self.model,
+            messages=llm_messages.simplify_messages(paragraph, language),
+            temperature=0,
+            response_format=SimplifyResponse
+        )
+
+    async def simplify_packed(self, paragraphs: List[dict], language: str,
+                              token_budget: int = SIMPLIFY_PACK_TOKEN_BUDGET,
+                              max_pack_size: int = SIMPLIFY_MAX_PACK_SIZE) -> dict[str, SimplifyResponse]:
+        """
+        Simplify several paragraphs per request; see OpenAITextProcessor.simplify_packed.
+        """
+        packs = pack_by_budget(paragraphs, simplify_output_tokens, token_budget, max_pack_size)
+        results = {}
+        for pack_results in await asyncio.gather(*(self._simplify_pack(pack, language) for pack in packs)):
+            results.update(pack_results)
+        return results
+
+    async def _simplify_pack(self, pack: List[dict], language: str) -> dict[str, SimplifyResponse]:
+        if len(pack) == 1:
+            return {pack[0]['paragraph_id']: await self.simplify(pack[0]['paragraph'], language)}
+        try:
+            response = await self._parse(
+                model=self.model,
+                messages=llm_messages.simplify_packed_messages(pack, language),
+                temperature=0,
+                response_format=PackedSimplifyResponse,
+                timeout=simplify_pack_timeout(pack)
+            )
+        except Exception as e:
+            print(f"Packed simplify of {len(pack)} paragraphs failed: {str(e)}")
+            response = None
+
+        results = unpack_simplify_response(pack, response)
+        missing = [p for p in pack if p['paragraph_id'] not in results]
+        if missing:
+            print(f"Packed simplify returned {len(pack) - len(missing)}/{len(pack)} paragraphs; "
+                  f"simplifying the rest one by one")
+        singles = await asyncio.gather(*(self.simplify(p['paragraph'], language) for p in missing))
+        for paragraph, simplified in zip(missing, singles):
+            results[paragraph['paragraph_id']] = simplified
+        return results
+
+    async def translate_quiz(self, quiz, language: str) -> QuizResponse:
+        return await self._parse(
+            model="gpt-4o-mini",
+            messages=llm_messages.translate_quiz_messages(quiz, language),
+            temperature=0,
+            response_format=QuizResponse
+        )
+
+    async def translate_content(self, video_data, language: str) -> SimplifyResults | None:
+        p1_translate = llm_messages.translate_content_p1(video_data, language)
+        p2_translate = llm_messages.translate_content_p2(video_data)
+        p1_translate_response, p2_translate_response = await asyncio.gather(
+            self._parse(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(p1_translate, language),
+                temperature=0,
+                response_format=TranslateP1Response
+            ),
+            self._parse(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(p2_translate, language),
+                temperature=0,
+                response_format=TranslateP2Response
+            )
+        )
+        return merge_translated_content(p1_translate_response, p2_translate_response, language)
+
+    async def translate_chapter_meta(self, chapter_data: Chapter, language: str) -> Chapter:
+        return await self._parse(
+            model=self.model,
+            messages=llm_messages.translate_metadata_messages(chapter_data, language),
+            temperature=0,
+            response_format=Chapter
+        )
+
+    async def translate_segments(self, segments: List[str], language: str,
+                                 token_budget: int = SEGMENT_PACK_TOKEN_BUDGET,
+                                 model: Optional[str] = None) -> List[str]:
+        """
+        Translate short, independent text segments; see OpenAITextProcessor.translate_segments.
+        """
+        model = model or SEGMENT_TRANSLATION_MODEL
+        items = [{"index": index, "text": text} for index, text in enumerate(segments)]
+        packs = pack_by_budget(items, segment_tokens, token_budget, SEGMENT_MAX_PACK_SIZE)
+
+        async def translate_pack(pack: List[dict]) -> dict[int, str]:
+            try:
+                response = await self._parse(
+                    model=model,
+                    messages=llm_messages.translate_segments_messages(pack, language),
+                    temperature=0,
+                    response_format=TranslatedSegments
+                )
+                return unpack_segments_response(pack, response)
+            except Exception as e:
+                print(f"Segment translation of {len(pack)} segments failed: {str(e)}")
+                return {}
+
+        translations: dict[int, str] = {}
+        for pack_translations in await asyncio.gather(*(translate_pack(pack) for pack in packs)):
+            translations.update(pack_translations)
+        missing = [index for index in range(len(segments)) if index not in translations]
+        for index, text in zip(missing, await asyncio.gather(*(self.translate_text(segments[i], language, model)
+                                                                for i in missing))):
+            translations[index] = text
+        return [translations[index] for index in range(len(segments))]
+
+    async def translate_text(self, text: str, language: str, model: Optional[str] = None) -> str:
+        response = await self._complete(
+            model=model or SEGMENT_TRANSLATION_MODEL,
+            messages=llm_messages.translate_text_messages(text, language),
+            temperature=0
+        )
+        return response.strip()
+
+    async def translate_video_meta(self, video_data, language: str) -> CourseWrapper | None:
+        return await self._parse(
+            model=self.model,
+            messages=llm_messages.translate_metadata_messages(video_data, language),
+            temperature=0,
+            response_format=CourseWrapper
+        )
+
+    async def generate_quiz(self, paragraph_content, skills: list, objective: list, language: str) -> QuizResponse:
+        return await self._parse(
+            model=self.model,
+            messages=llm_messages.quiz_messages(paragraph_content, skills, objective, language),
+            temperature=0,
+            response_format=QuizResponse
+        )
+
+    async def _run_batch(self, requests: List[BatchRequest]) -> list:
+        """
+        Execute the requests through the Batch API; entries the batch failed are retried interactively.
+        """
+        result = await self.batch_runner.run_async(requests)
+        if result.errors:
+            print(f"{len(result.errors)} batch requests failed, retrying them interactively")
+
+        async def resolve(request: BatchRequest, response):
+            if response is not None:
+                return response
+            return await self._parse(model=request.model, messages=request.messages,
+                                     response_format=request.response_format, temperature=request.temperature)
+
+        return list(await asyncio.gather(*(resolve(request, response)
+                                           for request, response in zip(requests, result.responses))))
+
+    async def simplify_batch(self, paragraphs: List[dict]) -> List[SimplifyResponse]:
+        """
+        :param paragraphs: Keyword arguments of `simplify` for every paragraph.
+        """
+        return await self._run_batch([
+            BatchRequest(model=self.model,
+                         messages=llm_messages.simplify_messages(**paragraph),
+                         response_format=SimplifyResponse)
+            for paragraph in paragraphs
+        ])
+
+    async def generate_quiz_batch(self, paragraphs: List[dict]) -> List[QuizResponse]:
+        """
+        :param paragraphs: Keyword arguments of `generate_quiz` for every paragraph.
+        """
+        return await self._run_batch([
+            BatchRequest(model=self.model,
+                         messages=llm_messages.quiz_messages(**paragraph),
+                         response_format=QuizResponse)
+            for paragraph in paragraphs
+        ])
+
+    async def translate_quiz_batch(self, quizzes: List[str], language: str) -> List[QuizResponse]:
+        return await self._run_batch([
+            BatchRequest(model="gpt-4o-mini",
+                         messages=llm_messages.translate_quiz_messages(quiz, language),
+                         response_format=QuizResponse)
+            for quiz in quizzes
+        ])
+
+    async def translate_content_batch(self, video_data: List[dict], language: str) -> List[SimplifyResults]:
+        requests = []
+        for item in video_data:
+            requests.append(BatchRequest(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(
+                    llm_messages.translate_content_p1(item, language), language),
+                response_format=TranslateP1Response))
+            requests.append(BatchRequest(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(
+                    llm_messages.translate_content_p2(item), language),
+                response_format=TranslateP2Response))
+        responses = await self._run_batch(requests)
+        return [merge_translated_content(responses[i], responses[i + 1], language)
+                for i in range(0, len(responses), 2)]
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from typing import List, Optional, Type
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel
+
+from app.client.llm_cache import LLMResponseCache
+from app.client.response_format import response_format_param
+from app.client.transport import openai_async_http_client, openai_http_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+PENDING_BATCH_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+
+
+class BatchJobError(Exception):
+    """
+    Raised when a batch job ends in a state other than `completed`.
+    """
+
+
+class BatchRequest:
+    """
+    One structured chat completion to be executed as part of a batch job.
+    """
+
+    def __init__(self, model: str, messages: list, response_format: Type[BaseModel],
+                 temperature: float = 0, custom_id: Optional[str] = None):
+        self.model = model
+        self.messages = messages
+        self.response_format = response_format
+        self.temperature = temperature
+        self.custom_id = custom_id or str(uuid.uuid4())
+
+    def to_line(self) -> dict:
+        """
+        Serialize the request as one line of an OpenAI Batch API input file.
+        """
+        return {
+            "custom_id": self.custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": self.model,
+                "messages": self.messages,
+                "temperature": self.temperature,
+                "response_format": response_format_param(self.response_format),
+            },
+        }
+
+
+class BatchResult:
+    """
+    Outcome of a batch: parsed responses aligned with the submitted requests and the errors of the failed ones.
+    """
+
+    def __init__(self, responses: List[Optional[BaseModel]], errors: dict[str, str]):
+        self.responses = responses
+        self.errors = errors
+
+
+class OpenAIBatchRunner:
+    """
+    Executes structured chat completions through the OpenAI Batch API.
+
+    Requests are written as JSONL, uploaded, submitted as one batch and polled until the batch finishes.
+    Output lines are mapped back to the request order and validated against each request's response model.
+    Point OPENAI_BATCH_BASE_URL at a local stand-in to exercise the flow without the real endpoint.
+    """
+
+    def __init__(self, client: Optional[OpenAI] = None, async_client: Optional[AsyncOpenAI] = None,
+                 cache: Optional[LLMResponseCache] = None, poll_interval: float = 30.0,
+                 max_wait: float = 24 * 3600.0):
+        """
+        :param client: Synchronous client used by `run`.
+        :param async_client: Asynchronous client used by `run_async`.
+        :param cache: Response cache; cached requests are answered locally and new results are stored.
+        :param poll_interval: Seconds between two status checks.
+        :param max_wait: Give up on a batch after this many seconds.
+        """
+        self.client = client
+        self.async_client = async_client
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None, cache: Optional[LLMResponseCache] = None) -> "OpenAIBatchRunner":
+        base_url = os.getenv("OPENAI_BATCH_BASE_URL") or None
+        return cls(
+            client=OpenAI(api_key=api_key, base_url=base_url, http_client=openai_http_client()),
+            async_client=AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=openai_async_http_client()),
+            cache=cache,
+            poll_interval=float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", 30.0)),
+        )
+
+    def _cache_key(self, request: BatchRequest) -> Optional[str]:
+        if self.cache is None or not self.cache.should_cache(request.temperature):
+            return None
+        return self.cache.make_key(request.model, request.messages, request.temperature, request.response_format)
+
+    def _split_cached(self, requests: List[BatchRequest]) -> tuple[List[Optional[BaseModel]], List[BatchRequest]]:
+        responses: List[Optional[BaseModel]] = [None] * len(requests)
+        pending = []
+        for index, request in enumerate(requests):
+            cache_key = self._cache_key(request)
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                responses[index] = request.response_format.model_validate_json(cached)
+            else:
+                pending.append(request)
+        return responses, pending
+
+    @staticmethod
+    def _build_file(requests: List[BatchRequest]) -> io.BytesIO:
+        content = "\n".join(json.dumps(request.to_line(), ensure_ascii=False) for request in requests)
+        file = io.BytesIO(content.encode("utf-8"))
+        file.name = f"batch-{uuid.uuid4()}.jsonl"
+        return file
+
+    def _collect(self, requests: List[BatchRequest], responses: List[Optional[BaseModel]],
+                 output_text: Optional[str], error_text: Optional[str]) -> BatchResult:
+        index_by_id = {request.custom_id: index for index, request in enumerate(requests)}
+        errors: dict[str, str] = {}
+
+        for line in (output_text or "").splitlines() + (error_text or "").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            custom_id = record.get("custom_id")
+            index = index_by_id.get(custom_id)
+            if index is None:
+                continue
+            request = requests[index]
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code", 200) >= 400:
+                errors[custom_id] = json.dumps(record.get("error") or response.get("body"), ensure_ascii=False)
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                parsed = request.response_format.model_validate_json(content)
+            except Exception as e:
+                errors[custom_id] = f"Malformed batch output: {e}"
+                continue
+            responses[index] = parsed
+            cache_key = self._cache_key(request)
+            if cache_key:
+                self.cache.set(cache_key, parsed.model_dump_json())
+
+        for index, request in enumerate(requests):
+            if responses[index] is None and request.custom_id not in errors:
+                errors[request.custom_id] = "Missing from batch output"
+        return BatchResult(responses=responses, errors=errors)
+
+    def _check_finished(self, batch, started: float) -> bool:
+        if batch.status in PENDING_BATCH_STATUSES:
+            if time.monotonic() - started > self.max_wait:
+                raise BatchJobError(f"Batch {batch.id} did not finish within {self.max_wait}s")
+            return False
+        if batch.status != "completed":
+            raise BatchJobError(f"Batch {batch.id} ended with status {batch.status}: {batch.errors}")
+        return True
+
+    def run(self, requests: List[BatchRequest]) -> BatchResult:
+        """
+        Submit the requests as one batch job and block until its results are available.
+        """
+        responses, pending = self._split_cached(requests)
+        if not pending:
+            return BatchResult(responses=responses, errors={})
+
+        input_file = self.client.files.create(file=self._build_file(pending), purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT,
+                                           completion_window="24h")
+        logger.info(f"Submitted batch {batch.id} with {len(pending)} requests "
+                    f"({len(requests) - len(pending)} served from cache)")
+        started = time.monotonic()
+        while not self._check_finished(batch, started):
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        output_text = self.client.files.content(batch.output_file_id).text if batch.output_file_id else None
+        error_text = self.client.files.content(batch.error_file_id).text if batch.error_file_id else None
+        logger.info(f"Batch {batch.id} completed: {batch.request_counts}")
+        return self._collect(requests, responses, output_text, error_text)
+
+    async def run_async(self, requests: List[BatchRequest]) -> BatchResult:
+        """
+        Submit the requests as one batch job and poll without blocking the event loop.
+        """
+        responses, pending = self._split_cached(requests)
+        if not pending:
+            return BatchResult(responses=responses, errors={})
+
+        input_file = await self.async_client.files.create(file=self._build_file(pending), purpose="batch")
+        batch = await self.async_client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT,
+                                                       completion_window="24h")
+        logger.info(f"Submitted batch {batch.id} with {len(pending)} requests "
+                    f"({len(requests) - len(pending)} served from cache)")
+        started = time.monotonic()
+        while not self._check_finished(batch, started):
+            await asyncio.sleep(self.poll_interval)
+            batch = await self.async_client.batches.retrieve(batch.id)
+
+        output_text = (await self.async_client.files.content(batch.output_file_id)).text \
+            if batch.output_file_id else None
+        error_text = (await self.async_client.files.content(batch.error_file_id)).text \
+            if batch.error_file_id else None
+        logger.info(f"Batch {batch.id} completed: {batch.request_counts}")
+        return self._collect(requests, responses, output_text, error_text)
+
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING
+from pymongo.database import Database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_key(*parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable parts, e.g. a course outline, a chapter and video index and the video.
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Persists the finished units of a long generation (one video script or video quiz) so a failed or
+    interrupted run can be resumed without redoing them.
+
+    Checkpoints are optional at runtime: when MongoDB cannot be reached, generation carries on without
+    them and the database is tried again after `retry_after` seconds.
+    """
+
+    def __init__(self, database: Database, collection_name: str = "generation_checkpoints",
+                 ttl_days: float = 7, retry_after: float = 60.0):
+        """
+        :param database: MongoDB database holding the collection, e.g. the one of MongoChatClient.
+        :param collection_name: Collection of checkpoints.
+        :param ttl_days: Checkpoints are removed by MongoDB this many days after they were written.
+        :param retry_after: Seconds to wait before trying MongoDB again after a failure.
+        """
+        self.checkpoints = database[collection_name]
+        self.ttl_days = ttl_days
+        self.retry_after = retry_after
+        self._indexed = False
+        self._disabled_until = 0.0
+
+    @classmethod
+    def from_env(cls, database: Database) -> "CheckpointStore":
+        return cls(
+            database=database,
+            collection_name=os.getenv("CHECKPOINT_COLLECTION", "generation_checkpoints"),
+            ttl_days=float(os.getenv("CHECKPOINT_TTL_DAYS", 7)),
+        )
+
+    def _available(self) -> bool:
+        if time.monotonic() < self._disabled_until:
+            return False
+        if not self._indexed:
+            try:
+                self.checkpoints.create_index([("created_at", ASCENDING)],
+                                              expireAfterSeconds=int(self.ttl_days * 86400))
+                self._indexed = True
+            except Exception as e:
+                self._failed(e)
+                return False
+        return True
+
+    def _failed(self, error: Exception) -> None:
+        logger.warning(f"Checkpoint database unavailable, continuing without checkpoints: {error}")
+        self._disabled_until = time.monotonic() + self.retry_after
+
+    def load(self, kind: str, keys: List[str]) -> Dict[str, Any]:
+        """
+        :param kind: Kind of checkpoint, e.g. "video_script".
+        :param keys: Checkpoint keys to look up.
+        :return: Stored values of the keys that have a checkpoint.
+        """
+        if not keys or not self._available():
+            return {}
+        try:
+            documents = self.checkpoints.find({"_id": {"$in": keys}, "kind": kind}, {"value": 1})
+            return {document["_id"]: document["value"] for document in documents}
+        except Exception as e:
+            self._failed(e)
+            return {}
+
+    def save(self, kind: str, key: str, value: Any) -> None:
+        if not self._available():
+            return
+        try:
+            self.checkpoints.replace_one(
+                {"_id": key},
+                {"kind": kind, "value": value, "created_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+        except Exception as e:
+            self._failed(e)
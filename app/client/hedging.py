@@ -0,0 +1,265 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from app.client.llm_provider import LLMProvider, LLMProviderFactory
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Primary model -> where its hedge request goes. Re-issuing the same request to the same
+# model is the classic hedge; point it at another model or provider through LLM_HEDGE_TARGETS.
+DEFAULT_HEDGE_TARGETS = {
+    "gpt-4o-mini": {"provider": "openai", "model": "gpt-4o-mini"},
+}
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies for one call route.
+    """
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgedExecutor:
+    """
+    Issues a second, equivalent request when the primary is slower than usual.
+
+    The hedge is sent once the primary has been running longer than the configured percentile of
+    the latencies observed for the same route. The first valid (non-None) parsed response wins and
+    the other request is cancelled. Until enough samples exist, `initial_delay` is used.
+    """
+
+    def __init__(self, targets: Optional[dict] = None, percentile: float = 0.95, min_samples: int = 20,
+                 min_delay: float = 1.0, initial_delay: float = 60.0, window: int = 200, max_workers: int = 16):
+        """
+        :param targets: Mapping of primary model to {"provider": str, "model": str} for its hedge request.
+        :param percentile: Latency percentile after which the hedge is sent, between 0 and 1.
+        :param min_samples: Samples required on a route before the percentile is trusted.
+        :param min_delay: Lower bound of the hedge delay in seconds.
+        :param initial_delay: Hedge delay used while a route has fewer than `min_samples` samples.
+        :param window: Number of recent latencies kept per route.
+        :param max_workers: Threads used to run synchronous primary and hedge requests.
+        """
+        self.targets = {**DEFAULT_HEDGE_TARGETS, **(targets or {})}
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+        self._providers: dict[str, LLMProvider] = {}
+        self._latencies: dict[str, LatencyTracker] = {}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HedgedExecutor":
+        """
+        Read LLM_HEDGE_TARGETS (e.g. '{"gpt-4o-mini": {"provider": "mistral", "model": "mistral-small-latest"}}'),
+        LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES and LLM_HEDGE_INITIAL_DELAY.
+        """
+        raw_targets = os.getenv("LLM_HEDGE_TARGETS")
+        return cls(
+            targets=json.loads(raw_targets) if raw_targets else None,
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", 0.95)),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20)),
+            initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY", 60.0)),
+        )
+
+    def target(self, model: str) -> Optional[tuple[LLMProvider, str]]:
+        """
+        Provider and model the hedge of `model` is sent to, or None when the model is not hedged.
+        """
+        target = self.targets.get(model)
+        if not target:
+            return None
+        provider_type = target.get("provider", "openai")
+        with self._lock:
+            provider = self._providers.get(provider_type)
+            if provider is None:
+                provider = LLMProviderFactory.create_provider(provider_type)
+                self._providers[provider_type] = provider
+        return provider, target.get("model", model)
+
+    def _route(self, route: str) -> tuple[LatencyTracker, dict]:
+        with self._lock:
+            tracker = self._latencies.get(route)
+            if tracker is None:
+                tracker = LatencyTracker(self.window)
+                self._latencies[route] = tracker
+                self._stats[route] = {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "failures": 0}
+            return tracker, self._stats[route]
+
+    def hedge_delay(self, route: str) -> float:
+        tracker, _ = self._route(route)
+        with self._lock:
+            if len(tracker.samples) < self.min_samples:
+                return self.initial_delay
+            return max(self.min_delay, tracker.percentile(self.percentile))
+
+    def _record(self, route: str, key: str, latency: Optional[float] = None) -> None:
+        tracker, stats = self._route(route)
+        with self._lock:
+            stats[key] += 1
+            if latency is not None:
+                tracker.record(latency)
+
+    def call(self, route: str, primary: Callable[[], T], hedge: Callable[[], T]) -> T:
+        """
+        Run `primary` and, if it is slow, `hedge` on the hedge pool; return the first valid result.
+
+        A synchronous request that is already running cannot be interrupted, so the losing request is
+        cancelled if it has not started and otherwise left to finish with its result discarded.
+        The hedge delay and the latency samples are counted from the moment the primary starts
+        running, so time spent queued behind other calls on a busy pool never triggers a hedge.
+        """
+        delay = self.hedge_delay(route)
+        self._record(route, "calls")
+        primary_started = threading.Event()
+        start_times = {}
+
+        def run_primary():
+            start_times["primary"] = time.monotonic()
+            primary_started.set()
+            return primary()
+
+        primary_future = self.executor.submit(run_primary)
+        primary_started.wait()
+        started = start_times["primary"]
+        done, _ = wait([primary_future], timeout=max(0.0, started + delay - time.monotonic()))
+        if done:
+            return self._primary_result(route, primary_future, started)
+
+        self._record(route, "hedged")
+        logger.info(f"Hedging {route} after {delay:.2f}s")
+        labels = {primary_future: "primary", self.executor.submit(hedge): "hedge"}
+        pending = set(labels)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            result, error = self._pick_winner(route, done, pending, labels, started, error)
+            if result is not None:
+                for loser in pending:
+                    loser.cancel()
+                return result
+
+        self._record(route, "failures")
+        if error is not None:
+            raise error
+        return None
+
+    def _primary_result(self, route: str, future, started: float):
+        """
+        Result of a primary that finished before the hedge delay; failures are not latency samples.
+        """
+        if future.exception() is not None:
+            self._record(route, "failures")
+            raise future.exception()
+        self._record(route, "primary_wins", time.monotonic() - started)
+        return future.result()
+
+    def _pick_winner(self, route: str, done: set, pending: set, labels: dict, started: float,
+                     error: Optional[BaseException]) -> tuple:
+        """
+        Return the first valid result among the finished requests, and the last error seen.
+        """
+        for future in done:
+            if future.exception() is not None:
+                # Failures are not latency samples, so a fast-failing primary cannot shrink the hedge delay
+                error = future.exception()
+                continue
+            if labels[future] == "primary":
+                self._record_latency(route, time.monotonic() - started)
+            result = future.result()
+            if result is None:
+                continue
+            if any(labels[loser] == "primary" for loser in pending):
+                # The primary is still running: its elapsed time is a lower bound of its latency
+                self._record_latency(route, time.monotonic() - started)
+            self._record(route, f"{labels[future]}_wins")
+            return result, error
+        return None, error
+
+    async def call_async(self, route: str, primary: Callable[[], Awaitable[T]],
+                         hedge: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `primary` and, if it is slow, `hedge`; return the first valid result and cancel the other.
+        """
+        delay = self.hedge_delay(route)
+        self._record(route, "calls")
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        labels = {primary_task: "primary"}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done:
+                return self._primary_result(route, primary_task, started)
+
+            self._record(route, "hedged")
+            logger.info(f"Hedging {route} after {delay:.2f}s")
+            labels[asyncio.ensure_future(hedge())] = "hedge"
+            pending = set(labels)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                result, error = self._pick_winner(route, done, pending, labels, started, error)
+                if result is not None:
+                    return result
+        finally:
+            for task in labels:
+                if not task.done():
+                    task.cancel()
+
+        self._record(route, "failures")
+        if error is not None:
+            raise error
+        return None
+
+    def _record_latency(self, route: str, latency: float) -> None:
+        tracker, _ = self._route(route)
+        with self._lock:
+            tracker.record(latency)
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for route, stats in self._stats.items():
+                tracker = self._latencies[route]
+                hedged = stats["hedged"]
+                result[route] = {
+                    **stats,
+                    "hedge_rate": hedged / stats["calls"] if stats["calls"] else 0.0,
+                    "hedge_win_rate": stats["hedge_wins"] / hedged if hedged else 0.0,
+                    "hedge_delay": (max(self.min_delay, tracker.percentile(self.percentile))
+                                    if len(tracker.samples) >= self.min_samples else self.initial_delay),
+                    "samples": len(tracker.samples),
+                }
+            return result
+
+
+hedging = HedgedExecutor.from_env()
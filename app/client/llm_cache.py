@@ -0,0 +1,229 @@
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Type
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+_bypass_cache = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses: an in-memory LRU in front of an on-disk store.
+
+    Entries are keyed on the model, the full message list, the temperature and the JSON
+    schema of the response model, and stored as JSON text so they survive restarts and can
+    be shared by several workers pointing at the same directory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_items: int = 1024,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        """
+        :param cache_dir: Directory of the on-disk tier. The disk tier is disabled when empty.
+        :param memory_items: Maximum number of entries kept in the in-memory LRU.
+        :param max_disk_bytes: Size budget of the disk tier; least recently used files are evicted past it.
+        """
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.disk_evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            cache_dir=os.getenv("LLM_CACHE_DIR", ".llm_cache"),
+            memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", 1024)),
+            max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: list, temperature: Optional[float],
+                 response_format: Optional[Type[BaseModel]] = None) -> str:
+        """
+        Build a stable cache key for a completion request.
+        """
+        schema = response_format.model_json_schema() if response_format is not None else None
+        raw = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "schema": schema},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    @contextmanager
+    def bypass():
+        """
+        Skip the cache for every LLM call made inside this block (thread and task local).
+        """
+        token = _bypass_cache.set(True)
+        try:
+            yield
+        finally:
+            _bypass_cache.reset(token)
+
+    @staticmethod
+    def should_cache(temperature: Optional[float], use_cache: Optional[bool] = None) -> bool:
+        """
+        Deterministic (temperature 0) calls are cached by default; `use_cache` overrides that per call.
+        """
+        if _bypass_cache.get():
+            return False
+        if use_cache is not None:
+            return use_cache
+        return temperature == 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._remember(key, value)
+            self.writes += 1
+        self._write_disk(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        for path in self._disk_files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "disk_evictions": self.disk_evictions,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes or 0,
+            }
+
+    def _remember(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                value = file.read()
+            # Touch the file so eviction treats it as recently used
+            os.utime(path, None)
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read LLM cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: str) -> None:
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(value)
+            try:
+                # An existing entry is overwritten, so only the size difference is added
+                replaced_bytes = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced_bytes = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {key}: {e}")
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(os.path.getsize(p) for p in self._disk_files())
+            else:
+                self._disk_bytes += len(value.encode("utf-8")) - replaced_bytes
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _disk_files(self) -> list[str]:
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return []
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            files.extend(os.path.join(root, name) for name in names if name.endswith(".json"))
+        return files
+
+    def _evict_disk(self) -> None:
+        """
+        Delete least recently used files until the disk tier is back under 90% of its budget.
+        """
+        entries = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += evicted
+
+
+llm_cache = LLMResponseCache.from_env()
@@ -1,67 +1,164 @@
+import json
 import os
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import as_completed
-from typing import List
-from typing import Optional
+from typing import Iterator, List
+from typing import Optional, Type, TypeVar
 
 from dotenv import load_dotenv
 from openai import OpenAI
-from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+from pydantic import BaseModel
 
-from app.constant_manager import paragraph_generator, simplify_prompt, question_generation_prompt, paragraph_level, \
-    EMBEDDING_MODEL, quiz_note, translate_quiz_prompt, translate_content, translate_video_metadata
-from app.constant_manager import search_prompt, script_generator_prompt, generate_question_prompt, \
-    final_question_prompt, intro_script_prompt
+from app.client import llm_messages
+from app.client.batch_client import BatchRequest, OpenAIBatchRunner
+from app.client.hedging import HedgedExecutor, hedging
+from app.client.llm_cache import LLMResponseCache, llm_cache
+from app.client.llm_provider import LLMProvider, OpenAIProvider
+from app.client.rate_limiter import ModelRateLimiter, rate_limiter
+from app.client.resilience import ResilientExecutor, resilience
+from app.client.single_flight import SingleFlight, single_flight
+from app.client.transport import openai_http_client
+from app.constant_manager import EMBEDDING_MODEL
+from app.constant_manager import script_generator_prompt, intro_script_prompt
 from app.model.content_dto import CourseOutLines, VideoOutLines, ContentWithQuiz, LLMOutLines
 from app.model.llm_response import VideoContentLLMResponseList, QuestionResponse
-from app.model.llm_response_model import ParagraphResponse, SimplifyResponse, QuizResponse
+from app.model.llm_response_model import ParagraphResponse, SimplifyResponse, QuizResponse, PackedSimplifyResponse, \
+    TranslatedSegments
 from app.model.processing_models import SimplifyResults, TranslateP1Response, TranslateP2Response
 from app.model.translate_video_metadata import CourseWrapper, Chapter
 from app.request_schema.course_content_request import CourseOutlineRequest
+from app.utils.packing import estimate_text_tokens, pack_by_budget
 
 load_dotenv()
 
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# Expected output tokens of one packed simplify request; gpt-4o stops at 16k completion tokens
+SIMPLIFY_PACK_TOKEN_BUDGET = int(os.getenv("SIMPLIFY_PACK_TOKEN_BUDGET", 12000))
+SIMPLIFY_MAX_PACK_SIZE = int(os.getenv("SIMPLIFY_MAX_PACK_SIZE", 8))
+# Conservative generation speed used to size the per-attempt timeout of a packed simplify request
+SIMPLIFY_OUTPUT_TOKENS_PER_SECOND = float(os.getenv("SIMPLIFY_OUTPUT_TOKENS_PER_SECOND", 40))
+SEGMENT_PACK_TOKEN_BUDGET = int(os.getenv("SEGMENT_PACK_TOKEN_BUDGET", 4000))
+SEGMENT_MAX_PACK_SIZE = 200
+# Default model of translate_segments and translate_text; video translation passes the client's model
+SEGMENT_TRANSLATION_MODEL = os.getenv("SEGMENT_TRANSLATION_MODEL", "gpt-4o-mini")
+
 
 class OpenAITextProcessor:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o", max_workers: int = 5):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o", max_workers: int = 5,
+                 cache: Optional[LLMResponseCache] = None,
+                 limiter: Optional[ModelRateLimiter] = None,
+                 resilient_executor: Optional[ResilientExecutor] = None,
+                 hedged_executor: Optional[HedgedExecutor] = None,
+                 coalescer: Optional[SingleFlight] = None):
 
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, max_retries=0, http_client=openai_http_client())
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = cache or llm_cache
+        self.rate_limiter = limiter or rate_limiter
+        self.resilience = resilient_executor or resilience
+        self.hedging = hedged_executor or hedging
+        self.single_flight = coalescer or single_flight
+        self.provider = OpenAIProvider(client=self.client)
+        self.batch_runner = OpenAIBatchRunner.from_env(api_key=self.api_key, cache=self.cache)
+
+    def _parse(self, model: str, messages: list, response_format: Type[ResponseT],
+               temperature: float, timeout: Optional[float] = None,
+               use_cache: Optional[bool] = None, hedge: bool = False) -> ResponseT:
+        """
+        Single entry point for every structured-output completion.
+
+        Deterministic calls are served from the response cache when possible;
+        pass `use_cache` to force or skip caching for a single call. With `hedge`, a slow request is
+        raced against the hedge target configured for the model.
+        """
+        request_key = self.cache.make_key(model, messages, temperature, response_format)
+        cache_key = request_key if self.cache.should_cache(temperature, use_cache) else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return response_format.model_validate_json(cached)
+
+        def upstream():
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+            def request(provider: LLMProvider, request_model: str):
+                def attempt(attempt_timeout: float):
+                    self.rate_limiter.acquire(request_model, estimated_tokens)
+                    return provider.parse(
+                        model=request_model,
+                        messages=messages,
+                        response_format=response_format,
+                        temperature=temperature,
+                        timeout=attempt_timeout
+                    )
+
+                response = self.resilience.call(request_model, attempt, timeout=timeout)
+                self.rate_limiter.record_usage(request_model, estimated_tokens, response.usage)
+                return response.parsed
+
+            hedge_target = self.hedging.target(model) if hedge else None
+            if hedge_target is not None:
+                parsed = self.hedging.call(
+                    f"{model}:{response_format.__name__}",
+                    lambda: request(self.provider, model),
+                    lambda: request(*hedge_target)
+                )
+            else:
+                parsed = request(self.provider, model)
+
+            if cache_key is not None and parsed is not None:
+                self.cache.set(cache_key, parsed.model_dump_json())
+            return parsed
+
+        # Identical concurrent requests share one upstream call; followers get their own copy
+        return self.single_flight.do(request_key, upstream, copy=lambda parsed: parsed.model_copy(deep=True))
+
+    def _complete(self, model: str, messages: list, temperature: Optional[float] = None,
+                  use_cache: Optional[bool] = None) -> str:
+        """
+        Single entry point for every plain-text completion.
+        """
+        request_key = self.cache.make_key(model, messages, temperature)
+        cache_key = request_key if self.cache.should_cache(temperature, use_cache) else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return json.loads(cached)
+
+        def upstream():
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+            kwargs = {"temperature": temperature} if temperature is not None else {}
+
+            def attempt(attempt_timeout: float):
+                self.rate_limiter.acquire(model, estimated_tokens)
+                return self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=attempt_timeout,
+                    **kwargs
+                )
+
+            response = self.resilience.call(model, attempt)
+            self.rate_limiter.record_usage(model, estimated_tokens, response.usage)
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                self.cache.set(cache_key, json.dumps(content, ensure_ascii=False))
+            return content
+
+        # Identical concurrent requests share one upstream call
+        return self.single_flight.do(request_key, upstream)
 
     def generate_outline(self, course_details: CourseOutlineRequest, prompt: str) -> LLMOutLines:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=
-                        f"Create a professional course outline with the following specifications:\n\n"
-                        f"**Country**: {course_details.country}\n"
-                        f"**Source**: {course_details.source}\n"
-                        f"**Course Topic**: {course_details.course_name}\n"
-                        f"**Course Description Context**: {course_details.brief}\n"
-                        f"**Target Audience**: {course_details.target_audience}\n"
-                        f"**Course Level**: {course_details.course_level}\n"
-                        f"**Required Chapters**: {course_details.chapter_count}\n"
-                        f"**Total Videos**: {course_details.video_count} (including introduction and conclusion)\n"
-                        f"**Video Duration Range**: from {course_details.min_words_per_video} to {course_details.max_words_per_video} words per video (except intro/conclusion which should be 150 words)\n"
-                        f"**Target Skills**: {', '.join(course_details.skills) if course_details.skills else 'Generate appropriate skills based on course content'}\n\n"
-                        f"Distribute the {course_details.video_count} videos across {course_details.chapter_count} chapters, "
-                        f"with the first video being an introduction and the last video being a conclusion."
-                        f"Generate the outlines in {course_details.language} language"
-                    )
-                ],
+                messages=llm_messages.outline_messages(course_details, prompt),
                 response_format=LLMOutLines,
                 temperature=0.3
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             # More specific error handling
             print(f"Error generating course outline: {str(e)}")
@@ -72,25 +169,10 @@ class OpenAITextProcessor:
         Sends a prompt to the ChatGPT model with web search options and returns the response.
         """
         try:
-            result = self.client.chat.completions.create(
+            return self._complete(
                 model="gpt-4o-search-preview",
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=search_prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=
-                        f"## Video Name: {video.video_name}\n"
-                        f"## Video Description: {video.video_description}\n"
-                        f"## Video Keywords: {', '.join(video.video_source_knowledge) if video.video_source_knowledge else 'Generate appropriate keywords based on video content'}\n"
-                        f"## Video Skills: {', '.join(video.video_skill) if video.video_skill else 'Generate appropriate skills based on course content'}\n"
-                        f"## Video Objectives: {', '.join(video.video_objective) if video.video_objective else 'Generate appropriate objectives based on course content'}\n"
-                    )
-                ],
+                messages=llm_messages.raw_content_messages(video),
             )
-            return result.choices[0].message.content
         except Exception as e:
             print(f"Error during web search: {str(e)}")
             return None
@@ -102,36 +184,13 @@ class OpenAITextProcessor:
                 prompt = intro_script_prompt
             else:
                 prompt = prompt
-            response = self.client.beta.chat.completions.parse(
+            response = self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=
-                        f"Create a professional video script with the following specifications:\n\n"
-                        f"**Country**: {course.country}\n"
-                        f"**Course Topic**: {course.course_name}\n"
-                        f"**Course Description Context**: {course.course_description}\n"
-                        f"**Target Audience**: {course.target_audience}\n"
-                        f"**Course Level**: {course.course_level}\n"
-                        f"**Previous Video Name**: {video.previous_video_name}"
-                        f"**Video Name**: {video.video_name}\n"
-                        f"**Video Description**: {video.video_description}\n"
-                        f"**Video Objectives**: {', '.join(video.video_objective) if video.video_objective else 'This may be the introduction or conclusion video, so no specific objectives'}\n"
-                        f"**Video Skills**: {', '.join(video.video_skill) if video.video_skill else 'This may be the introduction or conclusion video, so no specific skills'}\n"
-                        f"**Video Duration Range**: {video.video_duration} words\n"
-                        f"Use the following raw content as a reference:\n{str(raw_content)}"
-                        f"Generate the script in {course.language} language"
-                    )
-                ],
+                messages=llm_messages.video_messages(course, video, raw_content, prompt),
                 response_format=VideoContentLLMResponseList,
                 temperature=0.3
             )
-            return response.choices[0].message.parsed.video_content
+            return response.video_content
         except Exception as e:
             raise e
 
@@ -143,30 +202,17 @@ class OpenAITextProcessor:
                 if i == 0 or i == len(video_content) - 1:
                     return ContentWithQuiz(paragraph=content, question=None)
 
-                paragraph_question = self.client.beta.chat.completions.parse(
+                paragraph_question = self._parse(
                     model=self.model,
-                    messages=[
-                        ChatCompletionSystemMessageParam(
-                            role="system",
-                            content=generate_question_prompt
-                        ),
-                        ChatCompletionUserMessageParam(
-                            role="user",
-                            content=f"## Course Name: {course_name}\n"
-                                    f"## Video Name: {video_name}\n"
-                                    f"## Skill: {skill}\n"
-                                    f"## Objective: {objective}\n"
-                                    f"## Paragraph Content: {content}\n"
-                                    f"Generate a quiz question based on the above paragraph content.\n"
-                        )
-                    ],
+                    messages=llm_messages.paragraph_question_messages(course_name, video_name, skill,
+                                                                      objective, content),
                     response_format=QuestionResponse,
                     temperature=0.3
                 )
 
                 return ContentWithQuiz(
                     paragraph=content,
-                    question=paragraph_question.choices[0].message.parsed.question
+                    question=paragraph_question.question
                 )
 
             with ThreadPoolExecutor(max_workers=8) as executor:
@@ -179,30 +225,17 @@ class OpenAITextProcessor:
                     except Exception as e:
                         print(f"Error generating question for paragraph {i}: {e}")
                         results[i] = ContentWithQuiz(paragraph=video_content[i], question=None)
-            video_quiz = self.client.beta.chat.completions.parse(
+            video_quiz = self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=final_question_prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=f"## Course Name: {course_name}\n"
-                                f"## Video Name: {video_name}\n"
-                                f"## Skill: {skill}\n"
-                                f"## Objective: {objective}\n"
-                                f"## Video Script: {str(video_content)}\n"
-                                f"Generate exactly **{question_per_video}** questions based on the video script content.\n"
-                    )
-                ],
+                messages=llm_messages.video_quiz_messages(course_name, video_name, skill, objective,
+                                                          video_content, question_per_video),
                 response_format=QuestionResponse,
                 temperature=0.3
             )
 
             return {
                 "content_with_question_list": results,
-                "video_quiz": video_quiz.choices[0].message.parsed.question
+                "video_quiz": video_quiz.question
             }
 
         except Exception as e:
@@ -212,262 +245,449 @@ class OpenAITextProcessor:
     def chat(self, messages: List, model: str = "gpt-4o",
              temperature: float = 0.7) -> str:
         try:
-            response = self.client.responses.create(
-                model=model,
-                input=messages,
-                temperature=temperature,
-            )
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+            def attempt(attempt_timeout: float):
+                self.rate_limiter.acquire(model, estimated_tokens)
+                return self.client.responses.create(
+                    model=model,
+                    input=messages,
+                    temperature=temperature,
+                    timeout=attempt_timeout
+                )
+
+            response = self.resilience.call(model, attempt)
+            self.rate_limiter.record_usage(model, estimated_tokens, response.usage)
             return response.output_text
         except Exception as e:
             print(f"Error during chat: {str(e)}")
             raise e
 
+    def chat_stream(self, messages: List, model: str = "gpt-4o",
+                    temperature: float = 0.7) -> Iterator[str]:
+        """
+        Stream the chat answer, yielding text deltas as the provider produces them.
+
+        Only opening the stream is retried; once tokens have been yielded a failure is raised to the caller.
+        """
+        try:
+            estimated_tokens = self.rate_limiter.estimate_tokens(messages)
+
+            def attempt(attempt_timeout: float):
+                self.rate_limiter.acquire(model, estimated_tokens)
+                return self.client.responses.create(
+                    model=model,
+                    input=messages,
+                    temperature=temperature,
+                    stream=True,
+                    timeout=attempt_timeout
+                )
+
+            stream = self.resilience.call(model, attempt)
+            with stream:
+                for event in stream:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+                    elif event.type == "response.completed":
+                        self.rate_limiter.record_usage(model, estimated_tokens, event.response.usage)
+                    elif event.type in ("response.failed", "response.error", "error"):
+                        raise RuntimeError(f"Chat stream failed: {event}")
+        except Exception as e:
+            print(f"Error during chat stream: {str(e)}")
+            raise e
+
     def get_embed(self, arabic_text: str):
-        embed = self.client.embeddings.create(
-            input=arabic_text,
-            model=EMBEDDING_MODEL
-        )
+        estimated_tokens = self.rate_limiter.estimate_tokens([{"content": arabic_text}], completion_tokens=0)
+
+        def attempt(attempt_timeout: float):
+            self.rate_limiter.acquire(EMBEDDING_MODEL, estimated_tokens)
+            return self.client.embeddings.create(
+                input=arabic_text,
+                model=EMBEDDING_MODEL,
+                timeout=attempt_timeout
+            )
+
+        embed = self.resilience.call(EMBEDDING_MODEL, attempt)
 
         return embed.data[0].embedding
 
     def get_paragraph(self, video: str, objective: list, skills: list) -> ParagraphResponse | None:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model="gpt-4o-mini",
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=paragraph_generator
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=f"##Script: {video}\n"
-                                f"##Paragraph Level: {paragraph_level}\n"
-                                f"##Objectives: {objective}\n"
-                                f"##Skills: {skills}\n##\n"
-                    )
-                ],
+                messages=llm_messages.paragraph_messages(video, objective, skills),
                 temperature=0,
                 response_format=ParagraphResponse,
-                timeout=600
+                # The whole script is echoed back, so allow a longer attempt than the default
+                timeout=300,
+                # Latency of this call has a long tail; race stragglers against a second request
+                hedge=True
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
 
     def simplify(self, paragraph: str, language: str) -> SimplifyResponse | None:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=simplify_prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=f"##Script: {paragraph}\n##\n##Answer in {language} language:\n##\n"
-                    )
-                ],
+                messages=llm_messages.simplify_messages(paragraph, language),
                 temperature=0,
-                response_format=SimplifyResponse,
-                timeout=600
+                response_format=SimplifyResponse
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
 
+    def simplify_packed(self, paragraphs: List[dict], language: str,
+                        token_budget: int = SIMPLIFY_PACK_TOKEN_BUDGET,
+                        max_pack_size: int = SIMPLIFY_MAX_PACK_SIZE) -> dict[str, SimplifyResponse]:
+        """
+        Simplify several paragraphs per request instead of one request per paragraph.
+
+        Paragraphs are packed so the expected output of each request stays within `token_budget`.
+        Paragraphs missing from a packed answer, or every paragraph of a malformed one, are
+        simplified one by one instead.
+
+        :param paragraphs: Items with `paragraph_id` and `paragraph` keys, all written in `language`.
+        :return: Simplifications keyed by paragraph_id.
+        """
+        packs = pack_by_budget(paragraphs, simplify_output_tokens, token_budget, max_pack_size)
+        futures = [self.executor.submit(self._simplify_pack, pack, language) for pack in packs]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def _simplify_pack(self, pack: List[dict], language: str) -> dict[str, SimplifyResponse]:
+        if len(pack) == 1:
+            return {pack[0]['paragraph_id']: self.simplify(pack[0]['paragraph'], language)}
+        try:
+            response = self._parse(
+                model=self.model,
+                messages=llm_messages.simplify_packed_messages(pack, language),
+                temperature=0,
+                response_format=PackedSimplifyResponse,
+                timeout=simplify_pack_timeout(pack)
+            )
+        except Exception as e:
+            print(f"Packed simplify of {len(pack)} paragraphs failed: {str(e)}")
+            response = None
+
+        results = unpack_simplify_response(pack, response)
+        missing = [p for p in pack if p['paragraph_id'] not in results]
+        if missing:
+            print(f"Packed simplify returned {len(pack) - len(missing)}/{len(pack)} paragraphs; "
+                  f"simplifying the rest one by one")
+        for paragraph in missing:
+            results[paragraph['paragraph_id']] = self.simplify(paragraph['paragraph'], language)
+        return results
+
     def translate_quiz(self, quiz, language: str) -> QuizResponse:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model="gpt-4o-mini",
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=translate_quiz_prompt.replace("{language}", language)
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=quiz
-                    )
-                ],
+                messages=llm_messages.translate_quiz_messages(quiz, language),
                 temperature=0,
-                response_format=QuizResponse,
-                timeout=600
+                response_format=QuizResponse
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
 
     def translate_content(self, video_data, language: str) -> SimplifyResults | None:
         try:
-            p1_translate = {
-                "video_id": video_data['video_id'],
-                "objective": video_data['objective'],
-                "language": language,
-                "paragraph_id": video_data['paragraph_id'],
-                "paragraph": video_data['paragraph'],
-                "paragraph_level": video_data['paragraph_level'],
-                "start_word": video_data['start_word'],
-                "end_word": video_data['end_word'],
-                "skills": video_data['skills'],
-                "simplify1_id": video_data['simplify1_id'],
-                "simplify1": video_data['simplify1'],
-                "simplify1_first_word": video_data['simplify1_first_word'],
-                "simplify1_last_word": video_data['simplify1_last_word']
-            }
-            response = self.client.beta.chat.completions.parse(
+            p1_translate = llm_messages.translate_content_p1(video_data, language)
+            p1_translate_response = self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=translate_content.replace("{language}", language)
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=str(p1_translate)
-                    )
-                ],
+                messages=llm_messages.translate_content_messages(p1_translate, language),
                 temperature=0,
-                response_format=TranslateP1Response,
-                timeout=600
+                response_format=TranslateP1Response
             )
 
-            # Extract the translated content from the response
-            p1_translate_response = response.choices[0].message.parsed
-
-            p2_translate = {
-                "simplify2_id": video_data['simplify2_id'],
-                "simplify2": video_data['simplify2'],
-                "simplify2_first_word": video_data['simplify2_first_word'],
-                "simplify2_last_word": video_data['simplify2_last_word'],
-                "simplify3_id": video_data['simplify3_id'],
-                "simplify3": video_data['simplify3'],
-                "simplify3_first_word": video_data['simplify3_first_word'],
-                "simplify3_last_word": video_data['simplify3_last_word']
-            }
-            response = self.client.beta.chat.completions.parse(
+            p2_translate = llm_messages.translate_content_p2(video_data)
+            p2_translate_response = self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=translate_content.replace("{language}", language)
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=str(p2_translate)
-                    )
-                ],
+                messages=llm_messages.translate_content_messages(p2_translate, language),
                 temperature=0,
-                response_format=TranslateP2Response,
-                timeout=600
-            )
-            p2_translate_response = response.choices[0].message.parsed
-            return SimplifyResults(
-                video_id=p1_translate_response.video_id,
-                objective=p1_translate_response.objective,
-                language=language,
-                paragraph_id=p1_translate_response.paragraph_id,
-                paragraph=p1_translate_response.paragraph,
-                paragraph_level=p1_translate_response.paragraph_level,
-                start_word=p1_translate_response.start_word,
-                end_word=p1_translate_response.end_word,
-                skills=p1_translate_response.skills,
-                simplify1_id=p1_translate_response.simplify1_id,
-                simplify1=p1_translate_response.simplify1,
-                simplify1_first_word=p1_translate_response.simplify1_first_word,
-                simplify1_last_word=p1_translate_response.simplify1_last_word,
-                simplify2_id=p2_translate_response.simplify2_id,
-                simplify2=p2_translate_response.simplify2,
-                simplify2_first_word=p2_translate_response.simplify2_first_word,
-                simplify2_last_word=p2_translate_response.simplify2_last_word,
-                simplify3_id=p2_translate_response.simplify3_id,
-                simplify3=p2_translate_response.simplify3,
-                simplify3_first_word=p2_translate_response.simplify3_first_word,
-                simplify3_last_word=p2_translate_response.simplify3_last_word
+                response_format=TranslateP2Response
             )
+            return merge_translated_content(p1_translate_response, p2_translate_response, language)
         except Exception as e:
             raise e
 
     def translate_chapter_meta(self, chapter_data: Chapter, language: str) -> Chapter:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=translate_video_metadata.replace("{language}", language)
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=str(chapter_data)
-                    )
-                ],
+                messages=llm_messages.translate_metadata_messages(chapter_data, language),
                 temperature=0,
-                response_format=Chapter,
-                timeout=600
+                response_format=Chapter
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
 
-    def translate_text(self, text: str, language: str) -> str:
+    def translate_segments(self, segments: List[str], language: str,
+                           token_budget: int = SEGMENT_PACK_TOKEN_BUDGET, model: Optional[str] = None) -> List[str]:
+        """
+        Translate short, independent text segments (names, titles, options) in as few requests as possible.
+
+        Segments are sent as an indexed JSON list, chunked to `token_budget`. Segments missing from an
+        answer are translated one by one with `translate_text`.
+
+        :param model: Model to translate with; SEGMENT_TRANSLATION_MODEL when omitted.
+        :return: Translations in the order of `segments`.
+        """
+        model = model or SEGMENT_TRANSLATION_MODEL
+        items = [{"index": index, "text": text} for index, text in enumerate(segments)]
+        packs = pack_by_budget(items, segment_tokens, token_budget, SEGMENT_MAX_PACK_SIZE)
+        translations: dict[int, str] = {}
+        for pack in packs:
+            try:
+                response = self._parse(
+                    model=model,
+                    messages=llm_messages.translate_segments_messages(pack, language),
+                    temperature=0,
+                    response_format=TranslatedSegments
+                )
+                translations.update(unpack_segments_response(pack, response))
+            except Exception as e:
+                print(f"Segment translation of {len(pack)} segments failed: {str(e)}")
+        for index, text in enumerate(segments):
+            if index not in translations:
+                translations[index] = self.translate_text(text, language, model=model)
+        return [translations[index] for index in range(len(segments))]
+
+    def translate_text(self, text: str, language: str, model: Optional[str] = None) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"Translate the following text to {language}."},
-                    {"role": "user", "content": text}
-                ],
+            response = self._complete(
+                model=model or SEGMENT_TRANSLATION_MODEL,
+                messages=llm_messages.translate_text_messages(text, language),
                 temperature=0
             )
-            return response.choices[0].message.content.strip()
+            return response.strip()
         except Exception as e:
             raise e
 
     def translate_video_meta(self, video_data, language: str) -> CourseWrapper | None:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=translate_video_metadata.replace("{language}", language)
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=str(video_data)
-                    )
-                ],
+                messages=llm_messages.translate_metadata_messages(video_data, language),
                 temperature=0,
-                response_format=CourseWrapper,
-                timeout=600
+                response_format=CourseWrapper
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
 
     def generate_quiz(self, paragraph_content, skills: list, objective: list, language: str) -> QuizResponse:
         try:
-            response = self.client.beta.chat.completions.parse(
+            return self._parse(
                 model=self.model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content=question_generation_prompt
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=f"{quiz_note}\n"
-                                f"##Script: {paragraph_content}\n"
-                                f"##Skills: {skills}\n##Objectives: {objective}\n##\n"
-                                f"##Answer in {language} language:\n##\n"
-                    )
-                ],
+                messages=llm_messages.quiz_messages(paragraph_content, skills, objective, language),
                 temperature=0,
-                response_format=QuizResponse,
-                timeout=600
+                response_format=QuizResponse
             )
-            return response.choices[0].message.parsed
         except Exception as e:
             raise e
+
+
+    def _run_batch(self, requests: List[BatchRequest]) -> list:
+        """
+        Execute the requests through the Batch API; entries the batch failed are retried interactively.
+        """
+        result = self.batch_runner.run(requests)
+        if result.errors:
+            print(f"{len(result.errors)} batch requests failed, retrying them interactively")
+        return [
+            response if response is not None else self._parse(
+                model=request.model,
+                messages=request.messages,
+                response_format=request.response_format,
+                temperature=request.temperature
+            )
+            for request, response in zip(requests, result.responses)
+        ]
+
+    def simplify_batch(self, paragraphs: List[dict]) -> List[SimplifyResponse]:
+        """
+        :param paragraphs: Keyword arguments of `simplify` for every paragraph.
+        """
+        return self._run_batch([
+            BatchRequest(model=self.model,
+                         messages=llm_messages.simplify_messages(**paragraph),
+                         response_format=SimplifyResponse)
+            for paragraph in paragraphs
+        ])
+
+    def generate_quiz_batch(self, paragraphs: List[dict]) -> List[QuizResponse]:
+        """
+        :param paragraphs: Keyword arguments of `generate_quiz` for every paragraph.
+        """
+        return self._run_batch([
+            BatchRequest(model=self.model,
+                         messages=llm_messages.quiz_messages(**paragraph),
+                         response_format=QuizResponse)
+            for paragraph in paragraphs
+        ])
+
+    def translate_quiz_batch(self, quizzes: List[str], language: str) -> List[QuizResponse]:
+        return self._run_batch([
+            BatchRequest(model="gpt-4o-mini",
+                         messages=llm_messages.translate_quiz_messages(quiz, language),
+                         response_format=QuizResponse)
+            for quiz in quizzes
+        ])
+
+    def translate_content_batch(self, video_data: List[dict], language: str) -> List[SimplifyResults]:
+        requests = []
+        for item in video_data:
+            requests.append(BatchRequest(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(
+                    llm_messages.translate_content_p1(item, language), language),
+                response_format=TranslateP1Response))
+            requests.append(BatchRequest(
+                model=self.model,
+                messages=llm_messages.translate_content_messages(
+                    llm_messages.translate_content_p2(item), language),
+                response_format=TranslateP2Response))
+        responses = self._run_batch(requests)
+        return [merge_translated_content(responses[i], responses[i + 1], language)
+                for i in range(0, len(responses), 2)]
+
+    def generate_quiz_3c_batch(self, videos: List[dict]) -> List[dict]:
+        """
+        Batch counterpart of `generate_quiz_3c` for a whole course.
+
+        :param videos: Keyword arguments of `generate_quiz_3c` for every video.
+        :return: One `generate_quiz_3c` style result per video, in order.
+        """
+        requests = []
+        question_slots = []
+        for video_index, video in enumerate(videos):
+            content = video["video_content"]
+            for i, paragraph in enumerate(content):
+                if i == 0 or i == len(content) - 1:
+                    continue
+                requests.append(BatchRequest(
+                    model=self.model,
+                    messages=llm_messages.paragraph_question_messages(
+                        video["course_name"], video["video_name"], video["skill"], video["objective"], paragraph),
+                    response_format=QuestionResponse,
+                    temperature=0.3))
+                question_slots.append((video_index, i))
+        for video in videos:
+            requests.append(BatchRequest(
+                model=self.model,
+                messages=llm_messages.video_quiz_messages(
+                    video["course_name"], video["video_name"], video["skill"], video["objective"],
+                    video["video_content"], video["question_per_video"]),
+                response_format=QuestionResponse,
+                temperature=0.3))
+
+        result = self.batch_runner.run(requests)
+        paragraph_results = [[ContentWithQuiz(paragraph=paragraph, question=None)
+                              for paragraph in video["video_content"]] for video in videos]
+        for (video_index, i), request, response in zip(question_slots, requests, result.responses):
+            if response is None:
+                # Match generate_quiz_3c: a failed paragraph question leaves the paragraph without one
+                try:
+                    response = self._parse(model=request.model, messages=request.messages,
+                                           response_format=QuestionResponse, temperature=request.temperature)
+                except Exception as e:
+                    print(f"Error generating question for paragraph {i}: {e}")
+                    continue
+            paragraph_results[video_index][i].question = response.question
+
+        final_requests = requests[len(question_slots):]
+        final_responses = result.responses[len(question_slots):]
+        video_quizzes = [
+            response if response is not None else self._parse(
+                model=request.model, messages=request.messages,
+                response_format=QuestionResponse, temperature=request.temperature)
+            for request, response in zip(final_requests, final_responses)
+        ]
+        return [
+            {"content_with_question_list": paragraph_results[video_index],
+             "video_quiz": video_quizzes[video_index].question}
+            for video_index in range(len(videos))
+        ]
+
+
+def simplify_output_tokens(paragraph: dict) -> int:
+    """
+    Expected completion tokens for one paragraph: three versions of growing length plus the word markers.
+    """
+    return 6 * estimate_text_tokens(paragraph['paragraph']) + 150
+
+
+def simplify_pack_timeout(pack: List[dict]) -> float:
+    """
+    Per-attempt timeout of a packed simplify request, long enough to generate its expected output.
+
+    A full pack takes minutes at normal speed, so the default attempt timeout of the model would cut it
+    off and send every paragraph through the one-by-one fallback.
+    """
+    expected_tokens = sum(simplify_output_tokens(paragraph) for paragraph in pack)
+    return 60.0 + expected_tokens / SIMPLIFY_OUTPUT_TOKENS_PER_SECOND
+
+
+def unpack_simplify_response(pack: List[dict], response: Optional[PackedSimplifyResponse]) -> dict[str, SimplifyResponse]:
+    """
+    Map a packed answer back to its paragraphs, keeping only complete entries for requested paragraph ids.
+    """
+    if response is None:
+        return {}
+    expected = {paragraph['paragraph_id'] for paragraph in pack}
+    results = {}
+    for item in response.simplified:
+        simplified = SimplifyResponse(**item.model_dump(exclude={'paragraph_id'}))
+        if item.paragraph_id in expected and all(simplified.model_dump().values()):
+            results.setdefault(item.paragraph_id, simplified)
+    return results
+
+
+def segment_tokens(segment: dict) -> int:
+    """
+    Expected prompt plus completion tokens of one segment in a packed translation.
+    """
+    return 2 * estimate_text_tokens(segment['text']) + 20
+
+
+def unpack_segments_response(pack: List[dict], response: Optional[TranslatedSegments]) -> dict[int, str]:
+    """
+    Map a packed segment translation back to segment indexes, ignoring unknown or empty entries.
+    """
+    if response is None:
+        return {}
+    expected = {segment['index'] for segment in pack}
+    return {item.index: item.text.strip() for item in response.segments
+            if item.index in expected and item.text.strip()}
+
+
+def merge_translated_content(p1_translate_response: TranslateP1Response, p2_translate_response: TranslateP2Response,
+                             language: str) -> SimplifyResults:
+    """
+    Combine the two halves of a translated paragraph into a single SimplifyResults.
+    """
+    return SimplifyResults(
+        video_id=p1_translate_response.video_id,
+        objective=p1_translate_response.objective,
+        language=language,
+        paragraph_id=p1_translate_response.paragraph_id,
+        paragraph=p1_translate_response.paragraph,
+        paragraph_level=p1_translate_response.paragraph_level,
+        start_word=p1_translate_response.start_word,
+        end_word=p1_translate_response.end_word,
+        skills=p1_translate_response.skills,
+        simplify1_id=p1_translate_response.simplify1_id,
+        simplify1=p1_translate_response.simplify1,
+        simplify1_first_word=p1_translate_response.simplify1_first_word,
+        simplify1_last_word=p1_translate_response.simplify1_last_word,
+        simplify2_id=p2_translate_response.simplify2_id,
+        simplify2=p2_translate_response.simplify2,
+        simplify2_first_word=p2_translate_response.simplify2_first_word,
+        simplify2_last_word=p2_translate_response.simplify2_last_word,
+        simplify3_id=p2_translate_response.simplify3_id,
+        simplify3=p2_translate_response.simplify3,
+        simplify3_first_word=p2_translate_response.simplify3_first_word,
+        simplify3_last_word=p2_translate_response.simplify3_last_word
+    )
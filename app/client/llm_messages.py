@@ -0,0 +1,275 @@
+import json
+from typing import List
+
+from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+
+from app.constant_manager import paragraph_generator, simplify_prompt, question_generation_prompt, paragraph_level, \
+    quiz_note, translate_quiz_prompt, translate_content, translate_video_metadata, simplify_packed_note, \
+    translate_segments_prompt
+from app.constant_manager import search_prompt, generate_question_prompt, final_question_prompt
+from app.model.content_dto import CourseOutLines, VideoOutLines
+from app.request_schema.course_content_request import CourseOutlineRequest
+
+
+def outline_messages(course_details: CourseOutlineRequest, prompt: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=
+            f"Create a professional course outline with the following specifications:\n\n"
+            f"**Country**: {course_details.country}\n"
+            f"**Source**: {course_details.source}\n"
+            f"**Course Topic**: {course_details.course_name}\n"
+            f"**Course Description Context**: {course_details.brief}\n"
+            f"**Target Audience**: {course_details.target_audience}\n"
+            f"**Course Level**: {course_details.course_level}\n"
+            f"**Required Chapters**: {course_details.chapter_count}\n"
+            f"**Total Videos**: {course_details.video_count} (including introduction and conclusion)\n"
+            f"**Video Duration Range**: from {course_details.min_words_per_video} to {course_details.max_words_per_video} words per video (except intro/conclusion which should be 150 words)\n"
+            f"**Target Skills**: {', '.join(course_details.skills) if course_details.skills else 'Generate appropriate skills based on course content'}\n\n"
+            f"Distribute the {course_details.video_count} videos across {course_details.chapter_count} chapters, "
+            f"with the first video being an introduction and the last video being a conclusion."
+            f"Generate the outlines in {course_details.language} language"
+        )
+    ]
+
+
+def raw_content_messages(video: VideoOutLines) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=search_prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=
+            f"## Video Name: {video.video_name}\n"
+            f"## Video Description: {video.video_description}\n"
+            f"## Video Keywords: {', '.join(video.video_source_knowledge) if video.video_source_knowledge else 'Generate appropriate keywords based on video content'}\n"
+            f"## Video Skills: {', '.join(video.video_skill) if video.video_skill else 'Generate appropriate skills based on course content'}\n"
+            f"## Video Objectives: {', '.join(video.video_objective) if video.video_objective else 'Generate appropriate objectives based on course content'}\n"
+        )
+    ]
+
+
+def video_messages(course: CourseOutLines, video: VideoOutLines, raw_content: List[str], prompt: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=
+            f"Create a professional video script with the following specifications:\n\n"
+            f"**Country**: {course.country}\n"
+            f"**Course Topic**: {course.course_name}\n"
+            f"**Course Description Context**: {course.course_description}\n"
+            f"**Target Audience**: {course.target_audience}\n"
+            f"**Course Level**: {course.course_level}\n"
+            f"**Previous Video Name**: {video.previous_video_name}"
+            f"**Video Name**: {video.video_name}\n"
+            f"**Video Description**: {video.video_description}\n"
+            f"**Video Objectives**: {', '.join(video.video_objective) if video.video_objective else 'This may be the introduction or conclusion video, so no specific objectives'}\n"
+            f"**Video Skills**: {', '.join(video.video_skill) if video.video_skill else 'This may be the introduction or conclusion video, so no specific skills'}\n"
+            f"**Video Duration Range**: {video.video_duration} words\n"
+            f"Use the following raw content as a reference:\n{str(raw_content)}"
+            f"Generate the script in {course.language} language"
+        )
+    ]
+
+
+def paragraph_question_messages(course_name: str, video_name: str, skill: str, objective: str,
+                                content: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=generate_question_prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"## Course Name: {course_name}\n"
+                    f"## Video Name: {video_name}\n"
+                    f"## Skill: {skill}\n"
+                    f"## Objective: {objective}\n"
+                    f"## Paragraph Content: {content}\n"
+                    f"Generate a quiz question based on the above paragraph content.\n"
+        )
+    ]
+
+
+def video_quiz_messages(course_name: str, video_name: str, skill: str, objective: str,
+                        video_content: list[str], question_per_video: int) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=final_question_prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"## Course Name: {course_name}\n"
+                    f"## Video Name: {video_name}\n"
+                    f"## Skill: {skill}\n"
+                    f"## Objective: {objective}\n"
+                    f"## Video Script: {str(video_content)}\n"
+                    f"Generate exactly **{question_per_video}** questions based on the video script content.\n"
+        )
+    ]
+
+
+def paragraph_messages(video: str, objective: list, skills: list) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=paragraph_generator
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"##Script: {video}\n"
+                    f"##Paragraph Level: {paragraph_level}\n"
+                    f"##Objectives: {objective}\n"
+                    f"##Skills: {skills}\n##\n"
+        )
+    ]
+
+
+def simplify_messages(paragraph: str, language: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=simplify_prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"##Script: {paragraph}\n##\n##Answer in {language} language:\n##\n"
+        )
+    ]
+
+
+def simplify_packed_messages(paragraphs: List[dict], language: str) -> list:
+    """
+    :param paragraphs: Items with `paragraph_id` and `paragraph` keys.
+    """
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=simplify_prompt + simplify_packed_note
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"##Scripts: {json.dumps(paragraphs, ensure_ascii=False)}\n##\n##Answer in {language} language:\n##\n"
+        )
+    ]
+
+
+def translate_quiz_messages(quiz: str, language: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=translate_quiz_prompt.replace("{language}", language)
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=quiz
+        )
+    ]
+
+
+def translate_content_p1(video_data: dict, language: str) -> dict:
+    return {
+        "video_id": video_data['video_id'],
+        "objective": video_data['objective'],
+        "language": language,
+        "paragraph_id": video_data['paragraph_id'],
+        "paragraph": video_data['paragraph'],
+        "paragraph_level": video_data['paragraph_level'],
+        "start_word": video_data['start_word'],
+        "end_word": video_data['end_word'],
+        "skills": video_data['skills'],
+        "simplify1_id": video_data['simplify1_id'],
+        "simplify1": video_data['simplify1'],
+        "simplify1_first_word": video_data['simplify1_first_word'],
+        "simplify1_last_word": video_data['simplify1_last_word']
+    }
+
+
+def translate_content_p2(video_data: dict) -> dict:
+    return {
+        "simplify2_id": video_data['simplify2_id'],
+        "simplify2": video_data['simplify2'],
+        "simplify2_first_word": video_data['simplify2_first_word'],
+        "simplify2_last_word": video_data['simplify2_last_word'],
+        "simplify3_id": video_data['simplify3_id'],
+        "simplify3": video_data['simplify3'],
+        "simplify3_first_word": video_data['simplify3_first_word'],
+        "simplify3_last_word": video_data['simplify3_last_word']
+    }
+
+
+def translate_content_messages(payload: dict, language: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=translate_content.replace("{language}", language)
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=str(payload)
+        )
+    ]
+
+
+def translate_metadata_messages(data, language: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=translate_video_metadata.replace("{language}", language)
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=str(data)
+        )
+    ]
+
+
+def translate_text_messages(text: str, language: str) -> list:
+    return [
+        {"role": "system", "content": f"Translate the following text to {language}."},
+        {"role": "user", "content": text}
+    ]
+
+
+def translate_segments_messages(segments: List[dict], language: str) -> list:
+    """
+    :param segments: Items with `index` and `text` keys.
+    """
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=translate_segments_prompt.replace("{language}", language)
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=json.dumps(segments, ensure_ascii=False)
+        )
+    ]
+
+
+def quiz_messages(paragraph_content, skills: list, objective: list, language: str) -> list:
+    return [
+        ChatCompletionSystemMessageParam(
+            role="system",
+            content=question_generation_prompt
+        ),
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=f"{quiz_note}\n"
+                    f"##Script: {paragraph_content}\n"
+                    f"##Skills: {skills}\n##Objectives: {objective}\n##\n"
+                    f"##Answer in {language} language:\n##\n"
+        )
+    ]
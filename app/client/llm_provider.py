@@ -0,0 +1,181 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Generic, Optional, Type, TypeVar
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel
+
+from app.client.transport import async_http_client_from_env, http_client_from_env, openai_async_http_client, \
+    openai_http_client
+
+load_dotenv()
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+class ProviderResponse(Generic[ResponseT]):
+    """
+    Parsed structured output of one provider call together with the usage it reported.
+    """
+
+    def __init__(self, parsed: Optional[ResponseT], usage: Any, provider: str, model: str):
+        self.parsed = parsed
+        self.usage = usage
+        self.provider = provider
+        self.model = model
+
+
+class LLMProvider(ABC):
+    """
+    Abstract base class for providers able to answer a structured-output chat request.
+
+    Implementations perform exactly one request per call; retries, rate limiting and caching
+    are handled by the text processors around them.
+    """
+
+    name: str
+
+    @abstractmethod
+    def parse(self, model: str, messages: list, response_format: Type[ResponseT],
+              temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        """
+        Send the messages and parse the answer into `response_format`.
+
+        :param model: Provider specific model name.
+        :param messages: Chat messages in the OpenAI role / content format.
+        :param response_format: Pydantic model describing the expected output.
+        :param temperature: Sampling temperature.
+        :param timeout: Timeout of the request in seconds.
+        :return: The parsed response; `parsed` is None when the model refused to answer.
+        """
+        pass
+
+    @abstractmethod
+    async def parse_async(self, model: str, messages: list, response_format: Type[ResponseT],
+                          temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        """
+        Coroutine version of `parse`. Cancelling the coroutine aborts the HTTP request.
+        """
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, client: Optional[OpenAI] = None,
+                 async_client: Optional[AsyncOpenAI] = None):
+        """
+        :param api_key: OpenAI API key, read from OPENAI_API_KEY when omitted.
+        :param client: Existing synchronous client to reuse.
+        :param async_client: Existing asynchronous client to reuse.
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._client = client
+        self._async_client = async_client
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=self.api_key, max_retries=0, http_client=openai_http_client())
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, max_retries=0,
+                                             http_client=openai_async_http_client())
+        return self._async_client
+
+    def parse(self, model: str, messages: list, response_format: Type[ResponseT],
+              temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        response = self.client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            temperature=temperature,
+            timeout=timeout
+        )
+        return ProviderResponse(response.choices[0].message.parsed, response.usage, self.name, model)
+
+    async def parse_async(self, model: str, messages: list, response_format: Type[ResponseT],
+                          temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        response = await self.async_client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            temperature=temperature,
+            timeout=timeout
+        )
+        return ProviderResponse(response.choices[0].message.parsed, response.usage, self.name, model)
+
+
+class MistralProvider(LLMProvider):
+    name = "mistral"
+
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        :param api_key: Mistral API key, read from MISTRAL_API_KEY when omitted.
+        """
+        from mistralai import Mistral
+
+        self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
+        if not self.api_key:
+            raise ValueError("API key is required for Mistral provider.")
+        self.client = Mistral(api_key=self.api_key, client=http_client_from_env(),
+                              async_client=async_http_client_from_env())
+
+    def parse(self, model: str, messages: list, response_format: Type[ResponseT],
+              temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        response = self.client.chat.parse(
+            response_format=response_format,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            timeout_ms=int(timeout * 1000)
+        )
+        return ProviderResponse(response.choices[0].message.parsed, response.usage, self.name, model)
+
+    async def parse_async(self, model: str, messages: list, response_format: Type[ResponseT],
+                          temperature: float, timeout: float) -> ProviderResponse[ResponseT]:
+        response = await self.client.chat.parse_async(
+            response_format=response_format,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            timeout_ms=int(timeout * 1000)
+        )
+        return ProviderResponse(response.choices[0].message.parsed, response.usage, self.name, model)
+
+
+class ProviderEnum:
+    """
+    Enum class for the supported LLM providers.
+    """
+    OPENAI = 'openai'
+    MISTRAL = 'mistral'
+
+
+class LLMProviderFactory:
+    """
+    Factory class for creating LLM provider instances.
+    """
+
+    @staticmethod
+    def create_provider(provider_type: str, **kwargs) -> LLMProvider:
+        """
+        Create an LLM provider based on the specified type.
+
+        :param provider_type: Type of the provider (e.g., 'openai', 'mistral').
+        :param kwargs: Additional parameters for the provider initialization.
+        :return: An instance of the specified provider.
+        """
+        if provider_type == ProviderEnum.OPENAI:
+            return OpenAIProvider(**kwargs)
+        if provider_type == ProviderEnum.MISTRAL:
+            try:
+                return MistralProvider(**kwargs)
+            except Exception as e:
+                raise ValueError(f"Failed to create Mistral provider: {e}")
+        raise ValueError(f"Unsupported LLM provider: {provider_type}. "
+                         f"Supported providers are: {ProviderEnum.OPENAI}, {ProviderEnum.MISTRAL}.")
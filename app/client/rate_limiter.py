@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Requests-per-minute and tokens-per-minute budgets per model. None are assumed: provider limits depend
+# on the account tier, so they come from LLM_RATE_LIMITS and models without an entry are not limited
+DEFAULT_RATE_LIMITS: dict = {}
+
+# Completion allowance reserved up front, reconciled with the real usage after the call
+DEFAULT_COMPLETION_TOKENS = 1024
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket holding at most `capacity` units, refilled at `capacity` per minute.
+
+    Callers reserve units up front; the balance may go negative, in which case the caller is told
+    how long to wait for its reservation to be covered. This keeps callers in FIFO order without
+    holding the lock while they sleep.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take `amount` units from the bucket and return the number of seconds to wait before using them.
+        """
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def adjust(self, amount: float, now: float) -> None:
+        """
+        Give back (positive) or take (negative) units after the real cost of a call is known.
+        """
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ModelRateLimiter:
+    """
+    Process-wide limiter enforcing requests-per-minute and tokens-per-minute budgets per model.
+
+    Both the thread-based and the coroutine-based LLM clients acquire from the same instance, so
+    every call site in the process shares one budget per model.
+    """
+
+    def __init__(self, limits: Optional[dict] = None):
+        """
+        :param limits: Mapping of model name to {"rpm": int, "tpm": int}; either budget may be left out.
+                       Models without an entry use "default" when given and are not limited otherwise.
+        """
+        self.limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self._buckets: dict[str, tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRateLimiter":
+        """
+        Read overrides from LLM_RATE_LIMITS, e.g. '{"gpt-4o": {"rpm": 5000, "tpm": 800000}}'.
+        """
+        raw = os.getenv("LLM_RATE_LIMITS")
+        return cls(limits=json.loads(raw) if raw else None)
+
+    @staticmethod
+    def estimate_tokens(messages: list, completion_tokens: int = DEFAULT_COMPLETION_TOKENS) -> int:
+        """
+        Cheap upper-leaning estimate of the tokens a request will consume.
+
+        Uses roughly three characters per token, which over-counts English slightly and is
+        closer for Arabic and other non-Latin scripts.
+        """
+        prompt_chars = 0
+        for message in messages:
+            content = message.get("content") if isinstance(message, dict) else str(message)
+            prompt_chars += len(content if isinstance(content, str) else str(content))
+        prompt_tokens = math.ceil(prompt_chars / 3) + 4 * len(messages)
+        return prompt_tokens + completion_tokens
+
+    def _limit(self, model: str) -> dict:
+        return self.limits.get(model, self.limits.get("default")) or {}
+
+    def _model_buckets(self, model: str) -> tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            limit = self._limit(model)
+            buckets = tuple(TokenBucket(limit[key]) if limit.get(key) else None for key in ("rpm", "tpm"))
+            self._buckets[model] = buckets
+            self._stats[model] = {"requests": 0, "throttled": 0, "wait_seconds": 0.0,
+                                  "estimated_tokens": 0, "actual_tokens": 0}
+        return buckets
+
+    def _reserve(self, model: str, tokens: int) -> float:
+        with self._lock:
+            request_bucket, token_bucket = self._model_buckets(model)
+            now = time.monotonic()
+            wait = max(request_bucket.reserve(1, now) if request_bucket else 0.0,
+                       token_bucket.reserve(tokens, now) if token_bucket else 0.0)
+            stats = self._stats[model]
+            stats["requests"] += 1
+            stats["estimated_tokens"] += tokens
+            if wait > 0:
+                stats["throttled"] += 1
+                stats["wait_seconds"] += wait
+            return wait
+
+    def acquire(self, model: str, tokens: int) -> None:
+        """
+        Block the calling thread until the model has budget for one request of `tokens` tokens.
+        """
+        wait = self._reserve(model, tokens)
+        if wait > 0:
+            logger.info(f"Rate limiting {model}: waiting {wait:.2f}s for {tokens} tokens")
+            time.sleep(wait)
+
+    async def acquire_async(self, model: str, tokens: int) -> None:
+        """
+        Suspend the calling coroutine until the model has budget for one request of `tokens` tokens.
+        """
+        wait = self._reserve(model, tokens)
+        if wait > 0:
+            logger.info(f"Rate limiting {model}: waiting {wait:.2f}s for {tokens} tokens")
+            await asyncio.sleep(wait)
+
+    def record_usage(self, model: str, estimated_tokens: int, usage) -> None:
+        """
+        Reconcile the token bucket with the usage reported by the provider.
+
+        :param usage: The `usage` object of the response; ignored when the provider does not report one.
+        """
+        actual = getattr(usage, "total_tokens", None)
+        if actual is None:
+            return
+        with self._lock:
+            _, token_bucket = self._model_buckets(model)
+            if token_bucket is not None:
+                token_bucket.adjust(estimated_tokens - actual, time.monotonic())
+            self._stats[model]["actual_tokens"] += actual
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for model, buckets in self._buckets.items():
+                available = []
+                for bucket in buckets:
+                    if bucket is not None:
+                        bucket._refill(now)
+                    available.append(round(bucket.tokens, 2) if bucket is not None else None)
+                result[model] = {
+                    **self._stats[model],
+                    "available_requests": available[0],
+                    "available_tokens": available[1],
+                    "limits": self._limit(model),
+                }
+            return result
+
+
+rate_limiter = ModelRateLimiter.from_env()
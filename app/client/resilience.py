@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+import openai
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Per-attempt timeouts in seconds; long structured outputs get more room than short ones
+DEFAULT_ATTEMPT_TIMEOUTS = {
+    "gpt-4o": 120.0,
+    "gpt-4o-mini": 120.0,
+    "gpt-4o-search-preview": 180.0,
+    "default": 120.0,
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without contacting the provider while the circuit breaker of a model is open.
+    """
+
+    def __init__(self, model: str, retry_in: float):
+        super().__init__(f"Circuit breaker for {model} is open; retry in {retry_in:.1f}s")
+        self.model = model
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After `failure_threshold` consecutive provider failures the breaker opens and rejects calls for
+    `recovery_timeout` seconds. It then lets a single probe through; a success closes it again and a
+    failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, model: str) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == self.OPEN and elapsed >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            raise CircuitOpenError(model, max(0.0, self.recovery_timeout - elapsed))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, capped by `max_delay`.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 max_retry_after: float = 60.0, attempt_timeouts: Optional[dict] = None):
+        """
+        :param max_attempts: Total attempts per call, including the first one.
+        :param base_delay: Backoff base in seconds; attempt n waits up to base_delay * 2 ** (n - 1).
+        :param max_delay: Upper bound of the computed backoff.
+        :param max_retry_after: Upper bound applied to provider supplied Retry-After values.
+        :param attempt_timeouts: Per-model timeout of a single attempt, in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.attempt_timeouts = {**DEFAULT_ATTEMPT_TIMEOUTS, **(attempt_timeouts or {})}
+
+    def attempt_timeout(self, model: str) -> float:
+        return self.attempt_timeouts.get(model, self.attempt_timeouts["default"])
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+
+def error_status(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read Retry-After (or retry-after-ms) from the HTTP response attached to a provider error.
+    """
+    response = getattr(error, "response", None) or getattr(error, "raw_response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_timeout_or_connection_error(error: Exception) -> bool:
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError,
+                              asyncio.TimeoutError, TimeoutError, ConnectionError))
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, CircuitOpenError):
+        return False
+    if is_timeout_or_connection_error(error):
+        return True
+    status = error_status(error)
+    return status is not None and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """
+    Errors that say something about provider health and therefore count towards the breaker.
+
+    Rate limiting (429) is excluded: it is a budget problem handled by Retry-After, not an outage.
+    """
+    if is_timeout_or_connection_error(error):
+        return True
+    status = error_status(error)
+    return status is not None and status >= 500
+
+
+class ResilientExecutor:
+    """
+    Wraps every outbound LLM call with retries, per-attempt timeouts and a per-model circuit breaker.
+
+    The wrapped function receives the timeout of the current attempt and performs exactly one request.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResilientExecutor":
+        raw_timeouts = os.getenv("LLM_ATTEMPT_TIMEOUTS")
+        policy = RetryPolicy(
+            max_attempts=int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", 4)),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0)),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", 30.0)),
+            attempt_timeouts=json.loads(raw_timeouts) if raw_timeouts else None,
+        )
+        return cls(
+            policy=policy,
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 5)),
+            recovery_timeout=float(os.getenv("LLM_BREAKER_RECOVERY_TIMEOUT", 30.0)),
+        )
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+                self._breakers[model] = breaker
+                self._stats[model] = {"calls": 0, "attempts": 0, "retries": 0, "successes": 0,
+                                      "failures": 0, "rejected": 0, "retry_reasons": {}}
+            return breaker
+
+    def _count(self, model: str, key: str) -> None:
+        with self._lock:
+            self._stats[model][key] += 1
+
+    def _count_retry(self, model: str, error: Exception) -> None:
+        reason = str(error_status(error) or type(error).__name__)
+        with self._lock:
+            stats = self._stats[model]
+            stats["retries"] += 1
+            stats["retry_reasons"][reason] = stats["retry_reasons"].get(reason, 0) + 1
+
+    def _before_attempt(self, model: str, breaker: CircuitBreaker) -> None:
+        try:
+            breaker.before_call(model)
+        except CircuitOpenError:
+            self._count(model, "rejected")
+            raise
+        self._count(model, "attempts")
+
+    def _after_failure(self, model: str, breaker: CircuitBreaker, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Update breaker and counters for a failed attempt; return the delay before the next attempt or None.
+        """
+        if is_provider_failure(error):
+            breaker.record_failure()
+        elif not isinstance(error, CircuitOpenError):
+            # The provider answered; a client-side error says nothing about its health
+            breaker.record_success()
+        if attempt >= self.policy.max_attempts or not is_retryable(error):
+            self._count(model, "failures")
+            return None
+        delay = self.policy.backoff(attempt, retry_after_seconds(error))
+        self._count_retry(model, error)
+        logger.warning(f"LLM call to {model} failed on attempt {attempt}/{self.policy.max_attempts} "
+                       f"({type(error).__name__}: {error}); retrying in {delay:.2f}s")
+        return delay
+
+    def call(self, model: str, fn: Callable[[float], T], timeout: Optional[float] = None) -> T:
+        """
+        Run `fn(attempt_timeout)` with retries on the calling thread.
+        """
+        breaker = self.breaker(model)
+        self._count(model, "calls")
+        attempt_timeout = timeout or self.policy.attempt_timeout(model)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt(model, breaker)
+            try:
+                result = fn(attempt_timeout)
+            except Exception as error:
+                delay = self._after_failure(model, breaker, error, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            self._count(model, "successes")
+            return result
+
+    async def call_async(self, model: str, fn: Callable[[float], Awaitable[T]],
+                         timeout: Optional[float] = None) -> T:
+        """
+        Await `fn(attempt_timeout)` with retries without blocking the event loop between attempts.
+        """
+        breaker = self.breaker(model)
+        self._count(model, "calls")
+        attempt_timeout = timeout or self.policy.attempt_timeout(model)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._before_attempt(model, breaker)
+            try:
+                result = await fn(attempt_timeout)
+            except Exception as error:
+                delay = self._after_failure(model, breaker, error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            self._count(model, "successes")
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    **{key: (dict(value) if isinstance(value, dict) else value)
+                       for key, value in self._stats[model].items()},
+                    "breaker_state": breaker.state,
+                    "consecutive_failures": breaker.consecutive_failures,
+                    "times_opened": breaker.times_opened,
+                }
+                for model, breaker in self._breakers.items()
+            }
+
+
+resilience = ResilientExecutor.from_env()
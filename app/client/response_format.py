@@ -0,0 +1,76 @@
+from typing import Any, Type
+
+from pydantic import BaseModel
+
+
+def response_format_param(response_format: Type[BaseModel]) -> dict:
+    """
+    Build the `json_schema` response_format of a Chat Completions request from a pydantic model.
+
+    Used where the SDK's own `parse` helpers cannot be, i.e. for streamed completions and Batch API
+    input files, so the request body does not depend on private modules of the openai package.
+    """
+    schema = response_format.model_json_schema()
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "schema": _strict_json_schema(schema, root=schema),
+            "name": response_format.__name__,
+            "strict": True,
+        },
+    }
+
+
+def _strict_json_schema(schema: dict, root: dict) -> dict:
+    """
+    Make a JSON schema conform to Structured Outputs' strict mode, in place: every object closes its
+    properties and requires all of them, None defaults are dropped, and a `$ref` with sibling keys
+    is inlined because the API does not accept those.
+    """
+    for definitions_key in ("$defs", "definitions"):
+        for definition in (schema.get(definitions_key) or {}).values():
+            _strict_json_schema(definition, root)
+
+    if schema.get("type") == "object" and "additionalProperties" not in schema:
+        schema["additionalProperties"] = False
+
+    properties = schema.get("properties")
+    if isinstance(properties, dict):
+        schema["required"] = list(properties)
+        schema["properties"] = {key: _strict_json_schema(value, root) for key, value in properties.items()}
+
+    if isinstance(schema.get("items"), dict):
+        schema["items"] = _strict_json_schema(schema["items"], root)
+
+    if isinstance(schema.get("anyOf"), list):
+        schema["anyOf"] = [_strict_json_schema(variant, root) for variant in schema["anyOf"]]
+
+    all_of = schema.get("allOf")
+    if isinstance(all_of, list):
+        if len(all_of) == 1:
+            schema.update(_strict_json_schema(all_of[0], root))
+            schema.pop("allOf")
+        else:
+            schema["allOf"] = [_strict_json_schema(entry, root) for entry in all_of]
+
+    if "default" in schema and schema["default"] is None:
+        schema.pop("default")
+
+    ref = schema.get("$ref")
+    if ref and len(schema) > 1:
+        resolved = _resolve_ref(root, ref)
+        # Keys next to the $ref take priority over those of the referenced schema
+        schema.update({**resolved, **schema})
+        schema.pop("$ref")
+        return _strict_json_schema(schema, root)
+
+    return schema
+
+
+def _resolve_ref(root: dict, ref: str) -> Any:
+    if not ref.startswith("#/"):
+        raise ValueError(f"Unexpected $ref format {ref!r}; does not start with #/")
+    resolved = root
+    for key in ref[2:].split("/"):
+        resolved = resolved[key]
+    return resolved
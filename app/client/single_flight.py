@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _LeaderAbandoned(Exception):
+    """
+    Set on the shared slot when the leader stops without an outcome (cancelled or interrupted), so
+    that its followers start the call again instead of failing with the leader's cancellation.
+    """
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller of a key (the leader) runs the call; callers arriving while it is in flight
+    wait for its outcome instead of issuing their own. The slot is a concurrent.futures.Future, so
+    thread-based and coroutine-based callers can wait on the same call. Once the call finishes the
+    key is released and the next caller starts a new call.
+
+    Only ordinary exceptions are shared with followers. When the leader is cancelled or interrupted,
+    the key is released and one of its followers runs the call as the new leader.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result=None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T], copy: Optional[Callable[[T], T]] = None) -> T:
+        """
+        Run `fn` on the calling thread unless an identical call is already in flight.
+
+        :param key: Identity of the call.
+        :param fn: The upstream call.
+        :param copy: Applied to the result handed to followers so callers never share a mutable object.
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return self._follower_result(future.result(), copy)
+            except _LeaderAbandoned:
+                continue
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]],
+                       copy: Optional[Callable[[T], T]] = None) -> T:
+        """
+        Await `fn()` unless an identical call is already in flight, in which case wait for it.
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded so a cancelled follower does not cancel the call shared with the others
+                return self._follower_result(await asyncio.shield(asyncio.wrap_future(future)), copy)
+            except _LeaderAbandoned:
+                continue
+        try:
+            result = await fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def _abandon(self, key: str, future: Future) -> None:
+        with self._lock:
+            self.abandoned += 1
+        self._finish(key, future, error=_LeaderAbandoned())
+
+    @staticmethod
+    def _follower_result(result: T, copy: Optional[Callable[[T], T]]) -> T:
+        if copy is None or result is None:
+            return result
+        return copy(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "upstream_calls": self.leaders,
+                "coalesced_calls": self.coalesced,
+                "coalesce_rate": self.coalesced / calls if calls else 0.0,
+                "abandoned_calls": self.abandoned,
+                "in_flight": len(self._in_flight),
+            }
+
+
+single_flight = SingleFlight()
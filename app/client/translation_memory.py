@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from app.constant_manager import translate_segments_prompt
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the segment prompt changes so stale translations are not reused
+TRANSLATION_PROMPT_VERSION = hashlib.sha256(translate_segments_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+class TranslationMemory:
+    """
+    Segment-level translation memory: an in-process LRU in front of a MongoDB collection.
+
+    Entries are keyed on the hash of the source text, the target language and the prompt version.
+    Only segments of at most `max_chars` characters (names, titles, quiz options) are remembered;
+    paragraphs rarely repeat word for word and would only grow the collection.
+    MongoDB is optional at runtime; when it cannot be reached the memory keeps working from the LRU
+    and retries the database after `retry_after` seconds.
+    """
+
+    def __init__(self, uri: Optional[str] = None, db_name: str = "chat_db",
+                 collection_name: str = "translation_memory", memory_items: int = 20000,
+                 prompt_version: str = TRANSLATION_PROMPT_VERSION, retry_after: float = 60.0,
+                 max_chars: int = 300):
+        """
+        :param uri: MongoDB URI; the persistent tier is disabled when empty.
+        :param db_name: Database holding the collection.
+        :param collection_name: Collection of translation entries.
+        :param memory_items: Maximum number of entries kept in the in-process LRU.
+        :param prompt_version: Part of every key, so changing the prompt invalidates old entries.
+        :param retry_after: Seconds to wait before trying MongoDB again after a failure.
+        :param max_chars: Longest source text looked up or stored; longer texts are always misses.
+        """
+        self.prompt_version = prompt_version
+        self.memory_items = memory_items
+        self.retry_after = retry_after
+        self.max_chars = max_chars
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection = None
+        self._disabled_until = 0.0
+        if uri:
+            client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+            self._collection = client[db_name][collection_name]
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @classmethod
+    def from_env(cls) -> "TranslationMemory":
+        return cls(
+            uri=os.getenv("MONGO_URI", "localhost"),
+            db_name=os.getenv("TRANSLATION_MEMORY_DB", "chat_db"),
+            memory_items=int(os.getenv("TRANSLATION_MEMORY_ITEMS", 20000)),
+            max_chars=int(os.getenv("TRANSLATION_MEMORY_MAX_CHARS", 300)),
+        )
+
+    def accepts(self, text: str) -> bool:
+        """
+        Whether `text` is short enough to be kept in the memory.
+        """
+        return len(text.strip()) <= self.max_chars
+
+    def make_key(self, text: str, language: str) -> str:
+        source_hash = hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+        return f"{source_hash}:{language.strip().lower()}:{self.prompt_version}"
+
+    def _db_available(self) -> bool:
+        return self._collection is not None and time.monotonic() >= self._disabled_until
+
+    def _db_failed(self, error: Exception) -> None:
+        logger.warning(f"Translation memory database unavailable, using the in-process memory only: {error}")
+        self._disabled_until = time.monotonic() + self.retry_after
+
+    def lookup(self, texts: List[str], language: str) -> Dict[str, str]:
+        """
+        Return the known translations of `texts` into `language`, keyed by source text.
+        """
+        return self.lookup_languages(texts, [language])[language]
+
+    def lookup_languages(self, texts: List[str], languages: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Return the known translations of `texts` into each of `languages`, with a single database query.
+
+        :return: Language -> source text -> translation.
+        """
+        keys = {self.make_key(text, language): (text, language)
+                for language in languages for text in set(texts) if self.accepts(text)}
+        found: Dict[str, Dict[str, str]] = {language: {} for language in languages}
+        with self._lock:
+            for key, (text, language) in keys.items():
+                translation = self._memory.get(key)
+                if translation is not None:
+                    self._memory.move_to_end(key)
+                    found[language][text] = translation
+                    self.memory_hits += 1
+
+        remaining = [key for key, (text, language) in keys.items() if text not in found[language]]
+        if remaining and self._db_available():
+            try:
+                documents = list(self._collection.find({"_id": {"$in": remaining}}, {"translation": 1}))
+            except Exception as e:
+                self._db_failed(e)
+                documents = []
+            with self._lock:
+                for document in documents:
+                    text, language = keys[document["_id"]]
+                    found[language][text] = document["translation"]
+                    self._remember(document["_id"], document["translation"])
+                self.db_hits += len(documents)
+
+        with self._lock:
+            self.misses += len(keys) - sum(len(translations) for translations in found.values())
+        return found
+
+    def store(self, translations: Dict[str, str], language: str) -> None:
+        """
+        Remember `translations` (source text -> translated text) for `language`; texts longer than
+        `max_chars` are skipped.
+        """
+        translations = {text: translation for text, translation in translations.items() if self.accepts(text)}
+        if not translations:
+            return
+        operations = []
+        now = datetime.now()
+        with self._lock:
+            for text, translation in translations.items():
+                key = self.make_key(text, language)
+                self._remember(key, translation)
+                operations.append(UpdateOne(
+                    {"_id": key},
+                    {"$set": {"source": text, "language": language, "prompt_version": self.prompt_version,
+                              "translation": translation, "updated_at": now}},
+                    upsert=True
+                ))
+            self.writes += len(operations)
+        if self._db_available():
+            try:
+                self._collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                self._db_failed(e)
+
+    async def lookup_async(self, texts: List[str], language: str) -> Dict[str, str]:
+        return await asyncio.to_thread(self.lookup, texts, language)
+
+    async def lookup_languages_async(self, texts: List[str], languages: List[str]) -> Dict[str, Dict[str, str]]:
+        return await asyncio.to_thread(self.lookup_languages, texts, languages)
+
+    async def store_async(self, translations: Dict[str, str], language: str) -> None:
+        await asyncio.to_thread(self.store, translations, language)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "memory_items": len(self._memory),
+                "prompt_version": self.prompt_version,
+                "max_chars": self.max_chars,
+            }
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+
+translation_memory = TranslationMemory.from_env()
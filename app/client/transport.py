@@ -0,0 +1,267 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class TransportMode:
+    """
+    Enum class for the modes of the record / replay transport.
+    """
+    OFF = 'off'
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+
+# Response headers that describe the wire encoding rather than the stored (decoded) body
+HOP_BY_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class LatencyModel:
+    """
+    Synthetic latency applied to replayed responses.
+
+    Specs: "none", "recorded" (the latency observed while recording), "fixed:<s>",
+    "uniform:<low>,<high>" and "lognormal:<median>,<sigma>", all in seconds.
+    """
+
+    def __init__(self, spec: str = "recorded", seed: Optional[int] = None):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+        if self.kind not in {"none", "recorded", "fixed", "uniform", "lognormal"}:
+            raise ValueError(f"Unsupported latency model: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded: float) -> float:
+        with self._lock:
+            if self.kind == "recorded":
+                return recorded
+            if self.kind == "fixed":
+                return self.params[0]
+            if self.kind == "uniform":
+                return self._random.uniform(self.params[0], self.params[1])
+            if self.kind == "lognormal":
+                return self._random.lognormvariate(math.log(self.params[0]), self.params[1])
+            return 0.0
+
+
+class CassetteStore:
+    """
+    On-disk store of recorded request / response pairs, one JSON file per request.
+
+    Requests are identified by method, URL and body; JSON bodies are canonicalised so key order
+    does not matter. Request headers (and therefore API keys) are never written.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def request_key(request: httpx.Request) -> str:
+        body = request.content
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            pass
+        digest = hashlib.sha256()
+        digest.update(request.method.encode("utf-8"))
+        digest.update(str(request.url).encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, request: httpx.Request, response: httpx.Response, latency: float) -> None:
+        content = response.content
+        try:
+            body = {"body_text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"body_base64": base64.b64encode(content).decode("ascii")}
+        entry = {
+            "request": {"method": request.method, "url": str(request.url)},
+            "response": {
+                "status_code": response.status_code,
+                "headers": [[name, value] for name, value in response.headers.multi_items()
+                            if name.lower() not in HOP_BY_HOP_HEADERS],
+                **body,
+            },
+            "latency": latency,
+        }
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def to_response(entry: dict, request: httpx.Request) -> httpx.Response:
+        recorded = entry["response"]
+        if "body_base64" in recorded:
+            content = base64.b64decode(recorded["body_base64"])
+        else:
+            content = recorded["body_text"].encode("utf-8")
+        return httpx.Response(recorded["status_code"], headers=recorded["headers"], content=content, request=request)
+
+    @staticmethod
+    def miss_response(request: httpx.Request, key: str) -> httpx.Response:
+        # 404 is not retried by the LLM clients, so a missing recording fails fast
+        return httpx.Response(404, request=request, json={"error": {
+            "message": f"No recorded response for {request.method} {request.url} (cassette {key})",
+            "type": "cassette_miss",
+        }})
+
+
+class RecordReplayTransport(httpx.BaseTransport):
+    """
+    httpx transport that records real exchanges to a CassetteStore or replays them offline.
+    """
+
+    def __init__(self, mode: str, store: CassetteStore, latency: Optional[LatencyModel] = None,
+                 transport: Optional[httpx.BaseTransport] = None):
+        """
+        :param mode: TransportMode.RECORD or TransportMode.REPLAY.
+        :param store: Where exchanges are written to and read from.
+        :param latency: Delay applied to replayed responses.
+        :param transport: Transport used to reach the network while recording.
+        """
+        self.mode = mode
+        self.store = store
+        self.latency = latency or LatencyModel()
+        self._transport = transport or (httpx.HTTPTransport() if mode == TransportMode.RECORD else None)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = self.store.request_key(request)
+        if self.mode == TransportMode.REPLAY:
+            entry = self.store.load(key)
+            if entry is None:
+                logger.warning(f"Cassette miss for {request.method} {request.url}")
+                return self.store.miss_response(request, key)
+            time.sleep(self.latency.sample(entry.get("latency", 0.0)))
+            return self.store.to_response(entry, request)
+
+        started = time.monotonic()
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        self.store.save(key, request, response, time.monotonic() - started)
+        return self.store.to_response(self.store.load(key), request)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+class AsyncRecordReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous counterpart of RecordReplayTransport; replay delays do not block the event loop.
+    """
+
+    def __init__(self, mode: str, store: CassetteStore, latency: Optional[LatencyModel] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.mode = mode
+        self.store = store
+        self.latency = latency or LatencyModel()
+        self._transport = transport or (httpx.AsyncHTTPTransport() if mode == TransportMode.RECORD else None)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = self.store.request_key(request)
+        if self.mode == TransportMode.REPLAY:
+            entry = self.store.load(key)
+            if entry is None:
+                logger.warning(f"Cassette miss for {request.method} {request.url}")
+                return self.store.miss_response(request, key)
+            await asyncio.sleep(self.latency.sample(entry.get("latency", 0.0)))
+            return self.store.to_response(entry, request)
+
+        started = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        self.store.save(key, request, response, time.monotonic() - started)
+        return self.store.to_response(self.store.load(key), request)
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+def _settings() -> Optional[tuple[str, CassetteStore, LatencyModel]]:
+    """
+    Read LLM_TRANSPORT_MODE (off | record | replay), LLM_CASSETTE_DIR, LLM_REPLAY_LATENCY and LLM_REPLAY_SEED.
+    """
+    mode = os.getenv("LLM_TRANSPORT_MODE", TransportMode.OFF).lower()
+    if mode == TransportMode.OFF:
+        return None
+    if mode not in (TransportMode.RECORD, TransportMode.REPLAY):
+        raise ValueError(f"Unsupported LLM_TRANSPORT_MODE: {mode}")
+    seed = os.getenv("LLM_REPLAY_SEED")
+    store = CassetteStore(os.getenv("LLM_CASSETTE_DIR", "cassettes"))
+    latency = LatencyModel(os.getenv("LLM_REPLAY_LATENCY", "recorded"), seed=int(seed) if seed else None)
+    return mode, store, latency
+
+
+def http_client_from_env(timeout: float = 600.0) -> Optional[httpx.Client]:
+    """
+    httpx client routed through the record / replay transport, or None when the transport is off.
+    """
+    settings = _settings()
+    if settings is None:
+        return None
+    return httpx.Client(transport=RecordReplayTransport(*settings), timeout=timeout)
+
+
+def async_http_client_from_env(timeout: float = 600.0) -> Optional[httpx.AsyncClient]:
+    settings = _settings()
+    if settings is None:
+        return None
+    return httpx.AsyncClient(transport=AsyncRecordReplayTransport(*settings), timeout=timeout)
+
+
+def openai_http_client() -> Optional[httpx.Client]:
+    """
+    Same as `http_client_from_env` but keeps the OpenAI SDK defaults (timeouts, connection limits).
+    """
+    settings = _settings()
+    if settings is None:
+        return None
+    return DefaultHttpxClient(transport=RecordReplayTransport(*settings))
+
+
+def openai_async_http_client() -> Optional[httpx.AsyncClient]:
+    settings = _settings()
+    if settings is None:
+        return None
+    return DefaultAsyncHttpxClient(transport=AsyncRecordReplayTransport(*settings))
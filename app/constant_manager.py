@@ -349,6 +349,12 @@ Step 4: Check and Output
 ⚠️ If the paragraph is part of a course or a specific topic, such as the introduction to a training course, do **not** alter or simplify it. It must be kept intact without any changes.
 """
 
+simplify_packed_note = """
+You will receive several paragraphs at once as a JSON list, each with a `paragraph_id`.
+Apply all of the instructions above to every paragraph independently, as if it were the only one.
+Return exactly one entry per paragraph, copying its `paragraph_id` unchanged, and never merge or skip paragraphs.
+"""
+
 question_generation_prompt = """
 You are an expert Analyze the given video script and generate assessment questions based strictly and only on its content.
 
@@ -430,6 +436,16 @@ Translate only the English text without making any other changes:
 Ensure the original meaning and context remain intact in the translation.
 """
 
+translate_segments_prompt = """
+You are a helpful assistant specialized in translating educational content.
+You receive a JSON list of text segments (names, quiz questions and answers or whole paragraphs), each with an
+`index`. Translate every segment to {language}, keeping the terminology consistent across segments.
+- Return exactly one translation per segment, with the same `index`.
+- Translate each segment on its own; do not merge, split, explain or add content.
+- Keep names of tools, products and technologies, numbers and formatting unchanged.
+- If a segment is already in {language}, return it unchanged.
+"""
+
 
 paragraph_level = [
     {"id": "E591A6CA-ED9D-41C7-BADB-FA8527B6EE94", "name": "Difficult"},
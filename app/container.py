@@ -1,12 +1,17 @@
 import os
 from dotenv import load_dotenv
 
+from app.client.checkpoint_store import CheckpointStore
 from app.client.llm_client import OpenAITextProcessor
 from app.controller.prompt_controller import PromptController
+from app.jobs.job_queue import MongoJobQueue
 from app.knowledge_base.chat_controller.factory import ChatDatabaseFactory
 from app.knowledge_base.knowledge_base import KnowledgeBase
 from app.knowledge_base.vector_database.factory import VectorDatabaseFactory
+from app.knowledge_base.vector_embedding.embedding_cache import CachedEmbedding, embedding_cache
 from app.knowledge_base.vector_embedding.factory import VectorEmbeddingFactory
+from app.knowledge_base.vector_embedding.micro_batcher import MicroBatchingEmbedding
+from app.knowledge_base.vector_embedding.query_cache import query_embedding_cache
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +20,9 @@ load_dotenv()
 qdrant_host = os.getenv("QDRANT_HOST", "localhost")
 qdrant_port = int(os.getenv("QDRANT_PORT", 6333))
 cohere_api_key = os.getenv("COHERE_API_KEY")
+embedding_backend = os.getenv("EMBEDDING_BACKEND", "cohere")
+onnx_embedding_model_dir = os.getenv("ONNX_EMBEDDING_MODEL_DIR", "models/bge-m3")
+onnx_embedding_quantize = os.getenv("ONNX_EMBEDDING_QUANTIZE", "false").lower() == "true"
 mongo_uri = os.getenv("MONGO_URI", "localhost")
 
 # Construct objects
@@ -25,9 +33,23 @@ vector_database = VectorDatabaseFactory().create_vector_database(
     vector_size=1024
 )
 
-cohere_vector_embedding = VectorEmbeddingFactory().create_vector_embedding(
-    embed_type="cohere",
-    api_key=cohere_api_key,
+if embedding_backend == "onnx":
+    embedding_client = VectorEmbeddingFactory().create_vector_embedding(
+        embed_type="onnx",
+        model_dir=onnx_embedding_model_dir,
+        quantize=onnx_embedding_quantize,
+    )
+else:
+    embedding_client = VectorEmbeddingFactory().create_vector_embedding(
+        embed_type="cohere",
+        api_key=cohere_api_key,
+    )
+
+# Every embedding goes through the shared on-disk cache, so repeated texts are embedded once;
+# the misses of concurrent requests are merged into batched calls
+vector_embedding = CachedEmbedding(
+    embedding=MicroBatchingEmbedding.from_env(embedding=embedding_client),
+    cache=embedding_cache,
 )
 
 chat_database = ChatDatabaseFactory().create_chat_database(
@@ -36,11 +58,16 @@ chat_database = ChatDatabaseFactory().create_chat_database(
 )
 
 knowledge_base = KnowledgeBase(
-    vector_embeddings=cohere_vector_embedding,
+    vector_embeddings=vector_embedding,
     vector_database=vector_database,
-    chat_database=chat_database
+    chat_database=chat_database,
+    query_cache=query_embedding_cache
 )
 
+# Jobs and generation checkpoints live next to the chats and share their MongoDB connection
+job_queue = MongoJobQueue.from_env(database=chat_database.db)
+checkpoint_store = CheckpointStore.from_env(database=chat_database.db)
+
 prompt_controller = PromptController(
     knowledge_base=knowledge_base
 )
@@ -97,16 +97,12 @@ def upload_file_knowledge(source_name: str, files_with_chunks: List[dict]):
         is_exist = knowledge_base.check_collection(collection_name=source_name)
         if not is_exist:
             knowledge_base.create_collection(collection_name=source_name)
-        for file in files_with_chunks:
-            for chunk in file["chunks"]:
-                knowledge_base.add_knowledge(
-                    collection_name=source_name,
-                    query_text=chunk,
-                    payload={
-                        "file_name": file["filename"],
-                        "content": chunk
-                    }
-                )
+        chunks = [(file["filename"], chunk) for file in files_with_chunks for chunk in file["chunks"]]
+        knowledge_base.add_knowledge_batch(
+            collection_name=source_name,
+            query_texts=[chunk for _, chunk in chunks],
+            payloads=[{"file_name": file_name, "content": chunk} for file_name, chunk in chunks]
+        )
     except Exception as e:
         print(f"Error adding knowledge base: {e}")
         raise e
@@ -1,13 +1,18 @@
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from app.model.content_dto import CourseOutLines, VideoScript, CourseScript, ChapterScript, VideoScriptWithQuiz, \
     ChapterScriptWithQuiz, CourseScriptWithQuiz, VideoOutLines, LLMOutLines
 from app.request_schema.course_content_request import CourseOutlineRequest
 from app.schema.chat_request_schema import ChatRequestSchema
 from app.constant_manager import course_outline_prompt_with_source, course_outline_prompt, chat_system_prompt
-from app.container import knowledge_base, llm_client, prompt_controller
+from app.client.checkpoint_store import checkpoint_key
+from app.container import checkpoint_store, knowledge_base, llm_client, prompt_controller
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +21,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Videos whose quizzes are generated at the same time; each one runs its own paragraph questions in parallel
+COURSE_QUIZ_WORKERS = int(os.getenv("COURSE_QUIZ_WORKERS", 4))
+VIDEO_SCRIPT_CHECKPOINT = "video_script"
+VIDEO_QUIZ_CHECKPOINT = "video_quiz"
+# Idle seconds after which a streaming course response emits a heartbeat event
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+
 
 def generate_course_outline(outline_request: CourseOutlineRequest) -> LLMOutLines:
     logger.info(f"Starting course outline generation for course: {outline_request.course_name}")
@@ -46,37 +58,43 @@ def get_source_raw_content(source: str, video_source_knowledge: list[str]):
     return raw_content
 
 
+def get_video_raw_content(video: VideoOutLines, course_outline: CourseOutLines) -> list[str]:
+    """First pipeline stage: collect the raw content of a video from the knowledge base or a web search"""
+    if course_outline.source:
+        return get_source_raw_content(source=course_outline.source,
+                                      video_source_knowledge=video.video_source_knowledge)
+    return [llm_client.generate_raw_content(video=video)]
+
+
+def write_video_script(video: VideoOutLines, course_outline: CourseOutLines, system_prompt: str,
+                       raw_content: list[str]) -> VideoScript:
+    """Second pipeline stage: write the script of a video from its raw content"""
+    video_script = llm_client.generate_video(
+        raw_content=raw_content,
+        course=course_outline,
+        video=video,
+        prompt=system_prompt
+    )
+    return VideoScript(
+        video_name=video.video_name,
+        previous_video_name=video.previous_video_name,
+        video_description=video.video_description,
+        video_source_knowledge=video.video_source_knowledge,
+        video_script=video_script,
+        raw_content=raw_content,
+        video_skill=video.video_skill,
+        video_objective=video.video_objective,
+        video_duration=video.video_duration
+    )
+
+
 def process_video(video: VideoOutLines, course_outline: CourseOutLines, system_prompt: str) -> VideoScript:
     """Process a single video with error handling and logging"""
     logger.info(f"Processing video: {video.video_name}")
     try:
-        if course_outline.source:
-            raw_content = get_source_raw_content(source=course_outline.source,
-                                                 video_source_knowledge=video.video_source_knowledge)
-        else:
-            raw_content = llm_client.generate_raw_content(video=video)
-            raw_content = [raw_content]
+        raw_content = get_video_raw_content(video, course_outline)
         logger.debug(f"Generated raw content for video: {video.video_name}")
-
-        video_script = llm_client.generate_video(
-            raw_content=raw_content,
-            course=course_outline,
-            video=video,
-            prompt=system_prompt
-        )
-        logger.debug(f"Generated video script for video: {video.video_name}")
-
-        processed_video = VideoScript(
-            video_name=video.video_name,
-            previous_video_name=video.previous_video_name,
-            video_description=video.video_description,
-            video_source_knowledge=video.video_source_knowledge,
-            video_script=video_script,
-            raw_content=raw_content,
-            video_skill=video.video_skill,
-            video_objective=video.video_objective,
-            video_duration=video.video_duration
-        )
+        processed_video = write_video_script(video, course_outline, system_prompt, raw_content)
         logger.info(f"Successfully processed video: {video.video_name}")
         return processed_video
     except Exception as error:
@@ -84,73 +102,140 @@ def process_video(video: VideoOutLines, course_outline: CourseOutLines, system_p
         raise error
 
 
-def generate_course_content(outline_request: CourseOutLines, max_workers: int = 10) -> CourseScript:
-    logger.info(f"Starting course content generation for: {outline_request.course_name}")
-    logger.info(f"Total chapters to process: {len(outline_request.chapters)}")
+def video_checkpoint_keys(course, *context: Any) -> Dict[Tuple[int, int], str]:
+    """
+    Checkpoint key of every video: a hash of the whole course, the extra `context`, the video position and the video.
+    """
+    course_hash = checkpoint_key(course.model_dump(), *context)
+    return {
+        (chapter_index, video_index): checkpoint_key(course_hash, chapter_index, video_index, video.model_dump())
+        for chapter_index, chapter in enumerate(course.chapters)
+        for video_index, video in enumerate(chapter.videos)
+    }
 
-    try:
-        chapter_list = []
-        if outline_request.prompt_id:
-            system_prompt = prompt_controller.get_prompt(outline_request.prompt_id).system_prompt
-        else:
-            system_prompt = course_outline_prompt
 
-        for chapter_idx, chapter in enumerate(outline_request.chapters, 1):
-            logger.info(f"Processing chapter {chapter_idx}/{len(outline_request.chapters)}: {chapter.chapter_name}")
-            logger.info(f"Videos in chapter: {len(chapter.videos)}")
+def write_video_script_checkpointed(video: VideoOutLines, course_outline: CourseOutLines, system_prompt: str,
+                                    raw_content: list[str], checkpoint: str) -> VideoScript:
+    # Saved from the worker thread, so the script survives even if the rest of the course fails
+    video_script = write_video_script(video, course_outline, system_prompt, raw_content)
+    checkpoint_store.save(VIDEO_SCRIPT_CHECKPOINT, checkpoint, video_script.model_dump())
+    return video_script
+
 
-            video_list = []
+def iter_course_videos(course_outline: CourseOutLines, system_prompt: str, max_workers: int = 10,
+                       heartbeat: Optional[float] = None,
+                       resume: bool = True) -> Iterator[Optional[Tuple[Tuple[int, int], VideoScript]]]:
+    """
+    Generate every video of the course through one two-stage pipeline, yielding each video when it is done.
 
-            # Process videos in parallel using ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Create LLM client instances for each thread
-                future_to_video = {}
+    All videos of all chapters are submitted to the raw content stage at once; each video moves on
+    to the script stage as soon as its raw content is ready. Each stage runs at most `max_workers`
+    videos at a time, so a slow video never holds back the rest of the course.
 
-                for video in chapter.videos:
-                    future = executor.submit(process_video, video, outline_request,
-                                             system_prompt)
-                    future_to_video[future] = video
+    Every finished script is checkpointed. With `resume`, videos checkpointed by an earlier run of
+    the same outline and prompt are yielded first and not generated again.
 
-                # Collect results as they complete
-                for future in as_completed(future_to_video):
-                    video = future_to_video[future]
+    :param heartbeat: When set, None is yielded whenever no video finished for that many seconds.
+    :return: Iterator of ((chapter index, video index), video script) in completion order.
+    """
+    checkpoints = video_checkpoint_keys(course_outline, system_prompt)
+    finished = checkpoint_store.load(VIDEO_SCRIPT_CHECKPOINT, list(checkpoints.values())) if resume else {}
+    if finished:
+        logger.info(f"Resuming course {course_outline.course_name}: {len(finished)} of {len(checkpoints)} "
+                    f"videos already generated")
+    for key, checkpoint in checkpoints.items():
+        if checkpoint in finished:
+            yield key, VideoScript.model_validate(finished[checkpoint])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as raw_content_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as script_pool:
+        pending = {}
+        for chapter_index, chapter in enumerate(course_outline.chapters):
+            for video_index, video in enumerate(chapter.videos):
+                if checkpoints[(chapter_index, video_index)] in finished:
+                    continue
+                future = raw_content_pool.submit(get_video_raw_content, video, course_outline)
+                pending[future] = ("raw_content", (chapter_index, video_index), video)
+
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=heartbeat, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield None
+                for future in done:
+                    stage, key, video = pending.pop(future)
                     try:
-                        processed_video = future.result()
-                        video_list.append(processed_video)
-                        logger.info(f"Completed processing video: {video.video_name}")
+                        result = future.result()
                     except Exception as error:
                         logger.error(f"Failed to process video {video.video_name}: {error}")
                         raise error
+                    if stage == "raw_content":
+                        logger.debug(f"Generated raw content for video: {video.video_name}")
+                        future = script_pool.submit(write_video_script_checkpointed, video, course_outline,
+                                                    system_prompt, result, checkpoints[key])
+                        pending[future] = ("script", key, video)
+                    else:
+                        logger.info(f"Completed processing video: {video.video_name}")
+                        yield key, result
+        finally:
+            # Also reached when the consumer stops early, e.g. a streaming client disconnected
+            for future in pending:
+                future.cancel()
 
-            # Sort videos to maintain original order if needed
-            # Assuming videos have some ordering attribute, or you want to maintain input order
-            video_list.sort(key=lambda v: next(i for i, orig_video in enumerate(chapter.videos)
-                                               if orig_video.video_name == v.video_name))
 
-            chapter_script = ChapterScript(
-                chapter_name=chapter.chapter_name,
-                videos=video_list
-            )
-            chapter_list.append(chapter_script)
-            logger.info(f"Completed chapter: {chapter.chapter_name} with {len(video_list)} videos")
-
-        course_script = CourseScript(
-            language=outline_request.language,
-            country=outline_request.country,
-            source=outline_request.source,
-            course_name=outline_request.course_name,
-            course_description=outline_request.course_description,
-            target_audience=outline_request.target_audience,
-            course_level=outline_request.course_level,
-            course_slogan=outline_request.course_slogan,
-            course_skills=outline_request.course_skills,
-            course_objectives=outline_request.course_objectives,
-            chapters=chapter_list
+def schedule_course_videos(course_outline: CourseOutLines, system_prompt: str, max_workers: int = 10,
+                           resume: bool = True) -> Dict[Tuple[int, int], VideoScript]:
+    """
+    :return: Video scripts of the whole course keyed by (chapter index, video index).
+    """
+    return dict(iter_course_videos(course_outline, system_prompt, max_workers=max_workers, resume=resume))
+
+
+def get_system_prompt(outline_request: CourseOutLines) -> str:
+    if outline_request.prompt_id:
+        return prompt_controller.get_prompt(outline_request.prompt_id).system_prompt
+    return course_outline_prompt
+
+
+def assemble_course_script(outline_request: CourseOutLines,
+                            scripts: Dict[Tuple[int, int], VideoScript]) -> CourseScript:
+    # Reassemble chapters and videos in their original order
+    chapter_list = [
+        ChapterScript(
+            chapter_name=chapter.chapter_name,
+            videos=[scripts[(chapter_index, video_index)] for video_index in range(len(chapter.videos))]
         )
+        for chapter_index, chapter in enumerate(outline_request.chapters)
+    ]
+
+    return CourseScript(
+        language=outline_request.language,
+        country=outline_request.country,
+        source=outline_request.source,
+        course_name=outline_request.course_name,
+        course_description=outline_request.course_description,
+        target_audience=outline_request.target_audience,
+        course_level=outline_request.course_level,
+        course_slogan=outline_request.course_slogan,
+        course_skills=outline_request.course_skills,
+        course_objectives=outline_request.course_objectives,
+        chapters=chapter_list
+    )
+
+
+def generate_course_content(outline_request: CourseOutLines, max_workers: int = 10,
+                            resume: bool = True) -> CourseScript:
+    logger.info(f"Starting course content generation for: {outline_request.course_name}")
+    logger.info(f"Total chapters to process: {len(outline_request.chapters)}")
 
-        total_videos = sum(len(chapter.videos) for chapter in chapter_list)
+    try:
+        system_prompt = get_system_prompt(outline_request)
+        scripts = schedule_course_videos(outline_request, system_prompt, max_workers=max_workers, resume=resume)
+        course_script = assemble_course_script(outline_request, scripts)
+
+        total_videos = sum(len(chapter.videos) for chapter in course_script.chapters)
         logger.info(
-            f"Successfully generated complete course content with {len(chapter_list)} chapters and {total_videos} videos")
+            f"Successfully generated complete course content with {len(course_script.chapters)} chapters and {total_videos} videos")
         return course_script
 
     except Exception as error:
@@ -171,75 +256,166 @@ def add_course_to_knowledge_base(course_content: CourseScript):
         logger.error(f"Error adding course to knowledge base: {error}")
         raise error
 
-def generate_course_quiz(course_content: CourseScript) -> CourseScriptWithQuiz:
-    try:
-        chapter_list = []
-        chapter_count = len(course_content.chapters)
 
-        for chapter_index, chapter in enumerate(course_content.chapters):
-            video_list = []
-            video_count = len(chapter.videos)
+def _collect_quiz_requests(course_content: CourseScript) -> Dict[Tuple[int, int], dict]:
+    """
+    Arguments of `generate_quiz_3c` for every video except the course introduction and conclusion.
+    """
+    chapter_count = len(course_content.chapters)
+    quiz_requests = {}
+    for chapter_index, chapter in enumerate(course_content.chapters):
+        video_count = len(chapter.videos)
 
-            # Avoid division by zero
-            if video_count == 0:
-                continue
+        # Avoid division by zero
+        if video_count == 0:
+            continue
 
-            question_per_video = (chapter_count * 20) // video_count
+        question_per_video = (chapter_count * 20) // video_count
 
-            for video_index, video in enumerate(chapter.videos):
-                # Skip the first video in the first chapter (Introduction)
-                if chapter_index == 0 and video_index == 0:
-                    video_script = None
-                    video_quiz = None
-
-                # Skip the last video in the last chapter (Conclusion)
-                elif chapter_index == chapter_count - 1 and video_index == len(chapter.videos) - 1:
-                    video_script = None
-                    video_quiz = None
-
-                else:
-                    quiz = llm_client.generate_quiz_3c(
-                        video_content=video.video_script,
-                        course_name=course_content.course_name,
-                        video_name=video.video_name,
-                        skill=video.video_skill,
-                        objective=video.video_objective,
-                        question_per_video=question_per_video
-                    )
-                    video_script = quiz['content_with_question_list']
-                    video_quiz = quiz['video_quiz']
-
-                video_with_quiz = VideoScriptWithQuiz(
-                    video_name=video.video_name,
-                    previous_video_name=video.previous_video_name,
-                    video_description=video.video_description,
-                    video_source_knowledge=video.video_source_knowledge,
-                    video_script=video_script,
-                    video_skill=video.video_skill,
-                    video_objective=video.video_objective,
-                    video_duration=video.video_duration,
-                    VideoQuiz=video_quiz
-                )
-                video_list.append(video_with_quiz)
-
-            chapter_with_quiz = ChapterScriptWithQuiz(
-                chapter_name=chapter.chapter_name,
-                videos=video_list
+        for video_index, video in enumerate(chapter.videos):
+            # Skip the first video in the first chapter (Introduction)
+            if chapter_index == 0 and video_index == 0:
+                continue
+            # Skip the last video in the last chapter (Conclusion)
+            if chapter_index == chapter_count - 1 and video_index == len(chapter.videos) - 1:
+                continue
+            quiz_requests[(chapter_index, video_index)] = dict(
+                video_content=video.video_script,
+                course_name=course_content.course_name,
+                video_name=video.video_name,
+                skill=video.video_skill,
+                objective=video.video_objective,
+                question_per_video=question_per_video
             )
-            chapter_list.append(chapter_with_quiz)
-
-        course_with_quiz = CourseScriptWithQuiz(
-            country=course_content.country,
-            source=course_content.source,
-            course_name=course_content.course_name,
-            course_description=course_content.course_description,
-            target_audience=course_content.target_audience,
-            course_level=course_content.course_level,
-            course_slogan=course_content.course_slogan,
-            course_skills=course_content.course_skills,
-            course_objectives=course_content.course_objectives,
-            chapters=chapter_list
+    return quiz_requests
+
+
+def _to_video_with_quiz(video: VideoScript, quiz: Optional[dict]) -> VideoScriptWithQuiz:
+    return VideoScriptWithQuiz(
+        video_name=video.video_name,
+        previous_video_name=video.previous_video_name,
+        video_description=video.video_description,
+        video_source_knowledge=video.video_source_knowledge,
+        video_script=quiz['content_with_question_list'] if quiz is not None else None,
+        video_skill=video.video_skill,
+        video_objective=video.video_objective,
+        video_duration=video.video_duration,
+        VideoQuiz=quiz['video_quiz'] if quiz is not None else None
+    )
+
+
+def generate_video_quiz_checkpointed(video: VideoScript, quiz_request: dict, checkpoint: str) -> VideoScriptWithQuiz:
+    video_with_quiz = _to_video_with_quiz(video, llm_client.generate_quiz_3c(**quiz_request))
+    checkpoint_store.save(VIDEO_QUIZ_CHECKPOINT, checkpoint, video_with_quiz.model_dump())
+    return video_with_quiz
+
+
+def iter_course_quiz_videos(course_content: CourseScript, max_workers: int = COURSE_QUIZ_WORKERS,
+                            heartbeat: Optional[float] = None, resume: bool = True
+                            ) -> Iterator[Optional[Tuple[Tuple[int, int], VideoScriptWithQuiz]]]:
+    """
+    Generate the quizzes of the course, at most `max_workers` videos at a time, yielding each video when it is done.
+
+    Every finished quiz is checkpointed. With `resume`, quizzes checkpointed by an earlier run for
+    the same course are yielded first and not generated again.
+
+    :param heartbeat: When set, None is yielded whenever no video finished for that many seconds.
+    :return: Iterator of ((chapter index, video index), video with quiz) in completion order.
+    """
+    quiz_requests = _collect_quiz_requests(course_content)
+    checkpoints = video_checkpoint_keys(course_content)
+    finished = checkpoint_store.load(VIDEO_QUIZ_CHECKPOINT,
+                                     [checkpoints[key] for key in quiz_requests]) if resume else {}
+    if finished:
+        logger.info(f"Resuming quizzes of course {course_content.course_name}: {len(finished)} of "
+                    f"{len(quiz_requests)} videos already done")
+    for chapter_index, chapter in enumerate(course_content.chapters):
+        for video_index, video in enumerate(chapter.videos):
+            key = (chapter_index, video_index)
+            if key not in quiz_requests:
+                yield key, _to_video_with_quiz(video, None)
+            elif checkpoints[key] in finished:
+                yield key, VideoScriptWithQuiz.model_validate(finished[checkpoints[key]])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for key, request in quiz_requests.items():
+            if checkpoints[key] in finished:
+                continue
+            chapter_index, video_index = key
+            video = course_content.chapters[chapter_index].videos[video_index]
+            pending[executor.submit(generate_video_quiz_checkpointed, video, request, checkpoints[key])] = key
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=heartbeat, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield None
+                for future in done:
+                    key = pending.pop(future)
+                    video_with_quiz = future.result()
+                    logger.info(f"Generated quiz for video: {video_with_quiz.video_name}")
+                    yield key, video_with_quiz
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def assemble_course_with_quiz(course_content: CourseScript,
+                               videos: Dict[Tuple[int, int], VideoScriptWithQuiz]) -> CourseScriptWithQuiz:
+    chapter_list = [
+        ChapterScriptWithQuiz(
+            chapter_name=chapter.chapter_name,
+            videos=[videos[(chapter_index, video_index)] for video_index in range(len(chapter.videos))]
         )
+        for chapter_index, chapter in enumerate(course_content.chapters)
+        if len(chapter.videos) > 0
+    ]
+
+    return CourseScriptWithQuiz(
+        country=course_content.country,
+        source=course_content.source,
+        course_name=course_content.course_name,
+        course_description=course_content.course_description,
+        target_audience=course_content.target_audience,
+        course_level=course_content.course_level,
+        course_slogan=course_content.course_slogan,
+        course_skills=course_content.course_skills,
+        course_objectives=course_content.course_objectives,
+        chapters=chapter_list
+    )
+
+
+def generate_course_quiz(course_content: CourseScript, use_batch: bool = False,
+                         resume: bool = True) -> CourseScriptWithQuiz:
+    """
+    Generate quizzes for every video except the course introduction and conclusion.
+
+    With `use_batch` all quiz requests of the course are submitted as one OpenAI Batch API job.
+    With `resume`, quizzes checkpointed by an earlier run for the same course are reused.
+    """
+    try:
+        if use_batch:
+            quiz_requests = _collect_quiz_requests(course_content)
+            checkpoints = video_checkpoint_keys(course_content)
+            finished = checkpoint_store.load(VIDEO_QUIZ_CHECKPOINT,
+                                             [checkpoints[key] for key in quiz_requests]) if resume else {}
+            videos = {key: VideoScriptWithQuiz.model_validate(finished[checkpoints[key]])
+                      for key in quiz_requests if checkpoints[key] in finished}
+            missing = [key for key in quiz_requests if key not in videos]
+
+            logger.info(f"Submitting {len(missing)} video quizzes as one batch job")
+            batch_quizzes = llm_client.generate_quiz_3c_batch([quiz_requests[key] for key in missing])
+            for key, quiz in zip(missing, batch_quizzes):
+                chapter_index, video_index = key
+                videos[key] = _to_video_with_quiz(course_content.chapters[chapter_index].videos[video_index], quiz)
+                checkpoint_store.save(VIDEO_QUIZ_CHECKPOINT, checkpoints[key], videos[key].model_dump())
+            for chapter_index, chapter in enumerate(course_content.chapters):
+                for video_index, video in enumerate(chapter.videos):
+                    videos.setdefault((chapter_index, video_index), _to_video_with_quiz(video, None))
+        else:
+            videos = dict(iter_course_quiz_videos(course_content, resume=resume))
+
+        course_with_quiz = assemble_course_with_quiz(course_content, videos)
         logger.info("Successfully generated course quiz")
         return course_with_quiz
 
@@ -248,53 +424,65 @@ def generate_course_quiz(course_content: CourseScript) -> CourseScriptWithQuiz:
         raise error
 
 
+def _prepare_chat(chat_request: ChatRequestSchema):
+    """
+    Resolve the chat id, retrieve the course knowledge and build the message list for the LLM.
+    """
+    messages = [{
+        "role": "system",
+        "content": chat_system_prompt
+    }]
+
+    chat_id = chat_request.chat_id
+    search_query = chat_request.query
+    if chat_id:
+        history = knowledge_base.get_messages(chat_id)
+        if history:
+            messages.extend(history[-4:])
+            # Extract last two user messages from history
+            user_msgs = [msg['content'] for msg in history if msg['role'] == 'user']
+            last_two = user_msgs[-2:] if len(user_msgs) >= 2 else user_msgs
+            # Merge last two with current query
+            search_query = "\n".join(last_two + [chat_request.query])
+    else:
+        chat_id = str(knowledge_base.add_chat())
+        logger.info(f"New chat started with ID: {chat_id}")
+
+    if chat_request.video_id:
+        knowledge = knowledge_base.ask_video(
+            query_text=search_query,
+            video_id=chat_request.video_id)
+
+    elif chat_request.chapter_id:
+        knowledge = knowledge_base.ask_chapter(
+            query_text=search_query,
+            chapter_id=chat_request.chapter_id)
+    else:
+        knowledge = knowledge_base.ask_course(
+            query_text=search_query,
+            course_id=chat_request.course_id)
+
+    user_query = {
+        "role": "user",
+        "content": f"##Knowledge: {knowledge.context}\n\n##User Query: {chat_request.query}"
+    }
+    messages.append(user_query)
+    return chat_id, messages, knowledge
+
+
+def _save_chat_turn(chat_id: str, query: str, answer: str):
+    now = datetime.now().isoformat()
+    knowledge_base.add_message(chat_id=chat_id,
+                               message={"role": "user", "content": query, "time": now})
+    knowledge_base.add_message(chat_id=chat_id, message={"role": "assistant", "content": answer, "time": now})
+
+
 def chat_with_course(chat_request: ChatRequestSchema):
     try:
-        messages = [{
-            "role": "system",
-            "content": chat_system_prompt
-        }]
-
-        chat_id = chat_request.chat_id
-        search_query = chat_request.query
-        if chat_id:
-            history = knowledge_base.get_messages(chat_id)
-            if history:
-                messages.extend(history[-4:])
-                # Extract last two user messages from history
-                user_msgs = [msg['content'] for msg in history if msg['role'] == 'user']
-                last_two = user_msgs[-2:] if len(user_msgs) >= 2 else user_msgs
-                # Merge last two with current query
-                search_query = "\n".join(last_two + [chat_request.query])
-        else:
-            chat_id = str(knowledge_base.add_chat())
-            logger.info(f"New chat started with ID: {chat_id}")
-
-        if chat_request.video_id:
-            knowledge = knowledge_base.ask_video(
-                query_text=search_query,
-                video_id=chat_request.video_id)
-
-        elif chat_request.chapter_id:
-            knowledge = knowledge_base.ask_chapter(
-                query_text=search_query,
-                chapter_id=chat_request.chapter_id)
-        else:
-            knowledge = knowledge_base.ask_course(
-                query_text=search_query,
-                course_id=chat_request.course_id)
-
-        user_query = {
-            "role": "user",
-            "content": f"##Knowledge: {knowledge.context}\n\n##User Query: {chat_request.query}"
-        }
-        messages.append(user_query)
+        chat_id, messages, _ = _prepare_chat(chat_request)
 
         answer = llm_client.chat(messages=messages, temperature=chat_request.temperature)
-        now = datetime.now().isoformat()
-        knowledge_base.add_message(chat_id=chat_id,
-                                   message={"role": "user", "content": chat_request.query, "time": now})
-        knowledge_base.add_message(chat_id=chat_id, message={"role": "assistant", "content": answer, "time": now})
+        _save_chat_turn(chat_id, chat_request.query, answer)
 
         return {
             "messages": messages,
@@ -304,3 +492,110 @@ def chat_with_course(chat_request: ChatRequestSchema):
     except Exception as e:
         logger.error(f"Error in chat_with_course: {e}")
         raise e
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def chat_with_course_stream(chat_request: ChatRequestSchema) -> Iterator[str]:
+    """
+    Server-Sent Events variant of `chat_with_course`.
+
+    Emits a `context` event with the chat id and the retrieved knowledge, one `token` event per
+    text delta and a final `done` event with the full answer. Messages are persisted only once the
+    answer has been fully streamed; failures are reported as an `error` event.
+    """
+    try:
+        started = time.perf_counter()
+        chat_id, messages, knowledge = _prepare_chat(chat_request)
+        yield _sse_event("context", {"chat_id": chat_id, "knowledge": knowledge.model_dump()})
+
+        answer_parts = []
+        first_token_at = None
+        for delta in llm_client.chat_stream(messages=messages, temperature=chat_request.temperature):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                logger.info(f"Chat {chat_id} time to first token: {first_token_at - started:.3f}s")
+            answer_parts.append(delta)
+            yield _sse_event("token", {"delta": delta})
+
+        answer = "".join(answer_parts)
+        _save_chat_turn(chat_id, chat_request.query, answer)
+        logger.info(f"Chat {chat_id} streamed {len(answer_parts)} chunks in {time.perf_counter() - started:.3f}s")
+        yield _sse_event("done", {"chat_id": chat_id, "answer": answer})
+    except Exception as e:
+        logger.error(f"Error in chat_with_course_stream: {e}")
+        yield _sse_event("error", {"detail": str(e)})
+
+
+def _ndjson_event(event: str, data: dict) -> str:
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False, default=str) + "\n"
+
+
+def _stream_event(event: str, data: dict, stream_format: str) -> str:
+    if stream_format == "sse":
+        return _sse_event(event, data)
+    return _ndjson_event(event, data)
+
+
+def _stream_course_videos(videos: Iterator, total: int, assemble, stream_format: str) -> Iterator[str]:
+    """
+    Turn an iterator of finished videos into one `video` event per video and a final `course` event.
+    """
+    results = {}
+    for item in videos:
+        if item is None:
+            yield _stream_event("heartbeat", {"completed": len(results), "total": total}, stream_format)
+            continue
+        (chapter_index, video_index), video = item
+        results[(chapter_index, video_index)] = video
+        yield _stream_event("video", {
+            "chapter_index": chapter_index,
+            "video_index": video_index,
+            "completed": len(results),
+            "total": total,
+            "video": video.model_dump()
+        }, stream_format)
+    yield _stream_event("course", assemble(results).model_dump(), stream_format)
+
+
+def generate_course_content_stream(outline_request: CourseOutLines, stream_format: str = "ndjson",
+                                   max_workers: int = 10, resume: bool = True) -> Iterator[str]:
+    """
+    Streaming variant of `generate_course_content`, as NDJSON lines or Server-Sent Events.
+
+    Emits a `video` event with the chapter and video index whenever a video script is done, a
+    `heartbeat` event after STREAM_HEARTBEAT_SECONDS without progress, and a final `course` event
+    with the assembled CourseScript. Failures are reported as an `error` event.
+    """
+    logger.info(f"Starting streamed course content generation for: {outline_request.course_name}")
+    try:
+        system_prompt = get_system_prompt(outline_request)
+        total = sum(len(chapter.videos) for chapter in outline_request.chapters)
+        videos = iter_course_videos(outline_request, system_prompt, max_workers=max_workers,
+                                    heartbeat=STREAM_HEARTBEAT_SECONDS, resume=resume)
+        yield from _stream_course_videos(videos, total,
+                                         lambda scripts: assemble_course_script(outline_request, scripts),
+                                         stream_format)
+    except Exception as e:
+        logger.error(f"Error generating course content: {e}")
+        yield _stream_event("error", {"detail": str(e)}, stream_format)
+
+
+def generate_course_quiz_stream(course_content: CourseScript, stream_format: str = "ndjson",
+                                resume: bool = True) -> Iterator[str]:
+    """
+    Streaming variant of `generate_course_quiz`; emits the same events as `generate_course_content_stream`,
+    with the assembled CourseScriptWithQuiz in the final `course` event.
+    """
+    logger.info(f"Starting streamed quiz generation for: {course_content.course_name}")
+    try:
+        total = sum(len(chapter.videos) for chapter in course_content.chapters)
+        videos = iter_course_quiz_videos(course_content, heartbeat=STREAM_HEARTBEAT_SECONDS, resume=resume)
+        yield from _stream_course_videos(videos, total,
+                                         lambda quizzes: assemble_course_with_quiz(course_content, quizzes),
+                                         stream_format)
+    except Exception as e:
+        logger.error(f"Error generating course quiz: {e}")
+        yield _stream_event("error", {"detail": str(e)}, stream_format)
@@ -0,0 +1,51 @@
+import logging
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.container import job_queue
+from app.jobs.job_queue import JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_job(job_type: str, payload: Dict[str, Any]) -> Dict[str, str]:
+    try:
+        job_id = job_queue.enqueue(job_type, payload)
+        logger.info(f"Enqueued {job_type} job {job_id}")
+        return {"job_id": job_id, "status": JobStatus.QUEUED}
+    except Exception as error:
+        logger.error(f"Error enqueuing {job_type} job: {error}")
+        raise error
+
+
+def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Status of a job without its payload and result, or None for an unknown job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return None
+    return jsonable_encoder({
+        "job_id": job_id,
+        "type": job["type"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "progress": job.get("progress"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    })
+
+
+def get_job_result(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Status of a job together with its result, or None for an unknown job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return None
+    return jsonable_encoder({"job_id": job_id, "status": job["status"], "result": job.get("result")},
+                            custom_encoder={ObjectId: str})
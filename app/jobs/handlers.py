@@ -0,0 +1,149 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+from app.model.content_dto import CourseOutLines, CourseScript
+from app.model.processing_models import QuizResults
+from app.schema.video_schema import VideoRequestSchema
+
+# How often run_async checks whether the job is still leased to its worker
+LEASE_CHECK_SECONDS = 1.0
+
+
+class LeaseLostError(Exception):
+    """
+    Raised inside a job once its worker no longer holds the lease, so the handler stops working on it.
+    """
+
+
+class ProgressCallback:
+    """
+    Called by a handler with its progress, which the worker stores with every heartbeat.
+
+    Once the worker lost the lease of the job, `lease_lost` is set and the next report raises
+    LeaseLostError.
+    """
+
+    def __init__(self):
+        self.progress: Dict[str, Any] = {}
+        self.lease_lost = threading.Event()
+
+    def __call__(self, update: Dict[str, Any]) -> None:
+        self.check_lease()
+        self.progress = dict(update)
+
+    def check_lease(self) -> None:
+        if self.lease_lost.is_set():
+            raise LeaseLostError("The job lease was taken over by another worker")
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def run_async(coroutine: Coroutine, report: Optional[ProgressCallback] = None) -> Any:
+    """
+    Run a coroutine on the worker's event loop and wait for its result.
+
+    All jobs share one long-lived loop, because the async LLM client keeps its connection pool
+    bound to the loop it was first used on.
+
+    :param report: Progress callback of the job; the coroutine is cancelled once its lease is lost.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="job-event-loop", daemon=True).start()
+    future = asyncio.run_coroutine_threadsafe(coroutine, _loop)
+    if report is None:
+        return future.result()
+    while True:
+        try:
+            return future.result(timeout=LEASE_CHECK_SECONDS)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise
+        if report.lease_lost.is_set():
+            future.cancel()
+            report.check_lease()
+
+
+class JobTypeEnum:
+    """
+    Enum class for the job types the workers can run.
+    """
+    COURSE_CONTENT = 'course_content'
+    COURSE_QUIZ = 'course_quiz'
+    PROCESS_VIDEO = 'process_video'
+    TRANSLATE_VIDEO = 'translate_video'
+
+
+def _track_videos(videos, total: int, report: ProgressCallback) -> dict:
+    results = {}
+    for item in videos:
+        if item is None:
+            report({"completed": len(results), "total": total})
+            continue
+        key, video = item
+        results[key] = video
+        report({"completed": len(results), "total": total})
+    return results
+
+
+def run_course_content(payload: Dict[str, Any], report: ProgressCallback) -> Dict[str, Any]:
+    from app.controller.course_generation_controller import assemble_course_script, get_system_prompt, \
+        iter_course_videos, STREAM_HEARTBEAT_SECONDS
+
+    outline = CourseOutLines.model_validate(payload["outline"])
+    total = sum(len(chapter.videos) for chapter in outline.chapters)
+    videos = iter_course_videos(outline, get_system_prompt(outline), heartbeat=STREAM_HEARTBEAT_SECONDS)
+    return assemble_course_script(outline, _track_videos(videos, total, report)).model_dump()
+
+
+def run_course_quiz(payload: Dict[str, Any], report: ProgressCallback) -> Dict[str, Any]:
+    from app.controller.course_generation_controller import assemble_course_with_quiz, generate_course_quiz, \
+        iter_course_quiz_videos, STREAM_HEARTBEAT_SECONDS
+
+    course = CourseScript.model_validate(payload["course"])
+    if payload.get("use_batch"):
+        return generate_course_quiz(course, use_batch=True).model_dump()
+    total = sum(len(chapter.videos) for chapter in course.chapters)
+    videos = iter_course_quiz_videos(course, heartbeat=STREAM_HEARTBEAT_SECONDS)
+    return assemble_course_with_quiz(course, _track_videos(videos, total, report)).model_dump()
+
+
+def run_process_video(payload: Dict[str, Any], report: ProgressCallback) -> List[Dict[str, Any]]:
+    from app.service.course_service import generate_quiz, get_paragraph, process_paragraphs, simplify_paragraph_v1
+
+    video = VideoRequestSchema.model_validate(payload["video"])
+    use_batch, packed = payload.get("use_batch", False), payload.get("packed", False)
+
+    async def run():
+        paragraphs = await get_paragraph(video)
+        report({"stage": "paragraphs", "paragraphs": len(paragraphs)})
+        if not use_batch and not packed:
+            return await process_paragraphs(paragraphs)
+        simplified = await simplify_paragraph_v1(paragraphs, use_batch=use_batch, packed=packed)
+        return await generate_quiz(simplified, use_batch=use_batch)
+
+    return [result.model_dump() for result in run_async(run(), report)]
+
+
+def run_translate_video(payload: Dict[str, Any], report: ProgressCallback) -> List[Dict[str, Any]]:
+    from app.service.translate_service import translate_video
+
+    video = [QuizResults.model_validate(item) for item in payload["video"]]
+    results = run_async(translate_video(video, payload["language"], use_batch=payload.get("use_batch", False)),
+                        report)
+    return [result.model_dump() for result in results]
+
+
+# Handlers import their controllers lazily so a worker only loads what its job types need
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], ProgressCallback], Any]] = {
+    JobTypeEnum.COURSE_CONTENT: run_course_content,
+    JobTypeEnum.COURSE_QUIZ: run_course_quiz,
+    JobTypeEnum.PROCESS_VIDEO: run_process_video,
+    JobTypeEnum.TRANSLATE_VIDEO: run_translate_video,
+}
@@ -0,0 +1,183 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.database import Database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    """
+    Enum class for the states of a job.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+class MongoJobQueue:
+    """
+    Durable job queue stored in a MongoDB collection.
+
+    Workers claim jobs atomically and hold them under a lease that they keep extending with
+    heartbeats. A job whose lease expires, because its worker died or was redeployed, is handed
+    to the next worker that asks, until it has been attempted `max_attempts` times.
+    """
+
+    def __init__(self, database: Database, collection_name: str = "jobs", lease_seconds: float = 120,
+                 max_attempts: int = 3):
+        """
+        :param database: MongoDB database holding the jobs, e.g. the one of MongoChatClient.
+        :param collection_name: Collection of jobs.
+        :param lease_seconds: How long a claimed job stays with its worker without a heartbeat.
+        :param max_attempts: Attempts after which a failing or abandoned job is marked as failed.
+        """
+        self.jobs = database[collection_name]
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._indexed = False
+
+    @classmethod
+    def from_env(cls, database: Database) -> "MongoJobQueue":
+        return cls(
+            database=database,
+            collection_name=os.getenv("JOB_COLLECTION", "jobs"),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", 120)),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+        )
+
+    def _ensure_indexes(self) -> None:
+        # Created lazily so importing the API does not require a reachable database
+        if not self._indexed:
+            self.jobs.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+            self.jobs.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+            self._indexed = True
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any]) -> str:
+        """
+        Add a job to the queue.
+
+        :param job_type: Name of the handler that runs the job.
+        :param payload: Arguments of the handler; must be storable in MongoDB.
+        :return: ID of the new job.
+        """
+        self._ensure_indexes()
+        now = datetime.now(timezone.utc)
+        result = self.jobs.insert_one({
+            "type": job_type,
+            "payload": payload,
+            "status": JobStatus.QUEUED,
+            "attempts": 0,
+            "progress": None,
+            "result": None,
+            "error": None,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        return str(result.inserted_id)
+
+    def claim(self, worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job, or a running job whose lease has expired.
+
+        :param worker_id: Identifier of the claiming worker.
+        :param job_types: Only claim jobs of these types; all types when omitted.
+        :return: The claimed job document, or None when there is nothing to do.
+        """
+        self._ensure_indexes()
+        now = datetime.now(timezone.utc)
+        query: Dict[str, Any] = {
+            "$or": [
+                {"status": JobStatus.QUEUED},
+                {"status": JobStatus.RUNNING, "lease_expires_at": {"$lt": now}},
+            ]
+        }
+        if job_types:
+            query["type"] = {"$in": job_types}
+
+        while True:
+            job = self.jobs.find_one_and_update(
+                query,
+                {
+                    "$set": {
+                        "status": JobStatus.RUNNING,
+                        "worker_id": worker_id,
+                        "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                        "started_at": now,
+                        "updated_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("created_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None or job["attempts"] <= self.max_attempts:
+                return job
+            # Abandoned too often, most likely because it kills its worker
+            logger.error(f"Job {job['_id']} was abandoned {self.max_attempts} times, marking it as failed")
+            self._finish(job["_id"], worker_id, JobStatus.FAILED, error="Job lease expired too many times")
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Extend the lease of a running job.
+
+        :param progress: Optional progress information stored with the job.
+        :return: False when the job is no longer leased by this worker, which should then stop working on it.
+        """
+        now = datetime.now(timezone.utc)
+        update: Dict[str, Any] = {
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+            "updated_at": now,
+        }
+        if progress is not None:
+            update["progress"] = progress
+        result = self.jobs.update_one(
+            {"_id": ObjectId(job_id), "worker_id": worker_id, "status": JobStatus.RUNNING},
+            {"$set": update}
+        )
+        return result.matched_count == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        return self._finish(ObjectId(job_id), worker_id, JobStatus.SUCCEEDED, result=result)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Record a failed attempt; the job is queued again until it has used up its attempts.
+        """
+        job = self.jobs.find_one({"_id": ObjectId(job_id), "worker_id": worker_id})
+        if job is not None and job["attempts"] < self.max_attempts:
+            result = self.jobs.update_one(
+                {"_id": ObjectId(job_id), "worker_id": worker_id, "status": JobStatus.RUNNING},
+                {"$set": {"status": JobStatus.QUEUED, "error": error, "worker_id": None,
+                          "lease_expires_at": None, "updated_at": datetime.now(timezone.utc)}}
+            )
+            return result.matched_count == 1
+        return self._finish(ObjectId(job_id), worker_id, JobStatus.FAILED, error=error)
+
+    def _finish(self, job_id: ObjectId, worker_id: str, status: str, result: Any = None,
+                error: Optional[str] = None) -> bool:
+        now = datetime.now(timezone.utc)
+        update_result = self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": JobStatus.RUNNING},
+            {"$set": {"status": status, "result": result, "error": error, "lease_expires_at": None,
+                      "finished_at": now, "updated_at": now}}
+        )
+        return update_result.matched_count == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        :return: The job document, or None for an unknown or malformed ID.
+        """
+        if not ObjectId.is_valid(job_id):
+            return None
+        return self.jobs.find_one({"_id": ObjectId(job_id)})
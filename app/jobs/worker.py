@@ -0,0 +1,144 @@
+"""
+Standalone worker running queued generation jobs.
+
+    python -m app.jobs.worker --concurrency 2
+    python -m app.jobs.worker --types course_content course_quiz
+
+Any number of workers on any number of nodes can share one MongoDB; each job is leased to a
+single worker at a time. SIGTERM and SIGINT let the running jobs finish before the worker exits.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import traceback
+import uuid
+from typing import List, Optional
+
+from app.jobs.handlers import JOB_HANDLERS, ProgressCallback
+from app.jobs.job_queue import MongoJobQueue
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Claims jobs from the queue and runs them, extending the lease of the running job in the background.
+    """
+
+    def __init__(self, queue: MongoJobQueue, worker_id: Optional[str] = None,
+                 job_types: Optional[List[str]] = None, poll_interval: float = 2.0):
+        """
+        :param queue: Queue to take jobs from.
+        :param worker_id: Identifier stored on claimed jobs; host name, process ID and a random suffix by default.
+        :param job_types: Job types this worker runs; every registered type when omitted.
+        :param poll_interval: Seconds to wait before asking again when the queue is empty.
+        """
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.job_types = job_types or list(JOB_HANDLERS)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = queue.lease_seconds / 3
+        self._stopping = threading.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run_forever(self) -> None:
+        logger.info(f"Worker {self.worker_id} waiting for jobs of type {', '.join(self.job_types)}")
+        while not self._stopping.is_set():
+            try:
+                if not self.run_once():
+                    self._stopping.wait(self.poll_interval)
+            except Exception as e:
+                # The queue itself is unreachable; keep trying instead of exiting
+                logger.error(f"Worker {self.worker_id} could not reach the job queue: {e}")
+                self._stopping.wait(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """
+        Claim and run a single job.
+
+        :return: False when no job was available.
+        """
+        job = self.queue.claim(self.worker_id, self.job_types)
+        if job is None:
+            return False
+
+        job_id = str(job["_id"])
+        logger.info(f"Worker {self.worker_id} running job {job_id} ({job['type']}, attempt {job['attempts']})")
+        report = ProgressCallback()
+        finished = threading.Event()
+
+        def keep_lease():
+            while not finished.wait(self.heartbeat_interval):
+                try:
+                    if not self.queue.heartbeat(job_id, self.worker_id, report.progress or None):
+                        logger.warning(f"Worker {self.worker_id} lost the lease of job {job_id}, stopping it")
+                        report.lease_lost.set()
+                        return
+                except Exception as e:
+                    logger.error(f"Heartbeat of job {job_id} failed: {e}")
+
+        heartbeat = threading.Thread(target=keep_lease, name=f"heartbeat-{job_id}", daemon=True)
+        heartbeat.start()
+        try:
+            result = JOB_HANDLERS[job["type"]](job["payload"], report)
+        except Exception as e:
+            finished.set()
+            if report.lease_lost.is_set():
+                # Another worker owns the job now; its attempt decides the outcome
+                logger.warning(f"Job {job_id} stopped after its lease was lost: {e}")
+            else:
+                logger.error(f"Job {job_id} failed: {e}")
+                self.queue.fail(job_id, self.worker_id, "".join(traceback.format_exception_only(e)).strip())
+        else:
+            finished.set()
+            if report.lease_lost.is_set():
+                logger.warning(f"Result of job {job_id} discarded, its lease was lost")
+            elif self.queue.complete(job_id, self.worker_id, result):
+                logger.info(f"Job {job_id} succeeded")
+            else:
+                logger.warning(f"Result of job {job_id} discarded, its lease was taken over by another worker")
+        heartbeat.join()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued course generation jobs.")
+    parser.add_argument("--types", nargs="+", choices=sorted(JOB_HANDLERS),
+                        help="Job types to run; all types by default")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKER_CONCURRENCY", 1)),
+                        help="Jobs this process runs at the same time")
+    parser.add_argument("--poll-interval", type=float, default=float(os.getenv("JOB_POLL_INTERVAL", 2)))
+    args = parser.parse_args()
+
+    from app.container import job_queue
+
+    workers = [JobWorker(job_queue, job_types=args.types, poll_interval=args.poll_interval)
+               for _ in range(args.concurrency)]
+
+    def shutdown(signum, frame):
+        logger.info("Shutting down after the running jobs finish")
+        for worker in workers:
+            worker.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    threads = [threading.Thread(target=worker.run_forever, name=worker.worker_id) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
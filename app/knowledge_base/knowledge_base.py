@@ -6,6 +6,7 @@ from pyobjectID import PyObjectId
 
 from app.knowledge_base.chat_controller.chat_database import ChatDatabase
 from app.knowledge_base.vector_database.vector_database import VectorDatabase
+from app.knowledge_base.vector_embedding.query_cache import QueryEmbeddingCache
 from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
 from app.model.content_dto import CourseScript
 from app.model.course_knowledge import CourseKnowledge
@@ -14,11 +15,13 @@ from app.model.course_knowledge import CourseKnowledge
 class KnowledgeBase:
     def __init__(self, vector_embeddings: VectorEmbedding,
                  vector_database: VectorDatabase,
-                 chat_database: Optional[ChatDatabase] = None):
+                 chat_database: Optional[ChatDatabase] = None,
+                 query_cache: Optional[QueryEmbeddingCache] = None):
         """Initialize the KnowledgeBase with vector embeddings and a vector database."""
         self.vector_embeddings = vector_embeddings
         self.vector_database = vector_database
         self.chat_database = chat_database
+        self.query_cache = query_cache
 
     def add_knowledge(self, query_text: str, collection_name: str, payload: dict):
         """
@@ -31,13 +34,42 @@ class KnowledgeBase:
             print(f"Error adding knowledge: {e}")
             raise e
 
+    def add_knowledge_batch(self, query_texts: list[str], collection_name: str, payloads: list[dict]):
+        """
+        Add many pieces of knowledge at once: the texts are embedded with as few embedding calls as
+        the embedding client allows and stored with bulk writes.
+        """
+        try:
+            if len(query_texts) != len(payloads):
+                raise ValueError("Every query text needs exactly one payload.")
+            if not query_texts:
+                return
+            vectors = self.vector_embeddings.embed_batch(query_texts)
+            self.vector_database.insert_items(collection_name=collection_name, vectors=vectors, metadatas=payloads)
+        except Exception as e:
+            print(f"Error adding knowledge: {e}")
+            raise e
+
+    def embed_query(self, query_text: str) -> list[float]:
+        """
+        Embed a search query, reusing the vector of an equivalent recent query when a query cache is set.
+        """
+        if self.query_cache is None:
+            return self.vector_embeddings.embed_query(query_text)
+        normalized_text = self.query_cache.normalize(query_text)
+        vector = self.query_cache.get(normalized_text)
+        if vector is None:
+            vector = self.vector_embeddings.embed_query(normalized_text)
+            self.query_cache.set(normalized_text, vector)
+        return vector
+
     def get_knowledge(self, collection_name: str, query_text: str,
                       top_k: int = 10, score_threshold: float = None,
                       filter_key: str = None,
                       filter_value: str = None
                       ):
         try:
-            query_vector = self.vector_embeddings.embed(query_text)
+            query_vector = self.embed_query(query_text)
             results = self.vector_database.vector_search(collection_name=collection_name,
                                                          query_vector=query_vector,
                                                          top_k=top_k,
@@ -141,6 +173,8 @@ class KnowledgeBase:
         chapter_ids = []
         video_ids = []
         paragraph_ids = []
+        paragraph_texts = []
+        paragraph_payloads = []
 
         for chapter_index, chapter in enumerate(course_data.chapters, start=1):
             # 2️⃣ Insert chapter
@@ -192,21 +226,25 @@ class KnowledgeBase:
                         document=paragraph_doc
                     )
                     paragraph_ids.append(str(paragraph_id))
-                    self.add_knowledge(
-                        collection_name="course",
-                        query_text=paragraph_text,
-                        payload={
-                            "course_id": str(course_id),
-                            "chapter_id": str(chapter_id),
-                            "chapter_index": chapter_index,
-                            "video_id": str(video_id),
-                            "video_index": video_index,
-                            "paragraph_id": str(paragraph_id),
-                            "paragraph_index": paragraph_index,
-                            "paragraph_text": paragraph_text,
-                            "created_at": datetime.utcnow(),
-                        }
-                    )
+                    paragraph_texts.append(paragraph_text)
+                    paragraph_payloads.append({
+                        "course_id": str(course_id),
+                        "chapter_id": str(chapter_id),
+                        "chapter_index": chapter_index,
+                        "video_id": str(video_id),
+                        "video_index": video_index,
+                        "paragraph_id": str(paragraph_id),
+                        "paragraph_index": paragraph_index,
+                        "paragraph_text": paragraph_text,
+                        "created_at": datetime.utcnow(),
+                    })
+
+        # 5️⃣ Embed and index all paragraphs in bulk
+        self.add_knowledge_batch(
+            collection_name="course",
+            query_texts=paragraph_texts,
+            payloads=paragraph_payloads
+        )
 
         return {
             "course_id": str(course_id),
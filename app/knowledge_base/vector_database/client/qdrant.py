@@ -1,3 +1,4 @@
+import os
 import uuid
 from typing import List
 from qdrant_client.http.models import Filter, FieldCondition, MatchValue
@@ -13,6 +14,10 @@ from qdrant_client.http.models import (
 from app.knowledge_base.vector_database.vector_database import VectorDatabase
 
 
+# Points sent per upsert request by insert_items
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", 256))
+
+
 class QdrantDBClient(VectorDatabase):
     """
     Singleton class for managing interactions with a Qdrant vector database.
@@ -51,6 +56,27 @@ class QdrantDBClient(VectorDatabase):
         except Exception as e:
             raise e
 
+    def insert_items(self,
+                     collection_name: str,
+                     vectors: List[List[float]],
+                     metadatas: List[dict] = None,
+                     ) -> UpdateResult:
+        try:
+            metadatas = metadatas or [None] * len(vectors)
+            points = [
+                models.PointStruct(id=str(uuid.uuid4()), payload=metadata, vector=vector)
+                for vector, metadata in zip(vectors, metadatas)
+            ]
+            result = None
+            for start in range(0, len(points), QDRANT_UPSERT_BATCH_SIZE):
+                result = self.client.upsert(
+                    collection_name=collection_name,
+                    points=points[start:start + QDRANT_UPSERT_BATCH_SIZE]
+                )
+            return result
+        except Exception as e:
+            raise e
+
     def vector_search(
             self, collection_name: str, query_vector: list[float], top_k: int = 10,
             score_threshold: float = None, filter_key: str = None,
@@ -22,6 +22,22 @@ class VectorDatabase(ABC):
         """
         pass
 
+    @abstractmethod
+    def insert_items(self, collection_name: str, vectors: list[list[float]],
+                     metadatas: list[dict] = None) -> Dict[str, Any]:
+        """
+        Insert many vectors into the database in bulk.
+
+        Args:
+            collection_name (str): The name of the collection where the vectors will be stored.
+            vectors (list[list[float]]): The vectors to insert.
+            metadatas (list[dict]): Optional metadata of each vector, in the order of `vectors`.
+
+        Returns:
+            str: The result of the last bulk write.
+        """
+        pass
+
     @abstractmethod
     def vector_search(self,  collection_name: str, query_vector: list[float], top_k: int = 10,
             score_threshold: float = None, filter_key: str = None,
@@ -1,12 +1,22 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import cohere
+
+from app.client.transport import http_client_from_env
 from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
 
+# Cohere accepts at most 96 texts per embed request
+COHERE_MAX_BATCH_SIZE = 96
+
 
 class CohereEmbeddingClient(VectorEmbedding):
     def __init__(
             self,
             api_key: str,
-            model: str = "embed-multilingual-v3.0"
+            model: str = "embed-multilingual-v3.0",
+            batch_size: int = COHERE_MAX_BATCH_SIZE,
+            max_concurrency: int = int(os.getenv("COHERE_EMBED_CONCURRENCY", 4))
     ) -> None:
         """
         Initializes the Cohere embedding client with the provided API key and model.
@@ -14,9 +24,31 @@ class CohereEmbeddingClient(VectorEmbedding):
         Args:
             api_key (str): The API key for accessing Cohere services.
             model (str): The model to use for embedding generation.
+            batch_size (int): Texts sent per embed request by `embed_batch`, at most 96.
+            max_concurrency (int): Embed requests `embed_batch` runs at the same time.
         """
-        self.client = cohere.ClientV2(api_key=api_key)
+        self.client = cohere.ClientV2(api_key=api_key, httpx_client=http_client_from_env())
         self.model = model
+        self.batch_size = min(batch_size, COHERE_MAX_BATCH_SIZE)
+        self.max_concurrency = max_concurrency
+
+    def _embed_texts(self, texts: list[str], input_type: str = "search_document") -> list[list[float]]:
+        response = self.client.embed(
+            model=self.model,
+            texts=texts,
+            input_type=input_type,
+            embedding_types=["float"],
+        )
+        return response.embeddings.float
+
+    def _embed_in_batches(self, texts: list[str], input_type: str) -> list[list[float]]:
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1:
+            return self._embed_texts(batches[0], input_type) if batches else []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # map keeps the order of the batches
+            vectors = executor.map(lambda batch: self._embed_texts(batch, input_type), batches)
+            return [vector for batch_vectors in vectors for vector in batch_vectors]
 
     def embed(self, text: str) -> list[float]:
         """
@@ -29,12 +61,53 @@ class CohereEmbeddingClient(VectorEmbedding):
             list[float]: The vector representation of the input text.
         """
         try:
-            response = self.client.embed(
-                model=self.model,
-                texts=[text],
-                input_type="search_document",
-                embedding_types=["float"],
-            )
-            return response.embeddings.float[0]
+            return self._embed_texts([text])[0]
+        except Exception as e:
+            raise e
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Convert many texts to vector representations.
+
+        The texts are sent in requests of `batch_size`, `max_concurrency` of them at a time.
+
+        Args:
+            texts (list[str]): The input texts to be embedded.
+
+        Returns:
+            list[list[float]]: One vector per input text, in the order of `texts`.
+        """
+        try:
+            return self._embed_in_batches(texts, input_type="search_document")
+        except Exception as e:
+            raise e
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Convert a search query to a vector representation, embedded as a query rather than a document.
+
+        Args:
+            text (str): The query to be embedded.
+
+        Returns:
+            list[float]: The vector representation of the query.
+        """
+        try:
+            return self._embed_texts([text], input_type="search_query")[0]
+        except Exception as e:
+            raise e
+
+    def embed_query_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Convert many search queries to vector representations.
+
+        Args:
+            texts (list[str]): The queries to be embedded.
+
+        Returns:
+            list[list[float]]: One vector per query, in the order of `texts`.
+        """
+        try:
+            return self._embed_in_batches(texts, input_type="search_query")
         except Exception as e:
             raise e
@@ -1,12 +1,16 @@
-# from sentence_transformers import SentenceTransformer
 from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
 
 class HuggingFaceEmbeddingClient(VectorEmbedding):
     def __init__(self, model: str = "Qwen/Qwen3-Embedding-0.6B") -> None:
         """
         Initializes the HuggingFace embedding client with the provided model.
+
+        Requires the optional sentence-transformers package, which pulls in PyTorch.
         """
-        # self.client = SentenceTransformer(model)
+        from sentence_transformers import SentenceTransformer
+
+        self.client = SentenceTransformer(model)
+        self.model = model
 
     def embed(self, text: str) -> list[float]:
         """
@@ -24,3 +28,21 @@ class HuggingFaceEmbeddingClient(VectorEmbedding):
         except Exception as e:
             print(f"Embedding error: {e}")
             raise e
+
+    def embed_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
+        """
+        Convert many texts to vector representations in batches of `batch_size`.
+
+        Args:
+            texts (list[str]): The input texts to be embedded.
+            batch_size (int): Texts encoded together in one forward pass.
+
+        Returns:
+            list[list[float]]: One vector per input text, in the order of `texts`.
+        """
+        try:
+            embeddings = self.client.encode(texts, batch_size=batch_size, convert_to_numpy=True)  # shape: (n, dim)
+            return embeddings.tolist()
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            raise e
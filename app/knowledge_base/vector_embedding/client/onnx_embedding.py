@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+
+from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
+
+
+class OnnxEmbeddingClient(VectorEmbedding):
+    """
+    Local CPU embedding through ONNX Runtime, without any network call.
+
+    `model_dir` is a Hugging Face model exported to ONNX, holding `model.onnx` and `tokenizer.json`:
+
+        optimum-cli export onnx --model BAAI/bge-m3 --task feature-extraction models/bge-m3
+
+    BAAI/bge-m3 is multilingual and produces 1024-dim vectors like embed-multilingual-v3.0, so it fits
+    the existing Qdrant collections' vector size; vectors of different models are not comparable,
+    though, so a collection must be re-indexed when switching backends.
+    """
+
+    def __init__(
+            self,
+            model_dir: str,
+            quantize: bool = False,
+            pooling: str = "cls",
+            max_length: int = 512,
+            batch_size: int = 32,
+            num_threads: int = os.cpu_count() or 1,
+    ) -> None:
+        """
+        Initializes the ONNX Runtime session and the tokenizer of the exported model.
+
+        Args:
+            model_dir (str): Directory of the exported model.
+            quantize (bool): Run an int8 dynamically quantized copy of the model, created next to it
+                as `model_quantized.onnx` on first use.
+            pooling (str): "cls" for models pooling on the first token like bge-m3, "mean" for
+                sentence-transformers models pooling on all tokens.
+            max_length (int): Texts are truncated to this many tokens.
+            batch_size (int): Texts run through the model together in one pass by `embed_batch`.
+            num_threads (int): Size of ONNX Runtime's thread pool; one thread per core by default.
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"Unsupported pooling: {pooling}. Supported poolings are: cls, mean.")
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        if quantize:
+            model_path = self._quantized_model(model_path)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options,
+                                                    providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        # Part of the embedding cache keys, so quantized and full precision vectors are kept apart
+        self.model = f"{os.path.basename(os.path.normpath(model_dir))}{'-int8' if quantize else ''}"
+        self.pooling = pooling
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _quantized_model(model_path: str) -> str:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(os.path.dirname(model_path), "model_quantized.onnx")
+        if not os.path.exists(quantized_path):
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        return quantized_path
+
+    def _embed_texts(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        hidden_states = self.session.run(None, inputs)[0]  # shape: (n, tokens, dim)
+        if self.pooling == "cls":
+            embeddings = hidden_states[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(hidden_states.dtype)
+            embeddings = (hidden_states * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    def embed(self, text: str) -> list[float]:
+        """
+        Convert text to a vector representation.
+
+        Args:
+            text (str): The input text to be embedded.
+
+        Returns:
+            list[float]: The vector representation of the input text.
+        """
+        try:
+            return self._embed_texts([text])[0].tolist()
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            raise e
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Convert many texts to vector representations in batches of `batch_size`.
+
+        Texts of similar length are batched together so little compute goes to padding.
+
+        Args:
+            texts (list[str]): The input texts to be embedded.
+
+        Returns:
+            list[list[float]]: One vector per input text, in the order of `texts`.
+        """
+        try:
+            order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+            vectors: list = [None] * len(texts)
+            for start in range(0, len(order), self.batch_size):
+                indexes = order[start:start + self.batch_size]
+                for index, vector in zip(indexes, self._embed_texts([texts[i] for i in indexes])):
+                    vectors[index] = vector.tolist()
+            return vectors
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            raise e
@@ -0,0 +1,250 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Stays under SQLite's limit on the number of query parameters
+SQLITE_MAX_VARIABLES = 900
+# Slots reserved this long ago by a writer that never finished are reused
+STALE_RESERVATION_SECONDS = 300
+
+
+class EmbeddingCache:
+    """
+    Content-addressed store of embedding vectors shared by every process using the same directory.
+
+    Vectors live in a float32 memory-mapped file of fixed-size slots, so several uvicorn workers read
+    them through the page cache instead of each holding a copy. A SQLite index maps each key to its
+    slot; once every slot is taken, the least recently used entries give their slots to new ones.
+
+    The cache never fails an embedding call: on any storage error it logs and behaves as a miss.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, dim: int = 1024, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param cache_dir: Directory of the vector file and its index. The cache is disabled when empty.
+        :param dim: Length of the cached vectors; vectors of another length are not cached.
+        :param max_bytes: Size of the vector file, which bounds the number of cached vectors.
+        """
+        self.cache_dir = cache_dir
+        self.dim = dim
+        self.capacity = max(1, max_bytes // (dim * 4))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            cache_dir=os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache"),
+            dim=int(os.getenv("EMBEDDING_CACHE_DIM", 1024)),
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+        )
+
+    @staticmethod
+    def make_key(model: str, input_type: str, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}\0{input_type}\0{text_hash}".encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            connection = sqlite3.connect(os.path.join(self.cache_dir, f"index_{self.dim}.sqlite"),
+                                         timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, "
+                               "last_used REAL, ready INTEGER)")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+            self._local.connection = connection
+        return connection
+
+    def _vector_file(self) -> np.memmap:
+        with self._lock:
+            if self._vectors is None:
+                path = os.path.join(self.cache_dir, f"vectors_{self.dim}.f32")
+                size = self.capacity * self.dim * 4
+                # Growing a file is idempotent, so concurrent workers can all do it; the file stays sparse
+                with open(path, "ab") as file:
+                    if file.tell() < size:
+                        file.truncate(size)
+                self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+            return self._vectors
+
+    @staticmethod
+    def _select_in(connection: sqlite3.Connection, query: str, keys: List[str]) -> list:
+        """
+        Run a query with a `{keys}` placeholder for an IN list, in chunks of SQLite's parameter limit.
+        """
+        rows = []
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            rows.extend(connection.execute(query.format(keys=",".join("?" * len(chunk))), chunk).fetchall())
+        return rows
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        :return: The cached vectors of the keys that have one.
+        """
+        if not self.cache_dir or not keys:
+            return {}
+        found: Dict[str, List[float]] = {}
+        try:
+            connection = self._connection()
+            vectors = self._vector_file()
+            query = "SELECT key, slot FROM entries WHERE ready = 1 AND key IN ({keys})"
+            slots = dict(self._select_in(connection, query, keys))
+            read = {key: np.array(vectors[slot]) for key, slot in slots.items()}
+            if slots:
+                # A slot may have been handed to another key while it was read; drop those reads
+                current = dict(self._select_in(connection, query, list(slots)))
+                found = {key: vector.tolist() for key, vector in read.items() if current.get(key) == slots[key]}
+                connection.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                       [(time.time(), key) for key in found])
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Failed to read embedding cache: {e}")
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        if not self.cache_dir or not items:
+            return
+        items = {key: vector for key, vector in items.items() if len(vector) == self.dim}
+        try:
+            connection = self._connection()
+            vectors = self._vector_file()
+            reserved, evicted = self._reserve_slots(connection, list(items)[-self.capacity:])
+            if not reserved:
+                return
+            for key, slot in reserved.items():
+                vectors[slot] = np.asarray(items[key], dtype=np.float32)
+            vectors.flush()
+            connection.executemany("UPDATE entries SET ready = 1 WHERE key = ? AND slot = ?", reserved.items())
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Failed to write embedding cache: {e}")
+            return
+        with self._lock:
+            self.writes += len(reserved)
+            self.evictions += evicted
+
+    def _reserve_slots(self, connection: sqlite3.Connection, keys: List[str]) -> Tuple[Dict[str, int], int]:
+        """
+        Give each new key a slot, taking never used slots first and then those of the least recently
+        used entries. The entries are committed unready, so no reader uses a slot while it is written.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {row[0] for row in self._select_in(connection, "SELECT key FROM entries WHERE key IN ({keys})",
+                                                          keys)}
+            new_keys = [key for key in keys if key not in existing]
+            row = connection.execute("SELECT value FROM meta WHERE name = 'next_slot'").fetchone()
+            next_slot = row[0] if row else 0
+            fresh = list(range(next_slot, min(self.capacity, next_slot + len(new_keys))))
+            now = time.time()
+            # Unready entries are being written by another worker, unless that worker died long ago
+            stale = connection.execute(
+                "SELECT key, slot FROM entries WHERE ready = 1 OR last_used < ? ORDER BY last_used LIMIT ?",
+                (now - STALE_RESERVATION_SECONDS, len(new_keys) - len(fresh))
+            ).fetchall() if len(new_keys) > len(fresh) else []
+            connection.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in stale])
+            slots = fresh + [slot for _, slot in stale]
+            reserved = dict(zip(new_keys, slots))
+            connection.executemany("INSERT INTO entries (key, slot, last_used, ready) VALUES (?, ?, ?, 0)",
+                                   [(key, slot, now) for key, slot in reserved.items()])
+            connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('next_slot', ?)",
+                               (next_slot + len(fresh),))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return reserved, len(stale)
+
+    def stats(self) -> dict:
+        entries = 0
+        if self.cache_dir:
+            try:
+                entries = self._connection().execute("SELECT COUNT(*) FROM entries WHERE ready = 1").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": entries,
+                "capacity": self.capacity,
+            }
+
+
+class CachedEmbedding(VectorEmbedding):
+    """
+    Puts an `EmbeddingCache` in front of any `VectorEmbedding`, so each distinct text is embedded once
+    per model and input type; only the cache misses reach the wrapped client.
+    """
+
+    def __init__(self, embedding: VectorEmbedding, cache: EmbeddingCache, model: Optional[str] = None,
+                 input_type: str = "search_document", query_input_type: str = "search_query"):
+        """
+        :param embedding: The embedding client to cache.
+        :param cache: Where the vectors are stored.
+        :param model: Model name used in the cache keys; the `model` attribute of the client by default.
+        :param input_type: Input type used in the cache keys of documents.
+        :param query_input_type: Input type used in the cache keys of search queries.
+        """
+        self.embedding = embedding
+        self.cache = cache
+        self.model = model or getattr(embedding, "model", type(embedding).__name__)
+        self.input_type = input_type
+        self.query_input_type = query_input_type
+
+    def _embed_cached(self, texts: list[str], input_type: str,
+                      embed_missing: Callable[[list[str]], list[list[float]]]) -> list[list[float]]:
+        try:
+            keys = [self.cache.make_key(self.model, input_type, text) for text in texts]
+            vectors = self.cache.get_many(keys)
+            missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+            if missing:
+                embedded = dict(zip(missing, embed_missing(list(missing.values()))))
+                self.cache.set_many(embedded)
+                vectors.update(embedded)
+            return [vectors[key] for key in keys]
+        except Exception as e:
+            raise e
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self._embed_cached(texts, self.input_type, self.embedding.embed_batch)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_query_batch([text])[0]
+
+    def embed_query_batch(self, texts: list[str]) -> list[list[float]]:
+        return self._embed_cached(texts, self.query_input_type, self.embedding.embed_query_batch)
+
+
+embedding_cache = EmbeddingCache.from_env()
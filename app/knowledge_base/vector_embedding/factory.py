@@ -1,5 +1,6 @@
 from app.knowledge_base.vector_embedding.client.cohere_embedding import CohereEmbeddingClient
 from app.knowledge_base.vector_embedding.client.huggingface_embedding import HuggingFaceEmbeddingClient
+from app.knowledge_base.vector_embedding.client.onnx_embedding import OnnxEmbeddingClient
 from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
 
 
@@ -10,6 +11,7 @@ class EmbedEnum:
     OPENAI = 'openai'
     HUGGINGFACE = 'huggingface'
     COHERE = 'cohere'
+    ONNX = 'onnx'
     # Add more embedding model types as needed
 
 
@@ -41,6 +43,13 @@ class VectorEmbeddingFactory:
                 return HuggingFaceEmbeddingClient(model=kwargs['model'])
             except Exception as e:
                 raise ValueError(f"Failed to create HuggingFace embedding client: {e}")
+        if embed_type == EmbedEnum.ONNX:
+            try:
+                if 'model_dir' not in kwargs:
+                    raise ValueError("Model directory is required for ONNX embedding client.")
+                return OnnxEmbeddingClient(**kwargs)
+            except Exception as e:
+                raise ValueError(f"Failed to create ONNX embedding client: {e}")
         else:
             raise ValueError(f"Unsupported vector embedding type: {embed_type}. "
                              f"Supported types are: {', '.join(EmbedEnum.__dict__.keys())}.")
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from app.knowledge_base.vector_embedding.vector_embedding import VectorEmbedding
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingEmbed(NamedTuple):
+    text: str
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatchMetrics:
+    """
+    Counters of the batches sent by micro-batchers: their sizes and how long texts waited to join one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.max_batch_size = 0
+        self.queue_delay_seconds = 0.0
+        self.max_queue_delay_seconds = 0.0
+        self.failed_batches = 0
+
+    def record(self, batch_size: int, queue_delays: List[float], failed: bool = False) -> None:
+        with self._lock:
+            self.batches += 1
+            self.texts += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.queue_delay_seconds += sum(queue_delays)
+            self.max_queue_delay_seconds = max(self.max_queue_delay_seconds, max(queue_delays, default=0.0))
+            self.failed_batches += failed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "texts": self.texts,
+                "failed_batches": self.failed_batches,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "mean_queue_delay_ms": 1000 * self.queue_delay_seconds / self.texts if self.texts else 0.0,
+                "max_queue_delay_ms": 1000 * self.max_queue_delay_seconds,
+            }
+
+
+class MicroBatchingEmbedding(VectorEmbedding):
+    """
+    Merges embed calls made concurrently from any threads or coroutines into batched calls of the
+    wrapped client.
+
+    A dispatcher thread takes the first waiting text and keeps collecting until `window_ms` has passed
+    since it arrived or `max_batch_size` texts are collected, then sends them in one `embed_batch` call
+    and hands every caller its own vector. At most `max_concurrency` batches are in flight; texts
+    arriving while they all are wait in the queue and go out together in the next batch. Documents
+    and search queries are queued and batched separately.
+    """
+
+    def __init__(self, embedding: VectorEmbedding, window_ms: float = 5.0, max_batch_size: int = 96,
+                 max_concurrency: int = 4, metrics: Optional[MicroBatchMetrics] = None):
+        """
+        :param embedding: The embedding client receiving the batches.
+        :param window_ms: How long the first text of a batch waits for others to join it.
+        :param max_batch_size: Texts sent per batch at most.
+        :param max_concurrency: Batches in flight at the same time.
+        :param metrics: Where batch sizes and queueing delays are recorded.
+        """
+        self.embedding = embedding
+        self.model = getattr(embedding, "model", type(embedding).__name__)
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.metrics = metrics or micro_batch_metrics
+        self._queues: Dict[str, "queue.Queue[_PendingEmbed]"] = {}
+        self._slots = threading.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed-batch")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, embedding: VectorEmbedding) -> "MicroBatchingEmbedding":
+        return cls(
+            embedding=embedding,
+            window_ms=float(os.getenv("EMBED_BATCH_WINDOW_MS", 5)),
+            max_batch_size=int(os.getenv("EMBED_MAX_BATCH_SIZE", 96)),
+            max_concurrency=int(os.getenv("EMBED_BATCH_CONCURRENCY", 4)),
+        )
+
+    def submit(self, text: str, query: bool = False) -> Future:
+        """
+        Queue a text for the next batch.
+
+        :param query: Embed the text as a search query instead of a document.
+        :return: Future resolving to the vector of the text.
+        """
+        kind = "query" if query else "document"
+        with self._lock:
+            pending = self._queues.get(kind)
+            if pending is None:
+                pending = self._queues[kind] = queue.Queue()
+                embed_batch = self.embedding.embed_query_batch if query else self.embedding.embed_batch
+                threading.Thread(target=self._dispatch, args=(pending, embed_batch),
+                                 name=f"embed-batcher-{kind}", daemon=True).start()
+        future = Future()
+        pending.put(_PendingEmbed(text, future, time.monotonic()))
+        return future
+
+    def embed(self, text: str) -> list[float]:
+        return self.submit(text).result()
+
+    async def embed_async(self, text: str) -> list[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.submit(text, query=True).result()
+
+    async def embed_query_async(self, text: str) -> list[float]:
+        return await asyncio.wrap_future(self.submit(text, query=True))
+
+    def embed_query_batch(self, texts: list[str]) -> list[list[float]]:
+        futures = [self.submit(text, query=True) for text in texts]
+        return [future.result() for future in futures]
+
+    def _dispatch(self, pending: "queue.Queue[_PendingEmbed]",
+                  embed_batch: Callable[[list[str]], list[list[float]]]) -> None:
+        while True:
+            self._slots.acquire()
+            batch = [pending.get()]
+            deadline = batch[0].enqueued_at + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run, batch, embed_batch)
+
+    def _run(self, batch: List[_PendingEmbed], embed_batch: Callable[[list[str]], list[list[float]]]) -> None:
+        started_at = time.monotonic()
+        queue_delays = [started_at - item.enqueued_at for item in batch]
+        try:
+            vectors = embed_batch([item.text for item in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} vectors, got {len(vectors)}")
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} texts failed: {e}")
+            self.metrics.record(len(batch), queue_delays, failed=True)
+            for item in batch:
+                item.future.set_exception(e)
+        else:
+            self.metrics.record(len(batch), queue_delays)
+            for item, vector in zip(batch, vectors):
+                item.future.set_result(vector)
+        finally:
+            self._slots.release()
+
+
+micro_batch_metrics = MicroBatchMetrics()
@@ -0,0 +1,91 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU of search query vectors, keyed on the normalized query text.
+
+    Learners ask near-identical questions about the same course; after normalization they share one
+    entry, so only the first of them is embedded. Entries expire `ttl_seconds` after they were stored.
+    One cache serves one embedding model.
+    """
+
+    def __init__(self, max_items: int = 4096, ttl_seconds: float = 3600):
+        """
+        :param max_items: Maximum number of cached queries; the least recently used are dropped past it.
+        :param ttl_seconds: How long a cached vector is used.
+        """
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls) -> "QueryEmbeddingCache":
+        return cls(
+            max_items=int(os.getenv("QUERY_EMBEDDING_CACHE_ITEMS", 4096)),
+            ttl_seconds=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", 3600)),
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Unicode-normalize, case-fold and collapse the whitespace of a query.
+        """
+        return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+    def get(self, normalized_text: str) -> Optional[list[float]]:
+        with self._lock:
+            entry = self._entries.get(normalized_text)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[normalized_text]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(normalized_text)
+            self.hits += 1
+            return list(entry[1])
+
+    def set(self, normalized_text: str, vector: list[float]) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._entries[normalized_text] = (time.monotonic() + self.ttl_seconds, list(vector))
+            self._entries.move_to_end(normalized_text)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "items": len(self._entries),
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache.from_env()
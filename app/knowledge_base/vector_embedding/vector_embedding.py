@@ -4,6 +4,10 @@ from abc import ABC, abstractmethod
 class VectorEmbedding(ABC):
     """
     Abstract base class for vector embedding models.
+
+    `embed` and `embed_batch` embed documents to be stored and searched; `embed_query` and
+    `embed_query_batch` embed search queries. Models that embed both the same way only need the
+    document methods.
     """
 
     @abstractmethod
@@ -18,3 +22,40 @@ class VectorEmbedding(ABC):
             list[float]: The vector representation of the input text.
         """
         pass
+
+    @abstractmethod
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Convert many texts to vector representations with as few provider calls as possible.
+
+        Args:
+            texts (list[str]): The input texts to be embedded.
+
+        Returns:
+            list[list[float]]: One vector per input text, in the order of `texts`.
+        """
+        pass
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Convert a search query to a vector representation.
+
+        Args:
+            text (str): The query to be embedded.
+
+        Returns:
+            list[float]: The vector representation of the query.
+        """
+        return self.embed(text)
+
+    def embed_query_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Convert many search queries to vector representations.
+
+        Args:
+            texts (list[str]): The queries to be embedded.
+
+        Returns:
+            list[list[float]]: One vector per query, in the order of `texts`.
+        """
+        return self.embed_batch(texts)
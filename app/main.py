@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.routes.ai_course_processing import ai_course_processing_router
 from app.routes.course_generation import course_generation_router
+from app.routes.jobs_route import jobs_router
+from app.routes.metrics_route import metrics_router
 from app.routes.prompt_route import prompt_router
 from app.routes.upload_attachment import upload_attachment_router
 
@@ -19,4 +21,6 @@ app.add_middleware(
 app.include_router(course_generation_router, prefix="/v1/course-generation", tags=["Course Generation"])
 app.include_router(upload_attachment_router, prefix="/v1/upload", tags=["Upload Attachment"])
 app.include_router(prompt_router, prefix="/v1/prompt", tags=["Prompt Management"])
-app.include_router(ai_course_processing_router, prefix="/v1/ai-course-processing", tags=["AI Course Processing"])
\ No newline at end of file
+app.include_router(ai_course_processing_router, prefix="/v1/ai-course-processing", tags=["AI Course Processing"])
+app.include_router(metrics_router, prefix="/v1/metrics", tags=["Metrics"])
+app.include_router(jobs_router, prefix="/v1/jobs", tags=["Jobs"])
\ No newline at end of file
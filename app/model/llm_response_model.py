@@ -31,6 +31,23 @@ class SimplifyResponse(BaseModel):
     simplify3_last_word: str = Field(..., description="Last word of the simplification")
 
 
+class PackedSimplifyItem(SimplifyResponse):
+    paragraph_id: str = Field(..., description="ID of the paragraph this simplification belongs to")
+
+
+class PackedSimplifyResponse(BaseModel):
+    simplified: List[PackedSimplifyItem] = Field(..., description="One simplification per input paragraph")
+
+
+class TranslatedSegment(BaseModel):
+    index: int = Field(..., description="Index of the source segment")
+    text: str = Field(..., description="Translated text")
+
+
+class TranslatedSegments(BaseModel):
+    segments: List[TranslatedSegment] = Field(..., description="One translation per source segment")
+
+
 class AlternativeQuestion(BaseModel):
     question: str = Field(..., description="Alternative question")
     question_type: Literal['multiple_choice', 'true_false'] = Field(
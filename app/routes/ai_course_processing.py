@@ -1,12 +1,13 @@
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 from app.model.processing_models import QuizResults
 from app.model.translate_video_metadata import CourseWrapper
 from app.schema.video_schema import VideoRequestSchema
-from app.service.course_service import generate_quiz, get_paragraph, simplify_paragraph_v1
-from app.service.translate_service import translate_video, translate_course_meta_data
+from app.service.course_service import generate_quiz, get_paragraph, get_paragraph_stream, process_paragraphs, \
+    simplify_paragraph_v1
+from app.service.translate_service import translate_video, translate_course_meta_data, translate_video_languages
 
 ai_course_processing_router = APIRouter()
 
@@ -14,11 +15,26 @@ ai_course_processing_router = APIRouter()
 # List[QuizResults]
 
 @ai_course_processing_router.post("/process_video")
-async def process_video(process_video_request: VideoRequestSchema):
+async def process_video(process_video_request: VideoRequestSchema, packed: bool = False,
+                        incremental: bool = False):
+    """
+    Split a video into paragraphs, then simplify them and generate their quizzes.
+
+    `packed` simplifies several paragraphs per request once the whole video is segmented, while
+    `incremental` starts processing paragraphs as they are segmented; the two cannot be combined.
+    """
+    # Batch API mode can take hours, so it is only offered through POST /v1/jobs/process-video
+    if incremental and packed:
+        raise HTTPException(status_code=400, detail="packed and incremental cannot be used together")
     try:
+        if incremental:
+            # Paragraphs enter the pipeline while the model is still segmenting the rest of the video
+            return await process_paragraphs(get_paragraph_stream(process_video_request))
         # Generate paragraph
         paragraph_list = await get_paragraph(process_video_request)
-        simplify = await simplify_paragraph_v1(paragraph_list)
+        if not packed:
+            return await process_paragraphs(paragraph_list)
+        simplify = await simplify_paragraph_v1(paragraph_list, packed=packed)
         quiz = await generate_quiz(simplify)
         return quiz
     except Exception as e:
@@ -27,6 +43,7 @@ async def process_video(process_video_request: VideoRequestSchema):
 
 @ai_course_processing_router.post("/translate_video/{language}")
 async def translate_script(process_video_request: List[QuizResults], language: str) -> List[QuizResults]:
+    # Batch API mode can take hours, so it is only offered through POST /v1/jobs/translate-video/{language}
     try:
         paragraph_list = await translate_video(process_video_request, language)
         return paragraph_list
@@ -34,10 +51,20 @@ async def translate_script(process_video_request: List[QuizResults], language: s
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@ai_course_processing_router.post("/translate_video_languages")
+async def translate_script_languages(process_video_request: List[QuizResults],
+                                     languages: List[str] = Query(...)) -> Dict[str, List[QuizResults]]:
+    try:
+        return await translate_video_languages(process_video_request, languages)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @ai_course_processing_router.post("/translate_course_meta/{language}")
-async def translate_course_meta(process_video_request: CourseWrapper, language: str) -> CourseWrapper:
+async def translate_course_meta(process_video_request: CourseWrapper, language: str,
+                                packed: bool = False) -> CourseWrapper:
     try:
-        paragraph_list = await translate_course_meta_data(process_video_request, language)
+        paragraph_list = await translate_course_meta_data(process_video_request, language, packed=packed)
         return paragraph_list
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
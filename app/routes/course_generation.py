@@ -1,8 +1,12 @@
 # Course Generation API
-from fastapi import APIRouter, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from app.controller.course_generation_controller import generate_course_outline, generate_course_content, \
-    generate_course_quiz, chat_with_course, add_course_to_knowledge_base
+    generate_course_quiz, chat_with_course, chat_with_course_stream, add_course_to_knowledge_base, \
+    generate_course_content_stream, generate_course_quiz_stream
 from app.model.content_dto import CourseOutLines, CourseScript, CourseScriptWithQuiz, LLMOutLines
 from app.request_schema.course_content_request import CourseOutlineRequest
 from app.schema.chat_request_schema import ChatRequestSchema
@@ -10,6 +14,9 @@ from app.constant_manager import course_outline_prompt
 
 course_generation_router = APIRouter()
 
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @course_generation_router.post("/generate-course-outlines")
 def generate_course_outlines(outline_request: CourseOutlineRequest) -> LLMOutLines:
@@ -28,13 +35,23 @@ def get_outlines_prompt():
 
 
 @course_generation_router.post("/generate-course-content")
-def course_content(outline_request: CourseOutLines) -> CourseScript:
+def course_content(outline_request: CourseOutLines, resume: bool = True) -> CourseScript:
     try:
-        return generate_course_content(outline_request=outline_request)
+        return generate_course_content(outline_request=outline_request, resume=resume)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@course_generation_router.post("/generate-course-content/stream")
+def course_content_stream(outline_request: CourseOutLines, resume: bool = True,
+                          stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    return StreamingResponse(
+        generate_course_content_stream(outline_request=outline_request, stream_format=stream_format, resume=resume),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers=STREAM_HEADERS
+    )
+
+
 @course_generation_router.post("/add-course-content")
 def add_course_content(course_content_request: CourseScript):
     try:
@@ -43,17 +60,38 @@ def add_course_content(course_content_request: CourseScript):
         raise HTTPException(status_code=500, detail=str(e))
 
 @course_generation_router.post("/generate-course-quiz")
-def quiz_generator(course_content_request: CourseScript) -> CourseScriptWithQuiz:
+def quiz_generator(course_content_request: CourseScript, resume: bool = True) -> CourseScriptWithQuiz:
+    # Batch API mode can take hours, so it is only offered through POST /v1/jobs/course-quiz
     try:
-        quiz = generate_course_quiz(course_content=course_content_request)
+        quiz = generate_course_quiz(course_content=course_content_request, resume=resume)
         return quiz
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@course_generation_router.post("/generate-course-quiz/stream")
+def quiz_generator_stream(course_content_request: CourseScript, resume: bool = True,
+                          stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    return StreamingResponse(
+        generate_course_quiz_stream(course_content=course_content_request, stream_format=stream_format,
+                                    resume=resume),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers=STREAM_HEADERS
+    )
+
+
 @course_generation_router.post("/chat")
 def ask_video_script(chat_request: ChatRequestSchema):
     try:
         return chat_with_course(chat_request=chat_request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@course_generation_router.post("/chat/stream")
+def ask_video_script_stream(chat_request: ChatRequestSchema):
+    return StreamingResponse(
+        chat_with_course_stream(chat_request=chat_request),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
@@ -0,0 +1,77 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.controller.job_controller import enqueue_job, get_job_result, get_job_status
+from app.jobs.handlers import JobTypeEnum
+from app.jobs.job_queue import JobStatus
+from app.model.content_dto import CourseOutLines, CourseScript
+from app.model.processing_models import QuizResults
+from app.schema.video_schema import VideoRequestSchema
+
+jobs_router = APIRouter()
+
+
+@jobs_router.post("/course-content", status_code=202)
+def enqueue_course_content(outline_request: CourseOutLines):
+    try:
+        return enqueue_job(JobTypeEnum.COURSE_CONTENT, {"outline": outline_request.model_dump(exclude_unset=True)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@jobs_router.post("/course-quiz", status_code=202)
+def enqueue_course_quiz(course_content_request: CourseScript, use_batch: bool = False):
+    try:
+        return enqueue_job(JobTypeEnum.COURSE_QUIZ, {
+            "course": course_content_request.model_dump(exclude_unset=True),
+            "use_batch": use_batch
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@jobs_router.post("/process-video", status_code=202)
+def enqueue_process_video(process_video_request: VideoRequestSchema, use_batch: bool = False,
+                          packed: bool = False):
+    try:
+        return enqueue_job(JobTypeEnum.PROCESS_VIDEO, {
+            "video": process_video_request.model_dump(mode="json"),
+            "use_batch": use_batch,
+            "packed": packed
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@jobs_router.post("/translate-video/{language}", status_code=202)
+def enqueue_translate_video(process_video_request: List[QuizResults], language: str, use_batch: bool = False):
+    try:
+        return enqueue_job(JobTypeEnum.TRANSLATE_VIDEO, {
+            "video": [item.model_dump() for item in process_video_request],
+            "language": language,
+            "use_batch": use_batch
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@jobs_router.get("/{job_id}")
+def job_status(job_id: str):
+    job = get_job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@jobs_router.get("/{job_id}/result")
+def job_result(job_id: str):
+    job = get_job_result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] != JobStatus.SUCCEEDED:
+        # Not finished yet, or failed; the status endpoint has the details
+        return JSONResponse(status_code=202 if job["status"] in (JobStatus.QUEUED, JobStatus.RUNNING) else 409,
+                            content=job)
+    return job
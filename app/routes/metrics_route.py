@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+
+from app.client.hedging import hedging
+from app.client.llm_cache import llm_cache
+from app.client.rate_limiter import rate_limiter
+from app.client.resilience import resilience
+from app.client.single_flight import single_flight
+from app.client.translation_memory import translation_memory
+from app.knowledge_base.vector_embedding.embedding_cache import embedding_cache
+from app.knowledge_base.vector_embedding.micro_batcher import micro_batch_metrics
+from app.knowledge_base.vector_embedding.query_cache import query_embedding_cache
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/llm")
+def get_llm_metrics():
+    """
+    Get runtime counters of the LLM client layer.
+    """
+    return {
+        "cache": llm_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "resilience": resilience.stats(),
+        "hedging": hedging.stats(),
+        "single_flight": single_flight.stats(),
+        "translation_memory": translation_memory.stats(),
+    }
+
+
+@metrics_router.get("/embeddings")
+def get_embedding_metrics():
+    """
+    Get runtime counters of the embedding layer.
+    """
+    return {
+        "cache": embedding_cache.stats(),
+        "micro_batching": micro_batch_metrics.stats(),
+        "query_cache": query_embedding_cache.stats(),
+    }
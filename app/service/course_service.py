@@ -2,11 +2,12 @@ import asyncio
 import logging
 import os
 import uuid
-from typing import List
+from typing import AsyncIterable, AsyncIterator, List, Union
 
 from dotenv import load_dotenv
 
-from app.client.llm_client import OpenAITextProcessor
+from app.client.async_llm_client import AsyncOpenAITextProcessor
+from app.model.llm_response_model import ParagraphMetaData, SimplifyResponse, QuizResponse
 from app.model.processing_models import ProcessedParagraph, SimplifyResults, QuizResults
 from app.schema.video_schema import VideoRequestSchema
 
@@ -18,32 +19,36 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 # Initialize the LLM client
-llm_client = OpenAITextProcessor(os.getenv(" "), model="gpt-4o", max_workers=5)
+llm_client = AsyncOpenAITextProcessor(model="gpt-4o")
+
+# Requests each stage of the paragraph pipeline may run at the same time
+SIMPLIFY_CONCURRENCY = int(os.getenv("SIMPLIFY_CONCURRENCY", 8))
+QUIZ_CONCURRENCY = int(os.getenv("QUIZ_CONCURRENCY", 8))
+
+
+def to_processed_paragraph(video: VideoRequestSchema, paragraph: ParagraphMetaData) -> ProcessedParagraph:
+    return ProcessedParagraph(
+        video_id=str(video.video_id),
+        paragraph=paragraph.paragraph,
+        paragraph_level=paragraph.paragraph_level,
+        start_word=paragraph.start_word,
+        end_word=paragraph.end_word,
+        paragraph_id=str(uuid.uuid4()),
+        objective=[paragraph.related_objectives],
+        skills=[paragraph.related_skills],
+        language=video.language,
+    )
 
 
 async def get_paragraph(video: VideoRequestSchema) -> List[ProcessedParagraph]:
     try:
         logger.info("Generating paragraphs from video...")
-        response = await asyncio.to_thread(llm_client.get_paragraph,
-                                           objective=video.objective,
-                                           skills=video.skills,
-                                           video=video.video)
+        response = await llm_client.get_paragraph(objective=video.objective,
+                                                  skills=video.skills,
+                                                  video=video.video)
         logger.info(f"Received {len(response.paragraph)} paragraphs.")
 
-        paragraph_with_id = [
-            ProcessedParagraph(
-                video_id=str(video.video_id),
-                paragraph=p.paragraph,
-                paragraph_level=p.paragraph_level,
-                start_word=p.start_word,
-                end_word=p.end_word,
-                paragraph_id=str(uuid.uuid4()),
-                objective=[p.related_objectives],
-                skills=[p.related_skills],
-                language=video.language,
-            )
-            for p in response.paragraph
-        ]
+        paragraph_with_id = [to_processed_paragraph(video, p) for p in response.paragraph]
 
         return paragraph_with_id
     except Exception as e:
@@ -51,83 +56,178 @@ async def get_paragraph(video: VideoRequestSchema) -> List[ProcessedParagraph]:
         raise e
 
 
-async def simplify_paragraph_v1(paragraphs: List[ProcessedParagraph]) -> List[SimplifyResults]:
+async def get_paragraph_stream(video: VideoRequestSchema) -> AsyncIterator[ProcessedParagraph]:
+    """
+    Yield the paragraphs of the video one by one while the model is still segmenting the rest.
+    """
+    try:
+        logger.info("Streaming paragraphs from video...")
+        count = 0
+        async for p in llm_client.get_paragraph_stream(objective=video.objective,
+                                                       skills=video.skills,
+                                                       video=video.video):
+            count += 1
+            yield to_processed_paragraph(video, p)
+        logger.info(f"Received {count} paragraphs.")
+    except Exception as e:
+        logger.exception("Error while streaming paragraphs")
+        raise e
+
+
+def to_simplify_results(paragraph: ProcessedParagraph, result: SimplifyResponse) -> SimplifyResults:
+    return SimplifyResults(
+        video_id=paragraph.video_id,
+        paragraph=paragraph.paragraph,
+        paragraph_level=paragraph.paragraph_level,
+        start_word=paragraph.start_word,
+        end_word=paragraph.end_word,
+        paragraph_id=paragraph.paragraph_id,
+        simplify1=result.simplify1,
+        simplify1_id=str(uuid.uuid4()),
+        simplify1_first_word=result.simplify1_first_word,
+        simplify1_last_word=result.simplify1_last_word,
+        simplify2=result.simplify2,
+        simplify2_id=str(uuid.uuid4()),
+        simplify2_first_word=result.simplify2_first_word,
+        simplify2_last_word=result.simplify2_last_word,
+        simplify3=result.simplify3,
+        simplify3_id=str(uuid.uuid4()),
+        simplify3_first_word=result.simplify3_first_word,
+        simplify3_last_word=result.simplify3_last_word,
+        skills=paragraph.skills,
+        objective=paragraph.objective,
+        language=paragraph.language,
+    )
+
+
+def to_quiz_results(paragraph: SimplifyResults, result: QuizResponse) -> QuizResults:
+    return QuizResults(
+        video_id=paragraph.video_id,
+        paragraph=paragraph.paragraph,
+        paragraph_level=paragraph.paragraph_level,
+        start_word=paragraph.start_word,
+        end_word=paragraph.end_word,
+        paragraph_id=paragraph.paragraph_id,
+        simplify1=paragraph.simplify1,
+        simplify1_id=paragraph.simplify1_id,
+        simplify1_first_word=paragraph.simplify1_first_word,
+        simplify1_last_word=paragraph.simplify1_last_word,
+        simplify2=paragraph.simplify2,
+        simplify2_id=paragraph.simplify2_id,
+        simplify2_first_word=paragraph.simplify2_first_word,
+        simplify2_last_word=paragraph.simplify2_last_word,
+        simplify3=paragraph.simplify3,
+        simplify3_id=paragraph.simplify3_id,
+        simplify3_first_word=paragraph.simplify3_first_word,
+        simplify3_last_word=paragraph.simplify3_last_word,
+        quiz=result.quiz,
+        skills=paragraph.skills,
+        objective=paragraph.objective,
+        language=paragraph.language
+    )
+
+
+async def simplify_single(paragraph: ProcessedParagraph) -> SimplifyResults:
+    try:
+        result = await llm_client.simplify(paragraph=paragraph.paragraph,
+                                           language=paragraph.language)
+        return to_simplify_results(paragraph, result)
+    except Exception as e:
+        logger.exception(f"Error simplifying paragraph {paragraph.paragraph_id}")
+        raise e
+
+
+async def generate_single_quiz(paragraph: SimplifyResults) -> QuizResults:
+    try:
+        result = await llm_client.generate_quiz(skills=paragraph.skills,
+                                                objective=paragraph.objective,
+                                                paragraph_content=paragraph.paragraph,
+                                                language=paragraph.language)
+        return to_quiz_results(paragraph, result)
+    except Exception as e:
+        logger.exception(f"Error generating quiz for paragraph {paragraph.paragraph_id}")
+        raise e
+
+
+async def simplify_paragraph_v1(paragraphs: List[ProcessedParagraph],
+                                use_batch: bool = False, packed: bool = False) -> List[SimplifyResults]:
     logger.info("Starting paragraph simplification...")
 
-    async def simplify_single(paragraph: ProcessedParagraph) -> SimplifyResults:
-        try:
-            result = await asyncio.to_thread(llm_client.simplify, paragraph=paragraph.paragraph,
-                                             language=paragraph.language)
-            return SimplifyResults(
-                video_id=paragraph.video_id,
-                paragraph=paragraph.paragraph,
-                paragraph_level=paragraph.paragraph_level,
-                start_word=paragraph.start_word,
-                end_word=paragraph.end_word,
-                paragraph_id=paragraph.paragraph_id,
-                simplify1=result.simplify1,
-                simplify1_id=str(uuid.uuid4()),
-                simplify1_first_word=result.simplify1_first_word,
-                simplify1_last_word=result.simplify1_last_word,
-                simplify2=result.simplify2,
-                simplify2_id=str(uuid.uuid4()),
-                simplify2_first_word=result.simplify2_first_word,
-                simplify2_last_word=result.simplify2_last_word,
-                simplify3=result.simplify3,
-                simplify3_id=str(uuid.uuid4()),
-                simplify3_first_word=result.simplify3_first_word,
-                simplify3_last_word=result.simplify3_last_word,
-                skills=paragraph.skills,
-                objective=paragraph.objective,
-                language=paragraph.language,
-            )
-        except Exception as e:
-            logger.exception(f"Error simplifying paragraph {paragraph.paragraph_id}")
-            raise e
+    if packed:
+        # Paragraphs of one language share a request; the answer is mapped back by paragraph_id
+        by_language = {}
+        for p in paragraphs:
+            by_language.setdefault(p.language, []).append(dict(paragraph_id=p.paragraph_id, paragraph=p.paragraph))
+        simplified = {}
+        for language_results in await asyncio.gather(*(llm_client.simplify_packed(items, language)
+                                                       for language, items in by_language.items())):
+            simplified.update(language_results)
+        results = [to_simplify_results(p, simplified[p.paragraph_id]) for p in paragraphs]
+        logger.info(f"Simplified {len(results)} paragraphs in packed mode.")
+        return results
+
+    if use_batch:
+        responses = await llm_client.simplify_batch([
+            dict(paragraph=p.paragraph, language=p.language) for p in paragraphs
+        ])
+        results = [to_simplify_results(paragraph, result) for paragraph, result in zip(paragraphs, responses)]
+        logger.info(f"Simplified {len(results)} paragraphs in batch mode.")
+        return results
 
     results = await asyncio.gather(*(simplify_single(p) for p in paragraphs))
     logger.info(f"Simplified {len(results)} paragraphs.")
     return results
 
 
-async def generate_quiz(paragraphs: List[SimplifyResults]) -> List[QuizResults]:
+async def generate_quiz(paragraphs: List[SimplifyResults], use_batch: bool = False) -> List[QuizResults]:
     logger.info("Starting quiz generation...")
 
-    async def generate_single(paragraph: SimplifyResults) -> QuizResults:
-        try:
-            result = await asyncio.to_thread(llm_client.generate_quiz,
-                                             skills=paragraph.skills,
-                                             objective=paragraph.objective,
-                                             paragraph_content=paragraph.paragraph,
-                                             language=paragraph.language)
-            return QuizResults(
-                video_id=paragraph.video_id,
-                paragraph=paragraph.paragraph,
-                paragraph_level=paragraph.paragraph_level,
-                start_word=paragraph.start_word,
-                end_word=paragraph.end_word,
-                paragraph_id=paragraph.paragraph_id,
-                simplify1=paragraph.simplify1,
-                simplify1_id=paragraph.simplify1_id,
-                simplify1_first_word=paragraph.simplify1_first_word,
-                simplify1_last_word=paragraph.simplify1_last_word,
-                simplify2=paragraph.simplify2,
-                simplify2_id=paragraph.simplify2_id,
-                simplify2_first_word=paragraph.simplify2_first_word,
-                simplify2_last_word=paragraph.simplify2_last_word,
-                simplify3=paragraph.simplify3,
-                simplify3_id=paragraph.simplify3_id,
-                simplify3_first_word=paragraph.simplify3_first_word,
-                simplify3_last_word=paragraph.simplify3_last_word,
-                quiz=result.quiz,
-                skills=paragraph.skills,
-                objective=paragraph.objective,
-                language=paragraph.language
-            )
-        except Exception as e:
-            logger.exception(f"Error generating quiz for paragraph {paragraph.paragraph_id}")
-            raise e
-
-    results = await asyncio.gather(*(generate_single(p) for p in paragraphs))
+    if use_batch:
+        responses = await llm_client.generate_quiz_batch([
+            dict(skills=p.skills, objective=p.objective, paragraph_content=p.paragraph, language=p.language)
+            for p in paragraphs
+        ])
+        results = [to_quiz_results(paragraph, result) for paragraph, result in zip(paragraphs, responses)]
+        logger.info(f"Generated quizzes for {len(results)} paragraphs in batch mode.")
+        return results
+
+    results = await asyncio.gather(*(generate_single_quiz(p) for p in paragraphs))
     logger.info(f"Generated quizzes for {len(results)} paragraphs.")
     return results
+
+
+async def process_paragraphs(paragraphs: Union[List[ProcessedParagraph], AsyncIterable[ProcessedParagraph]],
+                             simplify_concurrency: int = SIMPLIFY_CONCURRENCY,
+                             quiz_concurrency: int = QUIZ_CONCURRENCY) -> List[QuizResults]:
+    """
+    Simplify the paragraphs and generate their quizzes as a per-paragraph pipeline.
+
+    Each paragraph moves on to quiz generation as soon as its own simplification is done, so a slow
+    simplification only delays its own quiz. Each stage runs a bounded number of requests at a time
+    and the results are returned in paragraph order. `paragraphs` may also be an async iterable such
+    as `get_paragraph_stream`, in which case each paragraph enters the pipeline as soon as it arrives.
+    """
+    logger.info("Processing paragraphs...")
+    simplify_slots = asyncio.Semaphore(simplify_concurrency)
+    quiz_slots = asyncio.Semaphore(quiz_concurrency)
+
+    async def process_single(paragraph: ProcessedParagraph) -> QuizResults:
+        async with simplify_slots:
+            simplified = await simplify_single(paragraph)
+        async with quiz_slots:
+            return await generate_single_quiz(simplified)
+
+    tasks = []
+    try:
+        if isinstance(paragraphs, list):
+            tasks = [asyncio.create_task(process_single(p)) for p in paragraphs]
+        else:
+            async for p in paragraphs:
+                tasks.append(asyncio.create_task(process_single(p)))
+        results = await asyncio.gather(*tasks)
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        raise e
+    logger.info(f"Processed {len(results)} paragraphs.")
+    return results
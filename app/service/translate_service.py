@@ -1,73 +1,225 @@
 import asyncio
-from typing import List
+import logging
+import os
+from typing import Callable, Dict, List, Optional
 
-from app.model.processing_models import QuizResults
-from app.model.translate_video_metadata import CourseWrapper, Course
+from app.client.translation_memory import translation_memory
+from app.model.llm_response_model import QuizResponse
+from app.model.processing_models import QuizResults, SimplifyResults
+from app.model.translate_video_metadata import CourseWrapper, Course, Chapter, Video
 from app.service.course_service import llm_client
+from app.utils.language import is_in_language
+from app.utils.translation_payload import TranslationPayload
 
+logger = logging.getLogger(__name__)
 
-async def translate_video(video: List[QuizResults], language: str) -> List[QuizResults]:
+TRANSLATE_META_CONCURRENCY = int(os.getenv("TRANSLATE_META_CONCURRENCY", 8))
+TRANSLATE_FANOUT_CONCURRENCY = int(os.getenv("TRANSLATE_FANOUT_CONCURRENCY", 8))
+
+
+async def translate_segments(segments: List[str], language: str, model: Optional[str] = None) -> Dict[str, str]:
+    """
+    Translate text segments through the translation memory.
+
+    Duplicates are translated once, text already written in `language` is kept as it is, and only
+    segments unknown to the memory are sent to the LLM. Segments too long for the memory are always
+    sent to the LLM.
+
+    :param model: Model of the LLM calls; SEGMENT_TRANSLATION_MODEL when omitted.
+    :return: Mapping of every source segment to its translation.
+    """
+    unique = list(dict.fromkeys(segment for segment in segments if segment is not None))
+    translations = {segment: segment for segment in unique if is_in_language(segment, language)}
+    pending = [segment for segment in unique if segment not in translations]
+
+    known = await translation_memory.lookup_async(pending, language) if pending else {}
+    translations.update(known)
+    misses = [segment for segment in pending if segment not in known]
+    if misses:
+        translated = dict(zip(misses, await llm_client.translate_segments(misses, language, model=model)))
+        await translation_memory.store_async(translated, language)
+        translations.update(translated)
+
+    logger.info(f"Translated {len(unique)} segments to {language}: {len(unique) - len(pending)} already in "
+                f"{language}, {len(known)} from translation memory, {len(misses)} sent to the LLM")
+    return translations
+
+
+def to_translated_quiz_results(video_item: QuizResults, translated_quiz: QuizResponse,
+                               translated_content: SimplifyResults, language: str) -> QuizResults:
+    return QuizResults(
+        video_id=video_item.video_id,
+        objective=translated_content.objective,
+        language=language,
+        paragraph_id=video_item.paragraph_id,
+        paragraph=translated_content.paragraph,
+        paragraph_level=video_item.paragraph_level,
+        start_word=translated_content.start_word,
+        end_word=translated_content.end_word,
+        skills=translated_content.skills,
+        simplify1_id=video_item.simplify1_id,
+        simplify1=translated_content.simplify1,
+        simplify1_first_word=translated_content.simplify1_first_word,
+        simplify1_last_word=translated_content.simplify1_last_word,
+        simplify2_id=video_item.simplify2_id,
+        simplify2=translated_content.simplify2,
+        simplify2_first_word=translated_content.simplify2_first_word,
+        simplify2_last_word=translated_content.simplify2_last_word,
+        simplify3_id=video_item.simplify3_id,
+        simplify3=translated_content.simplify3,
+        simplify3_first_word=translated_content.simplify3_first_word,
+        simplify3_last_word=translated_content.simplify3_last_word,
+        quiz=translated_quiz.quiz
+    )
+
+
+async def translate_video(video: List[QuizResults], language: str, use_batch: bool = False) -> List[QuizResults]:
     """
     Translate the video content to a different language.
+
+    Only the translatable strings are sent, as one deduplicated list of segments that goes through the
+    translation memory; the results are rebuilt locally. The segments are translated by the client's
+    own model, like the paragraphs were before, not by SEGMENT_TRANSLATION_MODEL. With `use_batch`
+    every paragraph is sent through the OpenAI Batch API instead of interactive completions, which is
+    cheaper but can take hours.
+    """
+    if use_batch:
+        translated_quizzes, translated_contents = await asyncio.gather(
+            llm_client.translate_quiz_batch([str(item.quiz) for item in video], language),
+            llm_client.translate_content_batch([item.model_dump(exclude={'quiz'}) for item in video], language)
+        )
+        return [
+            to_translated_quiz_results(item, translated_quiz, translated_content, language)
+            for item, translated_quiz, translated_content in zip(video, translated_quizzes, translated_contents)
+        ]
+
+    payload = TranslationPayload(video)
+    for video_id, savings in payload.savings().items():
+        logger.info(f"Translation payload of video {video_id}: {savings['compact_tokens']} tokens instead of "
+                    f"{savings['full_tokens']} ({savings['saved_tokens']} saved)")
+    translations = await translate_segments(payload.segments, language, model=llm_client.model)
+    return payload.rehydrate(translations, language)
+
+
+async def translate_video_languages(video: List[QuizResults], languages: List[str],
+                                    progress: Optional[Callable[[str, int, int], None]] = None
+                                    ) -> Dict[str, List[QuizResults]]:
     """
+    Translate the same video into several languages at once.
 
-    async def translate_single_item(video_item: QuizResults) -> QuizResults:
-        try:
-            # Run both synchronous translation calls in separate threads concurrently
-            quiz_future = asyncio.to_thread(llm_client.translate_quiz, str(video_item.quiz), language)
-            content_data = video_item.model_dump(exclude={'quiz'})
-            content_future = asyncio.to_thread(llm_client.translate_content, content_data, language)
-
-            translated_quiz, translated_content = await asyncio.gather(quiz_future, content_future)
-
-            return QuizResults(
-                video_id=video_item.video_id,
-                objective=translated_content.objective,
-                language=language,
-                paragraph_id=video_item.paragraph_id,
-                paragraph=translated_content.paragraph,
-                paragraph_level=video_item.paragraph_level,
-                start_word=translated_content.start_word,
-                end_word=translated_content.end_word,
-                skills=translated_content.skills,
-                simplify1_id=video_item.simplify1_id,
-                simplify1=translated_content.simplify1,
-                simplify1_first_word=translated_content.simplify1_first_word,
-                simplify1_last_word=translated_content.simplify1_last_word,
-                simplify2_id=video_item.simplify2_id,
-                simplify2=translated_content.simplify2,
-                simplify2_first_word=translated_content.simplify2_first_word,
-                simplify2_last_word=translated_content.simplify2_last_word,
-                simplify3_id=video_item.simplify3_id,
-                simplify3=translated_content.simplify3,
-                simplify3_first_word=translated_content.simplify3_first_word,
-                simplify3_last_word=translated_content.simplify3_last_word,
-                quiz=translated_quiz.quiz
-            )
-
-        except Exception as e:
-            raise e
-
-    return await asyncio.gather(*(translate_single_item(item) for item in video))
-
-
-async def translate_course_meta_data(process_video_request: CourseWrapper, language: str) -> CourseWrapper:
+    The payload is extracted once and the translation memory is queried once for all languages.
+    The remaining work is split into (paragraph, language) units, each carrying the segments of
+    that paragraph no earlier unit of the language already covers, and every unit runs through one
+    pool of at most TRANSLATE_FANOUT_CONCURRENCY concurrent translations.
+
+    :param progress: Called with (language, finished units, total units) whenever a unit finishes.
+    :return: Translated results keyed by language.
+    """
+    unique_languages: Dict[str, str] = {}
+    for language in languages:
+        unique_languages.setdefault(language.strip().lower(), language)
+    languages = list(unique_languages.values())
+    payload = TranslationPayload(video)
+    known = await translation_memory.lookup_languages_async(payload.segments, languages)
+
+    translations: Dict[str, Dict[str, str]] = {}
+    units = []
+    for language in languages:
+        translations[language] = {segment: segment for segment in payload.segments
+                                  if is_in_language(segment, language)}
+        translations[language].update(known[language])
+        covered = set(translations[language])
+        for item_index in range(len(video)):
+            segments = [segment for segment in payload.item_segments(item_index) if segment not in covered]
+            covered.update(segments)
+            units.append((language, segments))
+
+    totals = {language: len(video) for language in languages}
+    finished = {language: 0 for language in languages}
+    semaphore = asyncio.Semaphore(TRANSLATE_FANOUT_CONCURRENCY)
+
+    async def translate_unit(language: str, segments: List[str]) -> None:
+        if segments:
+            async with semaphore:
+                translated = await llm_client.translate_segments(segments, language, model=llm_client.model)
+            translated = dict(zip(segments, translated))
+            await translation_memory.store_async(translated, language)
+            translations[language].update(translated)
+        finished[language] += 1
+        if progress is not None:
+            progress(language, finished[language], totals[language])
+        if finished[language] == totals[language]:
+            logger.info(f"Translation to {language} finished")
+
+    await asyncio.gather(*(translate_unit(language, segments) for language, segments in units))
+    logger.info(f"Translated {len(payload.segments)} segments to {len(languages)} languages: "
+                f"{sum(len(known[language]) for language in languages)} from translation memory, "
+                f"{sum(len(segments) for _, segments in units)} sent to the LLM")
+    return {language: payload.rehydrate(translations[language], language) for language in languages}
+
+
+def chapter_segments(chapter: Chapter) -> List[str]:
+    segments = [chapter.name, chapter.description]
+    for video in chapter.videos:
+        segments.extend([video.name, video.description])
+    return segments
+
+
+def to_translated_chapter(chapter: Chapter, translations: Dict[str, str]) -> Chapter:
+    return Chapter(
+        id=chapter.id,
+        name=translations[chapter.name],
+        description=translations.get(chapter.description),
+        videos=[
+            Video(id=video.id, name=translations[video.name], description=translations.get(video.description))
+            for video in chapter.videos
+        ]
+    )
+
+
+async def translate_chapter_meta(chapter: Chapter, language: str) -> Chapter:
+    """
+    Translate the names and descriptions of a chapter and its videos through the translation memory.
+    """
+    translations = await translate_segments(chapter_segments(chapter), language)
+    return to_translated_chapter(chapter, translations)
+
+
+async def translate_course_meta_data(process_video_request: CourseWrapper, language: str,
+                                     packed: bool = False) -> CourseWrapper:
+    """
+    Translate the course, chapter and video names and descriptions.
+
+    By default the course and every chapter are translated concurrently, at most
+    TRANSLATE_META_CONCURRENCY chapters at a time. With `packed` the segments of the whole course are
+    deduplicated and translated together, which needs one structured call per segment pack
+    (SEGMENT_PACK_TOKEN_BUDGET) however many chapters the course has.
+    """
     original_course = process_video_request.course
+    course_segments = [original_course.name, original_course.description]
+
+    if packed:
+        segments = course_segments + [segment for chapter in original_course.chapters
+                                      for segment in chapter_segments(chapter)]
+        translations = await translate_segments(segments, language)
+        course_translations = translations
+        translated_chapters = [to_translated_chapter(chapter, translations) for chapter in original_course.chapters]
+    else:
+        semaphore = asyncio.Semaphore(TRANSLATE_META_CONCURRENCY)
 
-    # Translate course name and description
-    translated_name = llm_client.translate_text(original_course.name, language)
-    translated_description = llm_client.translate_text(original_course.description, language)
+        async def translate_bounded(chapter: Chapter) -> Chapter:
+            async with semaphore:
+                return await translate_chapter_meta(chapter, language)
 
-    # Translate chapters
-    translated_chapters = []
-    for chapter in original_course.chapters:
-        translated_chapter = llm_client.translate_chapter_meta(chapter, language)
-        translated_chapters.append(translated_chapter)
+        course_translations, *translated_chapters = await asyncio.gather(
+            translate_segments(course_segments, language),
+            *(translate_bounded(chapter) for chapter in original_course.chapters)
+        )
 
     translated_course = Course(
         id=original_course.id,
-        name=translated_name,
-        description=translated_description,
+        name=course_translations[original_course.name],
+        description=course_translations[original_course.description],
         chapters=translated_chapters
     )
 
@@ -0,0 +1,79 @@
+import json
+from typing import Any, List
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for a JSON object streamed in chunks, emitting the elements of one of its
+    top-level arrays as soon as each element is complete.
+
+    Only object and array elements are emitted; anything outside the array under `array_key` is
+    skipped. The parser never backtracks, so a document of n characters costs O(n) in total.
+
+        parser = JSONArrayStreamParser("paragraph")
+        for chunk in chunks:
+            for element in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self, array_key: str):
+        """
+        :param array_key: Key of the top-level array whose elements are emitted.
+        """
+        self.array_key = array_key
+        self.emitted = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string: List[str] = []
+        self._last_string = None
+        self._key = None
+        self._in_array = False
+        self._element: List[str] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume the next chunk of the document.
+
+        :return: The array elements completed by this chunk, decoded with `json.loads`.
+        """
+        completed = []
+        for char in chunk:
+            if self._element:
+                self._element.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = json.loads('"' + "".join(self._string) + '"')
+                    self._string = []
+                    continue
+                if self._depth == 1:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif char in "{[":
+                if self._in_array and self._depth == 2 and not self._element:
+                    self._element.append(char)
+                if char == "[" and self._depth == 1 and self._key == self.array_key:
+                    self._in_array = True
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and self._element:
+                    completed.append(json.loads("".join(self._element)))
+                    self._element = []
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+
+        self.emitted += len(completed)
+        return completed
@@ -0,0 +1,56 @@
+import re
+
+ARABIC_LETTER = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+LATIN_LETTER = re.compile(r"[A-Za-z\u00C0-\u024F]")
+WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+LANGUAGE_ALIASES = {
+    "ar": "arabic", "arabic": "arabic", "عربي": "arabic", "العربية": "arabic",
+    "en": "english", "english": "english",
+    "fr": "french", "french": "french",
+    "es": "spanish", "spanish": "spanish",
+    "de": "german", "german": "german",
+}
+
+# Frequent function words; enough to tell Latin-script languages apart on a sentence
+STOPWORDS = {
+    "english": {"the", "and", "of", "to", "in", "is", "for", "with", "on", "that", "this", "are", "by", "how",
+                "what", "your", "you", "it", "as", "from", "be", "an", "or", "which"},
+    "french": {"le", "la", "les", "de", "des", "et", "est", "pour", "dans", "une", "du", "que", "qui", "sur", "avec",
+               "pas", "au", "aux", "ce", "cette"},
+    "spanish": {"el", "los", "las", "de", "del", "y", "es", "para", "en", "una", "que", "por", "con", "como", "su",
+                "al", "lo", "se"},
+    "german": {"der", "die", "das", "und", "ist", "für", "mit", "den", "ein", "eine", "zu", "nicht", "von",
+               "auf", "im", "dem", "des"},
+}
+
+LATIN_LANGUAGES = set(STOPWORDS)
+
+
+def normalize_language(language: str) -> str:
+    return LANGUAGE_ALIASES.get((language or "").strip().lower(), (language or "").strip().lower())
+
+
+def is_in_language(text: str, language: str) -> bool:
+    """
+    Cheap check whether `text` is already written in `language`, used to skip needless translations.
+
+    Only positive evidence counts: Arabic is recognised by script, and Latin-script languages need
+    more stopwords of that language than of any other. Short texts without stopwords ("True",
+    "Data Analysis") and unknown languages return False so the text gets translated.
+    """
+    language = normalize_language(language)
+    arabic = len(ARABIC_LETTER.findall(text or ""))
+    latin = len(LATIN_LETTER.findall(text or ""))
+    if arabic + latin == 0:
+        # Numbers, symbols and empty strings read the same in every language
+        return True
+
+    if language == "arabic":
+        return arabic / (arabic + latin) >= 0.6
+    if language not in LATIN_LANGUAGES or arabic > 0:
+        return False
+
+    words = [word.lower() for word in WORD.findall(text)]
+    hits = {lang: sum(word in stopwords for word in words) for lang, stopwords in STOPWORDS.items()}
+    return hits[language] > 0 and hits[language] == max(hits.values())
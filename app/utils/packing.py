@@ -0,0 +1,37 @@
+import math
+from typing import Callable, List, TypeVar
+
+T = TypeVar("T")
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Rough token count of a text, about three characters per token (close for Arabic, high for English).
+    """
+    return math.ceil(len(text or "") / 3)
+
+
+def pack_by_budget(items: List[T], cost: Callable[[T], int], budget: int, max_items: int) -> List[List[T]]:
+    """
+    Split items into consecutive packs whose summed cost stays within `budget`.
+
+    Order is preserved. An item that exceeds the budget on its own gets a pack of its own.
+
+    :param items: Items to pack.
+    :param cost: Estimated token cost of one item.
+    :param budget: Token budget of one pack.
+    :param max_items: Upper bound on the number of items per pack.
+    """
+    packs: List[List[T]] = []
+    current: List[T] = []
+    current_cost = 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (current_cost + item_cost > budget or len(current) >= max_items):
+            packs.append(current)
+            current, current_cost = [], 0
+        current.append(item)
+        current_cost += item_cost
+    if current:
+        packs.append(current)
+    return packs
@@ -0,0 +1,135 @@
+import json
+from typing import Dict, List, Tuple, Union
+
+from app.model.processing_models import QuizResults
+from app.utils.packing import estimate_text_tokens
+
+Path = Tuple[Union[int, str], ...]
+
+# Text fields of a paragraph, with the fields holding their first and last word
+TEXT_FIELDS = {
+    "paragraph": ("start_word", "end_word"),
+    "simplify1": ("simplify1_first_word", "simplify1_last_word"),
+    "simplify2": ("simplify2_first_word", "simplify2_last_word"),
+    "simplify3": ("simplify3_first_word", "simplify3_last_word"),
+}
+METADATA_FIELDS = ("objective", "skills")
+QUESTION_METADATA_FIELDS = ("related_skills", "related_objectives")
+
+# Punctuation trimmed from edge words, Arabic marks included
+EDGE_PUNCTUATION = "\"'`.,;:!?()[]{}<>«»“”‘’،؛؟…-–—"
+
+
+def edge_words(text: str) -> Tuple[str, str]:
+    """
+    First and last word of a text, without surrounding punctuation.
+    """
+    words = [word.strip(EDGE_PUNCTUATION) for word in (text or "").split()]
+    words = [word for word in words if word]
+    if not words:
+        return "", ""
+    return words[0], words[-1]
+
+
+class TranslationPayload:
+    """
+    Compact translation request compiled from a list of QuizResults.
+
+    Only the translatable strings are extracted: paragraph and simplification texts, objective and
+    skill names, quiz questions, options and answers, alternative questions included. IDs, levels
+    and flags never leave the process. Identical strings share one segment, so a correct answer is
+    translated exactly like the option it matches, even when the two differ in case or spacing. First and last words are not sent at all; they
+    are taken from the translated texts when the payload is re-hydrated.
+    """
+
+    def __init__(self, items: List[QuizResults]):
+        self.items = items
+        self.segments: List[str] = []
+        self.slots: List[Tuple[Path, int]] = []
+        self._index: Dict[str, int] = {}
+        for item_index, item in enumerate(items):
+            self._compile_item(item_index, item)
+
+    def _add(self, path: Path, text: str) -> None:
+        if not text:
+            return
+        if text not in self._index:
+            self._index[text] = len(self.segments)
+            self.segments.append(text)
+        self.slots.append((path, self._index[text]))
+
+    def _add_metadata(self, path: Path, metadata: list) -> None:
+        for meta_index, meta in enumerate(metadata):
+            self._add(path + (meta_index, "name"), meta.name)
+
+    def _add_question(self, path: Path, question) -> None:
+        self._add(path + ("question",), question.question)
+        for option_index, option in enumerate(question.options):
+            self._add(path + ("options", option_index), option)
+        # An answer differing from its option only in case or spacing shares the option's segment,
+        # so it still matches the translated option
+        answer = (question.correct_answer or "").strip().casefold()
+        matching = [option for option in question.options if option and option.strip().casefold() == answer]
+        self._add(path + ("correct_answer",), matching[0] if matching else question.correct_answer)
+
+    def _compile_item(self, item_index: int, item: QuizResults) -> None:
+        for field in TEXT_FIELDS:
+            self._add((item_index, field), getattr(item, field))
+        for field in METADATA_FIELDS:
+            self._add_metadata((item_index, field), getattr(item, field))
+        for quiz_index, question in enumerate(item.quiz):
+            path = (item_index, "quiz", quiz_index)
+            self._add_question(path, question)
+            for field in QUESTION_METADATA_FIELDS:
+                self._add_metadata(path + (field,), getattr(question, field))
+            for alternative_index, alternative in enumerate(question.alternative_questions):
+                self._add_question(path + ("alternative_questions", alternative_index), alternative)
+
+    def item_segments(self, item_index: int) -> List[str]:
+        """
+        Distinct segments of one item, in extraction order.
+        """
+        indices = dict.fromkeys(segment_index for path, segment_index in self.slots if path[0] == item_index)
+        return [self.segments[segment_index] for segment_index in indices]
+
+    def rehydrate(self, translations: Dict[str, str], language: str) -> List[QuizResults]:
+        """
+        Rebuild the original structure with every extracted string replaced by its translation.
+
+        :param translations: Source segment -> translated text; segments missing from it are kept as they are.
+        :param language: Language written into the results.
+        """
+        data = [item.model_dump() for item in self.items]
+        for path, segment_index in self.slots:
+            source = self.segments[segment_index]
+            target = data
+            for key in path[:-1]:
+                target = target[key]
+            target[path[-1]] = translations.get(source, source)
+
+        results = []
+        for item in data:
+            for field, (first_field, last_field) in TEXT_FIELDS.items():
+                item[first_field], item[last_field] = edge_words(item[field])
+            item["language"] = language
+            results.append(QuizResults.model_validate(item))
+        return results
+
+    def savings(self) -> Dict[str, Dict[str, int]]:
+        """
+        Estimated tokens per video of the full records the model used to receive, against the compact
+        indexed segment list. The completion shrinks by about the same amount since it mirrors the input.
+        """
+        report: Dict[str, Dict[str, int]] = {}
+        video_segments: Dict[str, set] = {}
+        for item in self.items:
+            video = report.setdefault(str(item.video_id), {"full_tokens": 0, "compact_tokens": 0})
+            video["full_tokens"] += estimate_text_tokens(json.dumps(item.model_dump(), ensure_ascii=False))
+            video_segments.setdefault(str(item.video_id), set())
+        for path, segment_index in self.slots:
+            video_segments[str(self.items[path[0]].video_id)].add(segment_index)
+        for video_id, segment_indices in video_segments.items():
+            compact = [{"index": index, "text": self.segments[index]} for index in sorted(segment_indices)]
+            report[video_id]["compact_tokens"] = estimate_text_tokens(json.dumps(compact, ensure_ascii=False))
+            report[video_id]["saved_tokens"] = report[video_id]["full_tokens"] - report[video_id]["compact_tokens"]
+        return report
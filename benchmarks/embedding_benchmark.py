@@ -0,0 +1,75 @@
+"""
+Throughput benchmark of the local ONNX embedding backend: texts per second for each batch size.
+
+    python -m benchmarks.embedding_benchmark models/bge-m3
+    python -m benchmarks.embedding_benchmark models/bge-m3 --quantize --batch-sizes 1 8 32 64 -n 512
+
+Runs fully offline on the CPU; export the model first as described in OnnxEmbeddingClient. Texts
+are synthetic paragraphs of varying length, roughly like the chunks of an uploaded PDF.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+WORDS = ("course video chapter learning skill objective student paragraph knowledge quiz question answer "
+         "model data system process example result method practice concept lesson").split()
+
+
+def make_texts(count: int, seed: int = 7) -> list[str]:
+    generator = random.Random(seed)
+    return [" ".join(generator.choices(WORDS, k=generator.randint(20, 200))) for _ in range(count)]
+
+
+def run(model_dir: str, quantize: bool, batch_sizes: list[int], texts: list[str], num_threads: int) -> dict:
+    from app.knowledge_base.vector_embedding.client.onnx_embedding import OnnxEmbeddingClient
+
+    client = OnnxEmbeddingClient(model_dir=model_dir, quantize=quantize, num_threads=num_threads)
+    client.embed_batch(texts[:8])  # warm up
+
+    results = []
+    for batch_size in batch_sizes:
+        client.batch_size = batch_size
+        started = time.perf_counter()
+        client.embed_batch(texts)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "batch_size": batch_size,
+            "elapsed_seconds": round(elapsed, 3),
+            "texts_per_second": round(len(texts) / elapsed, 1),
+        })
+
+    # Latency of a single query, as embedded for a chat request
+    latencies = []
+    for text in texts[:50]:
+        started = time.perf_counter()
+        client.embed(text[:200])
+        latencies.append(time.perf_counter() - started)
+
+    return {
+        "model": client.model,
+        "texts": len(texts),
+        "num_threads": num_threads,
+        "dim": len(client.embed(texts[0])),
+        "throughput": results,
+        "query_latency_ms_p50": round(1000 * statistics.median(latencies), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local ONNX embedding backend.")
+    parser.add_argument("model_dir", help="Directory of the model exported to ONNX")
+    parser.add_argument("--quantize", action="store_true", help="Use the int8 quantized model")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("-n", "--texts", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    result = run(args.model_dir, args.quantize, args.batch_sizes, make_texts(args.texts), args.threads)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput benchmark for the LLM-backed endpoints, runnable offline against recorded responses.
+
+Record once with live keys, then replay as often as needed without network access:
+
+    LLM_TRANSPORT_MODE=record python -m benchmarks.replay_benchmark process_video payload.json -n 1
+    LLM_TRANSPORT_MODE=replay LLM_REPLAY_LATENCY=lognormal:4,0.6 LLM_REPLAY_SEED=7 \
+        python -m benchmarks.replay_benchmark process_video payload.json -n 20 -c 5
+
+The app runs in-process and, like the server, expects Qdrant and MongoDB to be reachable
+(`docker compose up mongo qdrant` is enough; neither needs internet access). Pass --base-url to benchmark an already running server instead. Identical requests that are in
+flight at the same time are coalesced by the LLM client, exactly as in production.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+ENDPOINTS = {
+    "process_video": "/v1/ai-course-processing/process_video",
+    "course_content": "/v1/course-generation/generate-course-content",
+    "course_quiz": "/v1/course-generation/generate-course-quiz",
+    "chat": "/v1/course-generation/chat",
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run(endpoint: str, payload: dict, requests: int, concurrency: int, base_url: str = None) -> dict:
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=None)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(ENDPOINTS[endpoint], json=payload)
+            if response.status_code >= 400:
+                failures += 1
+                print(f"Request failed with {response.status_code}: {response.text[:200]}")
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": endpoint,
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency_p50": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p95": round(percentile(latencies, 0.95), 3) if latencies else None,
+        "latency_max": round(max(latencies), 3) if latencies else None,
+        "transport_mode": os.getenv("LLM_TRANSPORT_MODE", "off"),
+        "replay_latency": os.getenv("LLM_REPLAY_LATENCY", "recorded"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM-backed endpoints with recorded responses.")
+    parser.add_argument("endpoint", choices=sorted(ENDPOINTS))
+    parser.add_argument("payload", help="JSON file with the request body")
+    parser.add_argument("-n", "--requests", type=int, default=10)
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("--base-url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="Keep the LLM response cache enabled; by default every request reaches the transport")
+    args = parser.parse_args()
+
+    if not args.keep_cache and not args.base_url:
+        os.environ["LLM_CACHE_DIR"] = ""
+        os.environ["LLM_CACHE_MEMORY_ITEMS"] = "0"
+    os.environ.setdefault("LLM_TRANSPORT_MODE", "replay")
+
+    with open(args.payload, "r", encoding="utf-8") as file:
+        payload = json.load(file)
+
+    result = asyncio.run(run(args.endpoint, payload, args.requests, args.concurrency, args.base_url))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Module-level clients are built at import time; keep them offline and off the local disk cache
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("LLM_CACHE_DIR", "")
@@ -0,0 +1,150 @@
+"""
+Local stand-in for the `/files` and `/batches` endpoints of the OpenAI API, enough for OpenAIBatchRunner.
+
+    with FakeBatchServer() as server:
+        os.environ["OPENAI_BATCH_BASE_URL"] = server.base_url
+
+Each batch reports `validating`, then `in_progress` for `polls_before_done` status checks, then
+`final_status`. Requests are answered by `responder`; the custom_ids in `error_ids` go to the
+error file instead, and `reverse_output` writes the output file in reverse request order.
+"""
+import email
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Set
+
+
+def echo_responder(body: dict) -> str:
+    """
+    Answer a chat completion with `{"text": <content of the last message>}`.
+    """
+    return json.dumps({"text": body["messages"][-1]["content"]})
+
+
+class FakeBatchServer:
+    def __init__(self, responder: Callable[[dict], str] = echo_responder, final_status: str = "completed",
+                 polls_before_done: int = 1, error_ids: Optional[Set[str]] = None, reverse_output: bool = False):
+        self.responder = responder
+        self.final_status = final_status
+        self.polls_before_done = polls_before_done
+        self.error_ids = error_ids or set()
+        self.reverse_output = reverse_output
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, dict] = {}
+        self.polls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self) -> "FakeBatchServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _store_file(self, content: bytes, filename: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex}"
+        self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": "batch", "status": "processed"}
+
+    def _create_batch(self, request: dict) -> dict:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch = {"id": batch_id, "object": "batch", "endpoint": request["endpoint"], "errors": None,
+                 "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+                 "status": "validating", "output_file_id": None, "error_file_id": None,
+                 "created_at": int(time.time()), "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+        self.batches[batch_id] = batch
+        self.polls[batch_id] = 0
+        return batch
+
+    def _poll_batch(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        self.polls[batch_id] += 1
+        if batch["status"] == "validating":
+            batch["status"] = "in_progress"
+        elif batch["status"] == "in_progress" and self.polls[batch_id] > self.polls_before_done:
+            self._finish_batch(batch)
+        return batch
+
+    def _finish_batch(self, batch: dict) -> None:
+        batch["status"] = self.final_status
+        if self.final_status != "completed":
+            batch["errors"] = {"object": "list", "data": [{"code": self.final_status, "message": "Batch ended"}]}
+            return
+        lines = [json.loads(line) for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines()]
+        outputs, errors = [], []
+        for line in lines:
+            if line["custom_id"] in self.error_ids:
+                errors.append({"id": f"req_{uuid.uuid4().hex}", "custom_id": line["custom_id"], "response": None,
+                               "error": {"code": "invalid_request", "message": "Rejected by the fake server"}})
+                continue
+            content = self.responder(line["body"])
+            outputs.append({"id": f"req_{uuid.uuid4().hex}", "custom_id": line["custom_id"], "error": None,
+                            "response": {"status_code": 200, "body": {"choices": [
+                                {"index": 0, "message": {"role": "assistant", "content": content}}]}}})
+        if self.reverse_output:
+            outputs.reverse()
+        if outputs:
+            batch["output_file_id"] = self._store_file(self._jsonl(outputs), "output.jsonl")["id"]
+        if errors:
+            batch["error_file_id"] = self._store_file(self._jsonl(errors), "errors.jsonl")["id"]
+        batch["request_counts"] = {"total": len(lines), "completed": len(outputs), "failed": len(errors)}
+
+    @staticmethod
+    def _jsonl(records: list) -> bytes:
+        return "\n".join(json.dumps(record) for record in records).encode("utf-8")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, content_type: str = "application/json"):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                with server._lock:
+                    if self.path == "/v1/files":
+                        # Parse the multipart upload with the email package, as the SDK sends it
+                        message = email.message_from_bytes(
+                            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._body())
+                        upload = next(part for part in message.get_payload()
+                                      if part.get_param("name", header="content-disposition") == "file")
+                        return self._send(200, server._store_file(upload.get_payload(decode=True),
+                                                                  upload.get_filename()))
+                    if self.path == "/v1/batches":
+                        return self._send(200, server._create_batch(json.loads(self._body())))
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_GET(self):
+                with server._lock:
+                    match = re.fullmatch(r"/v1/batches/([\w-]+)", self.path)
+                    if match and match.group(1) in server.batches:
+                        return self._send(200, server._poll_batch(match.group(1)))
+                    match = re.fullmatch(r"/v1/files/([\w-]+)/content", self.path)
+                    if match and match.group(1) in server.files:
+                        return self._send(200, server.files[match.group(1)], "application/octet-stream")
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        return Handler
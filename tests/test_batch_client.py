@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.client.batch_client import BatchJobError, BatchRequest, OpenAIBatchRunner
+from tests.fake_batch_server import FakeBatchServer
+
+
+class Echo(BaseModel):
+    text: str
+
+
+def make_requests(count: int) -> list[BatchRequest]:
+    return [BatchRequest(model="gpt-4o-mini", messages=[{"role": "user", "content": f"request {index}"}],
+                         response_format=Echo, custom_id=f"request-{index}")
+            for index in range(count)]
+
+
+@pytest.fixture
+def runner_for(monkeypatch):
+    def build(server: FakeBatchServer) -> OpenAIBatchRunner:
+        monkeypatch.setenv("OPENAI_BATCH_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_BATCH_POLL_INTERVAL", "0.01")
+        monkeypatch.setenv("LLM_TRANSPORT_MODE", "off")
+        return OpenAIBatchRunner.from_env(api_key="test")
+    return build
+
+
+def test_results_follow_request_order(runner_for):
+    with FakeBatchServer(reverse_output=True, polls_before_done=2) as server:
+        result = runner_for(server).run(make_requests(5))
+
+    assert result.errors == {}
+    assert [response.text for response in result.responses] == [f"request {index}" for index in range(5)]
+    batch_id, = server.batches
+    assert server.polls[batch_id] >= 3
+
+
+def test_run_async_matches_run(runner_for):
+    with FakeBatchServer(reverse_output=True) as server:
+        result = asyncio.run(runner_for(server).run_async(make_requests(3)))
+
+    assert [response.text for response in result.responses] == ["request 0", "request 1", "request 2"]
+
+
+def test_error_file_entries_are_reported_per_request(runner_for):
+    with FakeBatchServer(error_ids={"request-1", "request-3"}) as server:
+        result = runner_for(server).run(make_requests(4))
+
+    assert result.responses[0].text == "request 0"
+    assert result.responses[2].text == "request 2"
+    assert result.responses[1] is None and result.responses[3] is None
+    assert set(result.errors) == {"request-1", "request-3"}
+    assert "Rejected by the fake server" in result.errors["request-1"]
+
+
+def test_malformed_output_is_an_error_of_that_request(runner_for):
+    def responder(body: dict) -> str:
+        content = body["messages"][-1]["content"]
+        return "not json" if content == "request 1" else f'{{"text": "{content}"}}'
+
+    with FakeBatchServer(responder=responder) as server:
+        result = runner_for(server).run(make_requests(2))
+
+    assert result.responses[0].text == "request 0"
+    assert result.responses[1] is None
+    assert result.errors["request-1"].startswith("Malformed batch output")
+
+
+@pytest.mark.parametrize("status", ["expired", "failed", "cancelled"])
+def test_unsuccessful_batch_raises(runner_for, status):
+    with FakeBatchServer(final_status=status) as server:
+        with pytest.raises(BatchJobError, match=status):
+            runner_for(server).run(make_requests(2))
+
+
+def test_batch_exceeding_max_wait_raises(runner_for):
+    with FakeBatchServer(polls_before_done=10 ** 6) as server:
+        runner = runner_for(server)
+        runner.max_wait = 0.05
+        with pytest.raises(BatchJobError, match="did not finish"):
+            runner.run(make_requests(1))
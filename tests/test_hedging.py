@@ -0,0 +1,29 @@
+import threading
+import time
+
+from app.client.hedging import HedgedExecutor
+
+
+def test_time_queued_on_a_busy_pool_does_not_trigger_a_hedge():
+    hedging = HedgedExecutor(initial_delay=0.2, max_workers=1)
+    release = threading.Event()
+    blocker = hedging.executor.submit(release.wait)
+    threading.Timer(0.3, release.set).start()
+    hedges = []
+
+    result = hedging.call("route", primary=lambda: time.sleep(0.05) or "primary",
+                          hedge=lambda: hedges.append(1) or "hedge")
+
+    blocker.result()
+    assert result == "primary"
+    assert hedges == []
+    assert hedging.stats()["route"]["hedged"] == 0
+
+
+def test_slow_primary_is_hedged():
+    hedging = HedgedExecutor(initial_delay=0.05, max_workers=2)
+
+    result = hedging.call("route", primary=lambda: time.sleep(0.5) or "primary", hedge=lambda: "hedge")
+
+    assert result == "hedge"
+    assert hedging.stats()["route"]["hedge_wins"] == 1
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from app.jobs import handlers
+from app.jobs.handlers import JOB_HANDLERS, LeaseLostError, run_async
+from app.jobs.worker import JobWorker
+
+
+class LeaseLosingQueue:
+    """
+    Queue holding a single job whose lease is lost at the first heartbeat.
+    """
+    lease_seconds = 0.03
+
+    def __init__(self):
+        self.job = {"_id": "job-1", "type": "test", "attempts": 1, "payload": {}}
+        self.finished = []
+
+    def claim(self, worker_id, job_types):
+        job, self.job = self.job, None
+        return job
+
+    def heartbeat(self, job_id, worker_id, progress=None):
+        return False
+
+    def complete(self, job_id, worker_id, result):
+        self.finished.append(("complete", result))
+        return True
+
+    def fail(self, job_id, worker_id, error):
+        self.finished.append(("fail", error))
+        return True
+
+
+def test_job_stops_at_the_next_report_after_its_lease_is_lost(monkeypatch):
+    reports = []
+
+    def handler(payload, report):
+        for step in range(100):
+            report({"step": step})
+            reports.append(step)
+            time.sleep(0.01)
+        return "done"
+
+    monkeypatch.setitem(JOB_HANDLERS, "test", handler)
+    queue = LeaseLosingQueue()
+    assert JobWorker(queue, job_types=["test"]).run_once()
+
+    assert len(reports) < 100
+    assert queue.finished == []
+
+
+def test_coroutine_is_cancelled_after_the_lease_is_lost(monkeypatch):
+    monkeypatch.setattr(handlers, "LEASE_CHECK_SECONDS", 0.01)
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    def handler(payload, report):
+        return run_async(work(), report)
+
+    monkeypatch.setitem(JOB_HANDLERS, "test", handler)
+    queue = LeaseLosingQueue()
+    started = time.monotonic()
+    assert JobWorker(queue, job_types=["test"]).run_once()
+
+    assert time.monotonic() - started < 1
+    assert queue.finished == []
+    time.sleep(0.05)
+    assert cancelled == [True]
+
+
+def test_run_async_raises_lease_lost_error(monkeypatch):
+    monkeypatch.setattr(handlers, "LEASE_CHECK_SECONDS", 0.01)
+    report = handlers.ProgressCallback()
+    report.lease_lost.set()
+    with pytest.raises(LeaseLostError):
+        run_async(asyncio.sleep(10), report)
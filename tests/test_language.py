@@ -0,0 +1,30 @@
+import pytest
+
+from app.utils.language import is_in_language
+
+
+@pytest.mark.parametrize("text", ["True", "False", "Introduction", "Data Analysis"])
+@pytest.mark.parametrize("language", ["french", "spanish", "german"])
+def test_short_latin_text_without_stopwords_is_translated(text, language):
+    assert not is_in_language(text, language)
+
+
+def test_short_text_is_not_assumed_to_be_english():
+    assert not is_in_language("Vrai", "english")
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Introduction à la programmation", "french"),
+    ("Los fundamentos de la programación", "spanish"),
+    ("Die Grundlagen der Programmierung", "german"),
+    ("The basics of programming", "english"),
+    ("مقدمة في البرمجة", "ar"),
+    ("42", "french"),
+])
+def test_text_with_evidence_of_the_language_is_kept(text, language):
+    assert is_in_language(text, language)
+
+
+def test_text_in_another_language_is_translated():
+    assert not is_in_language("The basics of programming", "french")
+    assert not is_in_language("مقدمة في البرمجة", "english")
@@ -0,0 +1,26 @@
+from app.utils.packing import estimate_text_tokens, pack_by_budget
+
+
+def test_packs_keep_order_and_stay_within_budget():
+    packs = pack_by_budget([3, 4, 2, 5, 1], cost=lambda item: item, budget=7, max_items=10)
+
+    assert packs == [[3, 4], [2, 5], [1]]
+    assert all(sum(pack) <= 7 for pack in packs)
+
+
+def test_packs_respect_max_items():
+    assert pack_by_budget([1] * 5, cost=lambda item: item, budget=100, max_items=2) == [[1, 1], [1, 1], [1]]
+
+
+def test_item_over_budget_gets_a_pack_of_its_own():
+    assert pack_by_budget([1, 50, 1], cost=lambda item: item, budget=10, max_items=10) == [[1], [50], [1]]
+
+
+def test_no_items_no_packs():
+    assert pack_by_budget([], cost=lambda item: item, budget=10, max_items=10) == []
+
+
+def test_estimate_text_tokens():
+    assert estimate_text_tokens("") == 0
+    assert estimate_text_tokens(None) == 0
+    assert estimate_text_tokens("abcdefg") == 3
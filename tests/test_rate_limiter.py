@@ -0,0 +1,33 @@
+import time
+
+from app.client.rate_limiter import ModelRateLimiter
+
+
+def test_unconfigured_models_are_not_limited():
+    limiter = ModelRateLimiter()
+    started = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire("gpt-4o", 100000)
+    limiter.record_usage("gpt-4o", 100000, type("Usage", (), {"total_tokens": 500})())
+
+    assert time.monotonic() - started < 1
+    stats = limiter.stats()["gpt-4o"]
+    assert stats["throttled"] == 0
+    assert stats["available_tokens"] is None and stats["limits"] == {}
+
+
+def test_configured_token_budget_throttles():
+    limiter = ModelRateLimiter({"gpt-4o": {"tpm": 600}})
+
+    assert limiter._reserve("gpt-4o", 600) == 0
+    assert limiter._reserve("gpt-4o", 60) > 0
+    assert limiter._reserve("gpt-4o-mini", 10 ** 6) == 0
+    assert limiter.stats()["gpt-4o"]["available_requests"] is None
+
+
+def test_default_entry_applies_to_unlisted_models(monkeypatch):
+    monkeypatch.setenv("LLM_RATE_LIMITS", '{"default": {"rpm": 1}}')
+    limiter = ModelRateLimiter.from_env()
+
+    assert limiter._reserve("any-model", 1) == 0
+    assert limiter._reserve("any-model", 1) > 0
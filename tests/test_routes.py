@@ -0,0 +1,16 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes.ai_course_processing import ai_course_processing_router
+
+app = FastAPI()
+app.include_router(ai_course_processing_router)
+client = TestClient(app)
+
+
+def test_process_video_rejects_packed_with_incremental():
+    response = client.post("/process_video", params={"packed": True, "incremental": True},
+                           json={"video": "video.mp4", "objective": [], "skills": [], "language": "English"})
+
+    assert response.status_code == 400
+    assert "packed and incremental" in response.json()["detail"]
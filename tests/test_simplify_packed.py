@@ -0,0 +1,82 @@
+import asyncio
+
+from app.client.async_llm_client import AsyncOpenAITextProcessor
+from app.client.llm_client import simplify_pack_timeout, unpack_simplify_response
+from app.model.llm_response_model import PackedSimplifyItem, PackedSimplifyResponse, SimplifyResponse
+
+PACK = [{"paragraph_id": "p1", "paragraph": "First paragraph."},
+        {"paragraph_id": "p2", "paragraph": "Second paragraph."},
+        {"paragraph_id": "p3", "paragraph": "Third paragraph."}]
+
+
+def simplified(text: str, paragraph_id: str = None, **overrides):
+    fields = {f"simplify{level}{suffix}": text for level in (1, 2, 3)
+              for suffix in ("", "_first_word", "_last_word")}
+    fields.update(overrides)
+    if paragraph_id is None:
+        return SimplifyResponse(**fields)
+    return PackedSimplifyItem(paragraph_id=paragraph_id, **fields)
+
+
+def test_unpack_keeps_complete_entries_of_requested_paragraphs():
+    response = PackedSimplifyResponse(simplified=[
+        simplified("one", "p1"),
+        simplified("first again", "p1"),
+        simplified("unknown", "p9"),
+        simplified("incomplete", "p2", simplify3=""),
+        simplified("three", "p3"),
+    ])
+
+    results = unpack_simplify_response(PACK, response)
+
+    assert set(results) == {"p1", "p3"}
+    assert results["p1"].simplify1 == "one"
+
+
+def test_unpack_of_a_failed_request_is_empty():
+    assert unpack_simplify_response(PACK, None) == {}
+
+
+def test_pack_timeout_grows_with_the_expected_output():
+    assert simplify_pack_timeout(PACK[:1]) < simplify_pack_timeout(PACK)
+    assert simplify_pack_timeout([{"paragraph": "word " * 4000}]) > 120
+
+
+def make_client(monkeypatch, response):
+    client = AsyncOpenAITextProcessor(api_key="test")
+    calls = {"timeouts": [], "single": []}
+
+    async def parse(**kwargs):
+        calls["timeouts"].append(kwargs.get("timeout"))
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def simplify(paragraph, language):
+        calls["single"].append(paragraph)
+        return simplified(f"single {paragraph}")
+
+    monkeypatch.setattr(client, "_parse", parse)
+    monkeypatch.setattr(client, "simplify", simplify)
+    return client, calls
+
+
+def test_partial_pack_simplifies_the_missing_paragraphs_one_by_one(monkeypatch):
+    response = PackedSimplifyResponse(simplified=[simplified("one", "p1"), simplified("three", "p3")])
+    client, calls = make_client(monkeypatch, response)
+
+    results = asyncio.run(client._simplify_pack(PACK, "English"))
+
+    assert results["p1"].simplify1 == "one" and results["p3"].simplify1 == "three"
+    assert results["p2"].simplify1 == "single Second paragraph."
+    assert calls["single"] == ["Second paragraph."]
+    assert calls["timeouts"] == [simplify_pack_timeout(PACK)]
+
+
+def test_failed_pack_simplifies_every_paragraph_one_by_one(monkeypatch):
+    client, calls = make_client(monkeypatch, ValueError("malformed response"))
+
+    results = asyncio.run(client._simplify_pack(PACK, "English"))
+
+    assert set(results) == {"p1", "p2", "p3"}
+    assert calls["single"] == [paragraph["paragraph"] for paragraph in PACK]
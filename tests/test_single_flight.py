@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.client.single_flight import SingleFlight
+
+
+def test_cancelled_leader_hands_the_call_to_a_follower():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(single_flight.do_async("key", upstream))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(single_flight.do_async("key", upstream))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 2
+    assert single_flight.stats()["abandoned_calls"] == 1
+
+
+def test_errors_are_shared_with_followers():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(single_flight.do_async("key", upstream),
+                                    single_flight.do_async("key", upstream), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 1
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.client.translation_memory import TranslationMemory
+from app.model.processing_models import QuizResults
+from app.service import translate_service
+
+
+@pytest.fixture
+def llm_requests(monkeypatch):
+    """
+    Replace the LLM with one that tags every segment with its language, and record what it was sent.
+    """
+    requests = []
+
+    async def translate_segments(segments, language, token_budget=None, model=None):
+        requests.append((language, list(segments)))
+        return [f"{segment} [{language}]" for segment in segments]
+
+    monkeypatch.setattr(translate_service.llm_client, "translate_segments", translate_segments)
+    monkeypatch.setattr(translate_service, "translation_memory", TranslationMemory(uri=None))
+    return requests
+
+
+@pytest.mark.parametrize("language", ["French", "Spanish"])
+def test_true_and_false_are_translated(llm_requests, language):
+    translations = asyncio.run(translate_service.translate_segments(["True", "False", "42"], language))
+
+    assert translations == {"True": f"True [{language}]", "False": f"False [{language}]", "42": "42"}
+    assert llm_requests == [(language, ["True", "False"])]
+
+
+def make_item() -> QuizResults:
+    skill = {"name": "Data Analysis", "id": "skill-1"}
+    objective = {"name": "Read a chart", "id": "objective-1"}
+    return QuizResults.model_validate({
+        "video_id": "video-1", "objective": [objective], "skills": [skill], "language": "English",
+        "paragraph_id": "paragraph-1", "paragraph": "Charts show data.", "paragraph_level": {"name": "1", "id": "1"},
+        "start_word": "Charts", "end_word": "data",
+        "simplify1_id": "s1", "simplify1": "Charts show numbers.", "simplify1_first_word": "Charts",
+        "simplify1_last_word": "numbers",
+        "simplify2_id": "s2", "simplify2": "Charts are pictures.", "simplify2_first_word": "Charts",
+        "simplify2_last_word": "pictures",
+        "simplify3_id": "s3", "simplify3": "Pictures of numbers.", "simplify3_first_word": "Pictures",
+        "simplify3_last_word": "numbers",
+        "quiz": [{
+            "question": "Charts show data.", "question_type": "true_false", "post_assessment": False,
+            "question_level": "1", "options": ["True", "False"], "correct_answer": "true",
+            "related_skills": [skill], "related_objectives": [objective],
+            "alternative_questions": [{
+                "question": "Is a chart a picture?", "question_type": "multiple_choice", "post_assessment": False,
+                "options": ["Yes", "No"], "correct_answer": "Yes",
+            }],
+        }],
+    })
+
+
+def test_translated_correct_answers_match_translated_options(llm_requests):
+    result, = asyncio.run(translate_service.translate_video([make_item()], "French"))
+
+    question = result.quiz[0]
+    assert question.options == ["True [French]", "False [French]"]
+    assert question.correct_answer == "True [French]"
+    alternative = question.alternative_questions[0]
+    assert alternative.correct_answer in alternative.options
+    assert alternative.correct_answer == "Yes [French]"
+    assert result.skills[0].name == "Data Analysis [French]"
+    assert result.language == "French"
+
+
+def test_short_segments_are_sent_for_every_language(llm_requests):
+    languages = ["French", "Spanish", "German"]
+    results = asyncio.run(translate_service.translate_video_languages([make_item()], languages))
+
+    for language in languages:
+        sent = [segment for request_language, segments in llm_requests if request_language == language
+                for segment in segments]
+        assert {"True", "False", "Data Analysis"} <= set(sent)
+        assert results[language][0].quiz[0].options == [f"True [{language}]", f"False [{language}]"]
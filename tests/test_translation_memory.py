@@ -0,0 +1,11 @@
+from app.client.translation_memory import TranslationMemory
+
+
+def test_only_short_segments_are_remembered():
+    memory = TranslationMemory(uri=None, max_chars=20)
+    paragraph = "A paragraph that is far longer than twenty characters."
+    memory.store({"Chapter 1": "Chapitre 1", paragraph: "Un paragraphe."}, "French")
+
+    assert memory.lookup(["Chapter 1", paragraph], "french") == {"Chapter 1": "Chapitre 1"}
+    assert memory.stats()["writes"] == 1
+    assert memory.stats()["misses"] == 0